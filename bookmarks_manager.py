@@ -4,18 +4,33 @@ Complete Bookmarks Management System
 Features: Add, edit, delete, folders, import/export, search
 """
 
+import bisect
+import csv
 import json
 import os
+import re
+import sqlite3
+from collections import Counter
+from contextlib import contextmanager
+from html import escape
+from html.parser import HTMLParser
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import urlsplit
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem,
+    QDialog, QVBoxLayout, QHBoxLayout, QTreeView,
     QPushButton, QLineEdit, QMenu, QMessageBox, QInputDialog,
-    QLabel, QToolBar, QWidget, QSplitter, QTextEdit, QFileDialog
+    QLabel, QToolBar, QWidget, QSplitter, QTextEdit, QFileDialog,
+    QProgressDialog
+)
+from PyQt6.QtCore import (
+    Qt, pyqtSignal, QUrl, QStandardPaths, QObject, QThread,
+    QAbstractItemModel, QModelIndex, QSortFilterProxyModel
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QUrl, QStandardPaths
 from PyQt6.QtGui import QIcon, QAction, QCursor
 from PyQt6.QtWebEngineCore import QWebEngineSettings
+from profile_importer import ProfileImporter
 
 try:
     import qtawesome as qta
@@ -24,13 +39,812 @@ except ImportError:
     HAS_ICONS = False
 
 
-class BookmarksManager:
+class NetscapeBookmarkParser(HTMLParser):
+    """Incremental parser for Netscape bookmark files (bookmarks.html).
+
+    Feed the file in chunks and drain parsed entries with ``pop_entries``.
+    Only the current folder stack is kept between chunks, so memory stays
+    bounded regardless of file size. Nested folders are flattened to
+    "Parent/Child" folder names; the "Bookmarks Bar" and "Other Bookmarks"
+    roots written by ``export_bookmarks`` map back to their locations.
+    """
+    
+    SPECIAL_FOLDERS = {
+        "bookmarks bar": "bookmarks_bar",
+        "bookmarks toolbar": "bookmarks_bar",
+        "other bookmarks": "other_bookmarks",
+    }
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.entries = []
+        self.folder_stack = []  # (name, special location or None) per open <DL>
+        self.pending_folder = None
+        self.current_link = None
+        self.current_folder = None
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "h3":
+            self.current_folder = {"name": "", "attrs": attrs}
+        elif tag == "a":
+            self.current_link = {
+                "url": attrs.get("href") or "",
+                "title": "",
+                "add_date": attrs.get("add_date"),
+            }
+        elif tag == "dl":
+            # The root <DL> has no heading; every other one belongs to the
+            # <H3> that precedes it.
+            if self.pending_folder is not None or self.folder_stack:
+                self.folder_stack.append(self.pending_folder or ("Imported", None))
+            else:
+                self.folder_stack.append(None)
+            self.pending_folder = None
+    
+    def handle_endtag(self, tag):
+        if tag == "h3" and self.current_folder is not None:
+            name = self.current_folder["name"].strip() or "Untitled"
+            attrs = self.current_folder["attrs"]
+            special = self.SPECIAL_FOLDERS.get(name.lower())
+            if "personal_toolbar_folder" in attrs:
+                special = "bookmarks_bar"
+            elif "unfiled_bookmarks_folder" in attrs:
+                special = "other_bookmarks"
+            self.pending_folder = (name, special)
+            self.current_folder = None
+        elif tag == "a" and self.current_link is not None:
+            link = self.current_link
+            self.current_link = None
+            if link["url"]:
+                self.entries.append({
+                    "url": link["url"],
+                    "title": link["title"].strip() or link["url"],
+                    "folder": self.current_location(),
+                    "date_added": self.parse_add_date(link["add_date"]),
+                })
+        elif tag == "dl" and self.folder_stack:
+            self.folder_stack.pop()
+    
+    def handle_data(self, data):
+        if self.current_link is not None:
+            self.current_link["title"] += data
+        elif self.current_folder is not None:
+            self.current_folder["name"] += data
+    
+    def current_location(self):
+        """Map the open folder stack to a bookmarks location."""
+        folders = [frame for frame in self.folder_stack if frame is not None]
+        location = "other_bookmarks"
+        if folders and folders[0][1]:
+            location = folders[0][1]
+            folders = folders[1:]
+        if folders:
+            return "/".join(name for name, _ in folders)
+        return location
+    
+    @staticmethod
+    def parse_add_date(value):
+        """Convert an ADD_DATE timestamp to ISO format."""
+        try:
+            return datetime.fromtimestamp(int(value)).isoformat()
+        except (TypeError, ValueError, OverflowError, OSError):
+            return datetime.now().isoformat()
+    
+    def pop_entries(self):
+        """Return and clear the entries parsed so far."""
+        entries, self.entries = self.entries, []
+        return entries
+    
+    @classmethod
+    def iter_file(cls, filepath, chunk_size=64 * 1024):
+        """Yield bookmark entries from a file, reading it chunk by chunk."""
+        parser = cls()
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                parser.feed(chunk)
+                yield from parser.pop_entries()
+        parser.close()
+        yield from parser.pop_entries()
+
+
+class _CsvLine:
+    """Write target that keeps the last row produced by a csv.writer."""
+    
+    __slots__ = ("text",)
+    
+    def write(self, text):
+        self.text = text
+
+
+class BookmarkExporter:
+    """Streams a bookmarks snapshot to Netscape HTML, JSON or CSV.
+    
+    Each format is a generator of text pieces; ``write`` joins them into
+    buffers of ``BUFFER_SIZE`` characters before touching the file and
+    reports progress per flush. The snapshot is a list of
+    ``(location, bookmarks)`` pairs, so the export can run on a worker
+    thread while the live store keeps changing.
+    """
+    
+    FORMATS = {".html": "html", ".htm": "html", ".json": "json", ".csv": "csv"}
+    CSV_FIELDS = ("folder", "title", "url", "date_added", "id")
+    ROOT_HEADINGS = {
+        "bookmarks_bar": ('Bookmarks Bar', ' PERSONAL_TOOLBAR_FOLDER="true"'),
+        "other_bookmarks": ('Other Bookmarks', ' UNFILED_BOOKMARKS_FOLDER="true"'),
+    }
+    BUFFER_SIZE = 256 * 1024
+    
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.total = sum(len(items) for _, items in snapshot)
+        self.done = 0
+    
+    @classmethod
+    def format_for_path(cls, filepath):
+        """Guess the export format from a file extension (default HTML)."""
+        return cls.FORMATS.get(Path(filepath).suffix.lower(), "html")
+    
+    @staticmethod
+    def add_date(date_str):
+        """Convert an ISO date to an ADD_DATE timestamp."""
+        try:
+            return str(int(datetime.fromisoformat(date_str).timestamp()))
+        except (TypeError, ValueError, OverflowError, OSError):
+            return "0"
+    
+    def iter_html(self):
+        """Yield the snapshot as a Netscape bookmark file."""
+        yield ('<!DOCTYPE NETSCAPE-Bookmark-file-1>\n'
+               '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n'
+               '<TITLE>Bookmarks</TITLE>\n'
+               '<H1>Bookmarks</H1>\n'
+               '<DL><p>\n')
+        for location, items in self.snapshot:
+            if not items:
+                continue
+            name, attrs = self.ROOT_HEADINGS.get(location, (location, ''))
+            yield f'    <DT><H3{attrs}>{escape(name)}</H3>\n    <DL><p>\n'
+            for bookmark in items:
+                yield (f'        <DT><A HREF="{escape(bookmark.get("url", ""))}" '
+                       f'ADD_DATE="{self.add_date(bookmark.get("date_added"))}">'
+                       f'{escape(bookmark.get("title", ""))}</A>\n')
+                self.done += 1
+            yield '    </DL><p>\n'
+        yield '</DL><p>\n'
+    
+    def iter_json(self):
+        """Yield the snapshot in the bookmarks.json layout."""
+        yield '{'
+        in_folders = False
+        for i, (location, items) in enumerate(self.snapshot):
+            if location in self.ROOT_HEADINGS:
+                prefix = "" if i == 0 else ", "
+            elif not in_folders:
+                prefix = ', "folders": {' if i else '"folders": {'
+                in_folders = True
+            else:
+                prefix = ", "
+            yield f'{prefix}{json.dumps(location, ensure_ascii=False)}: ['
+            for j, bookmark in enumerate(items):
+                yield ("" if j == 0 else ", ") + json.dumps(bookmark, ensure_ascii=False)
+                self.done += 1
+            yield ']'
+        yield '}}\n' if in_folders else '}\n'
+    
+    def iter_csv(self):
+        """Yield the snapshot as CSV, one row per bookmark."""
+        line = _CsvLine()
+        writer = csv.writer(line)
+        writer.writerow(self.CSV_FIELDS)
+        yield line.text
+        for location, items in self.snapshot:
+            for bookmark in items:
+                writer.writerow((
+                    location, bookmark.get("title", ""), bookmark.get("url", ""),
+                    bookmark.get("date_added", ""), bookmark.get("id", "")
+                ))
+                yield line.text
+                self.done += 1
+    
+    def write(self, filepath, fmt=None, progress=None, should_stop=None):
+        """Write the snapshot to ``filepath``.
+        
+        The file is written next to its destination and moved into place,
+        so a failed or cancelled export never leaves a truncated file.
+        Returns True on success.
+        """
+        fmt = fmt or self.format_for_path(filepath)
+        pieces = getattr(self, f"iter_{fmt}")()
+        tmp_path = f"{filepath}.part"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                buffer = []
+                size = 0
+                for piece in pieces:
+                    buffer.append(piece)
+                    size += len(piece)
+                    if size >= self.BUFFER_SIZE:
+                        f.write(''.join(buffer))
+                        buffer.clear()
+                        size = 0
+                        if progress:
+                            progress(self.done, self.total)
+                        if should_stop and should_stop():
+                            raise InterruptedError("export cancelled")
+                f.write(''.join(buffer))
+            os.replace(tmp_path, filepath)
+            if progress:
+                progress(self.done, self.total)
+            return True
+        except (OSError, InterruptedError) as e:
+            print(f"Export error: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+
+class BookmarkDuplicateFinder:
+    """Finds duplicate and dead bookmarks by canonical URL.
+    
+    Each URL is canonicalized once (scheme, ``www.``, default ports,
+    trailing slashes, fragments and tracking parameters are ignored) and
+    bookmarks are grouped by that key in a dict, so analysis is linear in
+    the number of bookmarks. Empty or malformed URLs are reported as
+    dead; URLs with other schemes (``javascript:``, ``chrome://``, ...)
+    are compared as written. Works on ``(location, [(id, url), ...])`` snapshots so it can
+    run on a worker thread.
+    """
+    
+    WEB_SCHEMES = ("http", "https")
+    # Schemes whose URLs are canonicalized; others are kept verbatim
+    KNOWN_SCHEMES = frozenset(WEB_SCHEMES + ("ftp", "file", "about", "data", "mailto"))
+    DEFAULT_PORTS = {"http": 80, "https": 443, "ftp": 21}
+    # scheme, authority (None when absent), path, query; fragment dropped
+    URL_RE = re.compile(r"([A-Za-z][A-Za-z0-9+.-]*):(?://([^/?#]*))?([^?#]*)(?:\?([^#]*))?")
+    TRACKING_PARAMS = frozenset({
+        "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid",
+        "mc_cid", "mc_eid", "_ga", "ref_src"
+    })
+    
+    @classmethod
+    def is_tracking_param(cls, param):
+        """Check whether a ``name=value`` query item is a tracking parameter."""
+        name = param.split("=", 1)[0].lower()
+        return name.startswith("utm_") or name in cls.TRACKING_PARAMS
+    
+    @classmethod
+    def canonicalize_url(cls, url):
+        """Get the comparison key of a URL, or None if it is dead."""
+        url = (url or "").strip()
+        match = cls.URL_RE.match(url)
+        if match is None:
+            return None
+        scheme, netloc, path, query = match.groups()
+        scheme = scheme.lower()
+        if scheme not in cls.KNOWN_SCHEMES:
+            return url
+        
+        if netloc is None:
+            if scheme in cls.WEB_SCHEMES:
+                return None
+            key = f"{scheme}:{path.rstrip('/')}"
+        else:
+            host = netloc.rpartition("@")[2].lower()
+            port = ""
+            if ":" in host[host.rfind("]") + 1:]:  # not inside an IPv6 literal
+                host, _, port = host.rpartition(":")
+            if (scheme in cls.WEB_SCHEMES and not host) or (port and not port.isdigit()):
+                return None
+            if host.startswith("www."):
+                host = host[4:]
+            if port and int(port) != cls.DEFAULT_PORTS.get(scheme):
+                host = f"{host}:{port}"
+            if scheme in cls.WEB_SCHEMES:
+                scheme = "http"
+            key = f"{scheme}://{host}{path.rstrip('/')}"
+        
+        if query:
+            params = sorted(
+                param for param in query.split("&")
+                if param and not cls.is_tracking_param(param)
+            )
+            if params:
+                key += "?" + "&".join(params)
+        return key
+    
+    @staticmethod
+    def snapshot(bookmarks_manager):
+        """Copy the IDs and URLs of all bookmarks for analysis."""
+        return [
+            (location, [(bookmark.get("id"), bookmark.get("url", "")) for bookmark in items])
+            for location, items in bookmarks_manager.iter_locations()
+        ]
+    
+    @classmethod
+    def analyze(cls, snapshot):
+        """Group a snapshot by canonical URL.
+        
+        Returns a dict with ``duplicates``, a list of groups of
+        ``(id, location)`` in store order (the first entry is the one to
+        keep), and ``dead``, a list of ``(id, location)``.
+        """
+        groups = {}
+        dead = []
+        for location, items in snapshot:
+            for bookmark_id, url in items:
+                key = cls.canonicalize_url(url)
+                if key is None:
+                    dead.append((bookmark_id, location))
+                else:
+                    groups.setdefault(key, []).append((bookmark_id, location))
+        
+        return {
+            "duplicates": [group for group in groups.values() if len(group) > 1],
+            "dead": dead,
+        }
+    
+    @staticmethod
+    def redundant_ids(duplicates):
+        """Get the IDs of every duplicate except the first of each group."""
+        return [bookmark_id for group in duplicates for bookmark_id, _ in group[1:]]
+
+
+class BookmarkSearchIndex:
+    """Inverted token index for substring search over bookmarks.
+    
+    Titles and URLs are lowercased once when a bookmark is indexed, and
+    each word token maps to the set of bookmarks containing it. A
+    substring match of the query must contain every query word inside a
+    single token, so intersecting the postings of the tokens containing
+    each word gives a complete candidate set that is then verified. The
+    tokens containing a word are found by bisecting a sorted list of
+    token suffixes, so the lookup costs grow with the matches rather than
+    the vocabulary. A query extending the previous one only re-checks
+    the previous results.
+    
+    ``fuzzy_search`` ranks bookmarks by prefix, abbreviation, subsequence
+    and typo matches against the same token vocabulary.
+    """
+    
+    TOKEN_RE = re.compile(r"\w+")
+    MIN_WORD_LENGTH = 3  # shorter words match most of the vocabulary
+    
+    # Fuzzy scoring: weight of a token match by the field it occurs in
+    FIELD_WEIGHTS = (1.0, 0.9, 0.6)  # title, host, path
+    
+    def __init__(self):
+        # key -> [bookmark, location, title_lower, url_lower, seq, fields]
+        # where fields is (title, host, path) token tuples, filled lazily
+        self.entries = {}
+        self.postings = {}  # token -> set of keys
+        self.initials = {}  # title initials ("so" for Stack Overflow) -> set of keys
+        # (sorted tokens, the tokens joined by newlines, offset of each in
+        # that text), rebuilt when tokens come and go
+        self._vocab = None
+        # (sorted token suffixes, suffix -> tokens), built on first use and
+        # then kept up to date as tokens come and go
+        self._suffixes = None
+        self._seq = 0
+        self._last_query = None
+        self._last_keys = None
+    
+    @staticmethod
+    def key(bookmark):
+        """Index key of a bookmark (its identity)."""
+        return id(bookmark)
+    
+    def add(self, bookmark, location):
+        """Index a bookmark."""
+        if self.key(bookmark) in self.entries:
+            self.remove(bookmark)
+        self.add_many([(bookmark, location)])
+    
+    def add_many(self, items):
+        """Index an iterable of (bookmark, location) pairs."""
+        entries = self.entries
+        postings = self.postings
+        findall = self.TOKEN_RE.findall
+        seq = self._seq
+        
+        initials = self.initials
+        new_tokens = []
+        
+        for bookmark, location in items:
+            key = id(bookmark)
+            title = bookmark.get("title", "").lower()
+            url = bookmark.get("url", "").lower()
+            entries[key] = [bookmark, location, title, url, seq, None]
+            seq += 1
+            
+            title_tokens = findall(title)
+            for token in title_tokens + findall(url):
+                keys = postings.get(token)
+                if keys is None:
+                    postings[token] = {key}
+                    new_tokens.append(token)
+                else:
+                    keys.add(key)
+            
+            if len(title_tokens) > 1:
+                initials.setdefault("".join(t[0] for t in title_tokens), set()).add(key)
+        
+        self._seq = seq
+        self._last_query = None
+        if new_tokens:
+            self._vocab = None
+            if self._suffixes is not None:
+                if len(new_tokens) > len(postings) // 8:
+                    self._suffixes = None  # a bulk load; cheaper to re-sort once
+                else:
+                    for token in new_tokens:
+                        self._add_suffixes(token)
+    
+    def remove(self, bookmark):
+        """Remove a bookmark from the index."""
+        key = self.key(bookmark)
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        
+        title_tokens = self.TOKEN_RE.findall(entry[2])
+        for token in set(title_tokens + self.TOKEN_RE.findall(entry[3])):
+            keys = self.postings.get(token)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.postings[token]
+                    self._vocab = None
+                    if self._suffixes is not None:
+                        self._remove_suffixes(token)
+        
+        abbreviation = "".join(t[0] for t in title_tokens)
+        keys = self.initials.get(abbreviation)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.initials[abbreviation]
+        self._last_query = None
+    
+    def _token_suffixes(self, token):
+        return [token[start:] for start in range(len(token) - self.MIN_WORD_LENGTH + 1)]
+    
+    def _add_suffixes(self, token):
+        """Insert a new token's suffixes into the sorted suffix list."""
+        suffixes, owners = self._suffixes
+        for suffix in self._token_suffixes(token):
+            tokens = owners.get(suffix)
+            if tokens is None:
+                owners[suffix] = [token]
+                bisect.insort(suffixes, suffix)
+            else:
+                tokens.append(token)
+    
+    def _remove_suffixes(self, token):
+        """Drop a removed token's suffixes from the sorted suffix list."""
+        suffixes, owners = self._suffixes
+        for suffix in self._token_suffixes(token):
+            tokens = owners.get(suffix)
+            if tokens is None:
+                continue
+            tokens.remove(token)
+            if not tokens:
+                del owners[suffix]
+                del suffixes[bisect.bisect_left(suffixes, suffix)]
+    
+    def _tokens_containing(self, word):
+        """Get the vocabulary tokens that contain ``word``.
+        
+        ``word`` must be at least MIN_WORD_LENGTH long; shorter suffixes
+        are not indexed.
+        """
+        if self._suffixes is None:
+            owners = {}
+            for token in self.postings:
+                for suffix in self._token_suffixes(token):
+                    owners.setdefault(suffix, []).append(token)
+            self._suffixes = (sorted(owners), owners)
+        suffixes, owners = self._suffixes
+        
+        start = bisect.bisect_left(suffixes, word)
+        end = bisect.bisect_left(suffixes, word + "\uffff", start)
+        tokens = set()
+        for suffix in suffixes[start:end]:
+            tokens.update(owners[suffix])
+        return tokens
+    
+    def _candidate_keys(self, query):
+        """Get keys of bookmarks that may contain ``query``.
+        
+        Returns the previous results (a list in index order) when the
+        query extends the last one, a set of candidates, or None when the
+        query is too broad and a full pass over the entries is cheaper.
+        """
+        if self._last_query and self._last_query in query:
+            return self._last_keys
+        
+        postings = self.postings
+        limit = len(self.entries) // 4
+        result = None
+        for word in sorted(set(self.TOKEN_RE.findall(query)), key=len, reverse=True):
+            if len(word) < self.MIN_WORD_LENGTH:
+                break
+            tokens = self._tokens_containing(word)
+            if sum(len(postings[token]) for token in tokens) > limit:
+                continue  # too broad to narrow anything down
+            keys = set().union(*(postings[token] for token in tokens))
+            result = keys if result is None else result & keys
+            if not result:
+                break
+        return result
+    
+    def search(self, query):
+        """Find bookmarks whose title or URL contains ``query``.
+        
+        Returns (bookmark, location) tuples in index order.
+        """
+        query = query.lower()
+        entries = self.entries
+        if not query:
+            return [(entry[0], entry[1]) for entry in entries.values()]
+        
+        keys = self._candidate_keys(query)
+        if keys is None:
+            # Broad query: one ordered pass over the lowercased fields
+            matched = [
+                key for key, entry in entries.items()
+                if query in entry[2] or query in entry[3]
+            ]
+        else:
+            matched = [
+                key for key in keys
+                if query in entries[key][2] or query in entries[key][3]
+            ]
+            if isinstance(keys, set):
+                matched.sort(key=lambda key: entries[key][4])
+        
+        self._last_query = query
+        self._last_keys = matched
+        return [(entries[key][0], entries[key][1]) for key in matched]
+    
+    # --- Fuzzy matching ---
+    
+    def _get_vocab(self):
+        """Get the sorted vocabulary, its newline-joined text and offsets."""
+        if self._vocab is None:
+            tokens = sorted(self.postings)
+            offsets = []
+            position = 0
+            for token in tokens:
+                offsets.append(position)
+                position += len(token) + 1
+            self._vocab = (tokens, "\n".join(tokens), offsets)
+        return self._vocab
+    
+    def _vocab_bounds(self, prefix):
+        """Get the (start, end) positions of tokens starting with ``prefix``."""
+        tokens = self._get_vocab()[0]
+        start = bisect.bisect_left(tokens, prefix)
+        return start, bisect.bisect_left(tokens, prefix + "\uffff", start)
+    
+    def _vocab_range(self, prefix):
+        """Get the sorted vocabulary tokens starting with ``prefix``."""
+        start, end = self._vocab_bounds(prefix)
+        return self._get_vocab()[0][start:end]
+    
+    def _subsequence_tokens(self, word):
+        """Get the tokens starting with word's first character that contain
+        all of its characters in order.
+        
+        One regular expression runs over that slice of the joined
+        vocabulary instead of testing tokens one by one.
+        """
+        tokens, text, offsets = self._get_vocab()
+        start, end = self._vocab_bounds(word[0])
+        if start == end:
+            return []
+        pattern = re.compile(
+            "^" + "[^\n]*?".join(re.escape(char) for char in word) + "[^\n]*",
+            re.MULTILINE
+        )
+        end_offset = offsets[end] - 1 if end < len(offsets) else len(text)
+        return [match.group() for match in pattern.finditer(text, offsets[start], end_offset)]
+    
+    @staticmethod
+    def is_subsequence(word, token):
+        it = iter(token)
+        return all(char in it for char in word)
+    
+    @staticmethod
+    def edit_distance(a, b, limit):
+        """Levenshtein distance between a and b, or limit + 1 if larger."""
+        if abs(len(a) - len(b)) > limit:
+            return limit + 1
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i]
+            for j, char_b in enumerate(b, 1):
+                current.append(min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b)
+                ))
+            if min(current) > limit:
+                return limit + 1
+            previous = current
+        return previous[-1]
+    
+    def _match_tokens(self, word):
+        """Score vocabulary tokens against one query word.
+        
+        Returns {token: quality} with quality in (0, 1]. Only tokens that
+        share the word's first character are considered.
+        """
+        matches = {}
+        for token in self._vocab_range(word):
+            matches[token] = 1.0 if token == word else 0.7 + 0.2 * len(word) / len(token)
+        if len(word) > 1:
+            for token in self._subsequence_tokens(word):
+                if token not in matches:
+                    matches[token] = 0.3 + 0.3 * len(word) / len(token)
+        
+        if len(word) >= 4:
+            # Typos: tokens sharing the first two characters, within one
+            # edit (two for long words); the length difference alone rules
+            # most of them out
+            limit = 1 if len(word) < 8 else 2
+            length = len(word)
+            for token in self._vocab_range(word[:2]):
+                if abs(len(token) - length) <= limit and matches.get(token, 0.0) < 0.6:
+                    distance = self.edit_distance(word, token, limit)
+                    if distance <= limit:
+                        matches[token] = 0.7 - 0.15 * distance
+        return matches
+    
+    def _entry_fields(self, entry):
+        """Get (title, host, path) token tuples of an entry."""
+        if entry[5] is None:
+            parts = urlsplit(entry[3])
+            host = parts.hostname or ""
+            if host.startswith("www."):
+                host = host[4:]
+            findall = self.TOKEN_RE.findall
+            entry[5] = (
+                tuple(findall(entry[2])),
+                tuple(findall(host)),
+                tuple(findall(parts.path + " " + parts.query))
+            )
+        return entry[5]
+    
+    def fuzzy_search(self, query, limit=50):
+        """Find bookmarks approximately matching ``query``, best first.
+        
+        Each query word is matched against the vocabulary once. Candidates
+        are scored by summing their best token quality per word, and only
+        the top ``limit`` of those are fully scored
+        with field weights and sorted. Returns (score, bookmark, location)
+        tuples.
+        """
+        query = query.lower().strip()
+        words = self.TOKEN_RE.findall(query)
+        if not words:
+            return []
+        
+        word_matches = []
+        candidates = {}
+        for word in words:
+            matches = self._match_tokens(word)
+            # Best quality per bookmark. Tokens are grouped by quality (it
+            # depends only on token length and match kind), and each group's
+            # postings are merged with set operations, best group first
+            groups = {}
+            for token, quality in matches.items():
+                groups.setdefault(quality, []).append(self.postings[token])
+            best = {}
+            for quality in sorted(groups, reverse=True):
+                if len(words) == 1 and len(best) >= limit and quality < 0.8:
+                    # A lone word's candidates are ranked by this quality,
+                    # so lower groups can't make the cut (initials are
+                    # worth 0.8 and still get their chance below)
+                    break
+                new_keys = set().union(*groups[quality]).difference(best)
+                best.update(dict.fromkeys(new_keys, quality))
+            for key in self.initials.get(word, ()):
+                if best.get(key, 0.0) < 0.8:
+                    best[key] = 0.8
+            if candidates:
+                for key, quality in best.items():
+                    candidates[key] = candidates.get(key, 0.0) + quality
+            else:
+                candidates = best
+            word_matches.append(matches)
+        
+        # Pre-select the top ``limit``: candidate scores take few distinct
+        # values, so find the lowest score that still makes the cut by
+        # counting them, then filter
+        counts = Counter(candidates.values())
+        threshold = None
+        above = 0
+        for score in sorted(counts, reverse=True):
+            if above + counts[score] >= limit:
+                threshold = score
+                break
+            above += counts[score]
+        if threshold is None:
+            top = list(candidates)
+        else:
+            top = [key for key, score in candidates.items() if score > threshold]
+            top.extend(islice(
+                (key for key, score in candidates.items() if score == threshold), limit - above
+            ))
+        
+        results = []
+        for key in top:
+            entry = self.entries[key]
+            fields = self._entry_fields(entry)
+            score = 0.0
+            for word, matches in zip(words, word_matches):
+                best = 0.0
+                for tokens, weight in zip(fields, self.FIELD_WEIGHTS):
+                    for token in tokens:
+                        quality = matches.get(token, 0.0) * weight
+                        if quality > best:
+                            best = quality
+                if key in self.initials.get(word, ()):
+                    best = max(best, 0.8)
+                score += best
+            score /= len(words)
+            if query in entry[2]:
+                score += 0.25
+            elif query in entry[3]:
+                score += 0.1
+            results.append((score, -entry[4], key))
+        
+        results.sort(reverse=True)
+        return [
+            (score, self.entries[key][0], self.entries[key][1])
+            for score, _, key in results
+        ]
+
+
+class BookmarksManager(QObject):
     """Manages browser bookmarks with JSON storage."""
     
+    ROOT_LOCATIONS = ("bookmarks_bar", "other_bookmarks")
+    
+    # Change notifications, emitted after the data has changed (removals
+    # are announced beforehand too). Mutations inside a batch() emit a
+    # single bookmarks_reset when it exits.
+    bookmarks_inserted = pyqtSignal(str, int, int)  # location, first row, last row
+    bookmark_about_to_be_removed = pyqtSignal(str, int)  # location, row
+    bookmark_removed = pyqtSignal(str, int)  # location, row
+    bookmark_changed = pyqtSignal(str, int)  # location, row
+    folder_created = pyqtSignal(str)
+    folder_deleted = pyqtSignal(str)
+    bookmarks_reset = pyqtSignal()
+    
     def __init__(self):
         """Initialize bookmarks manager."""
+        super().__init__()
         self.bookmarks_file = self.get_bookmarks_path()
         self.bookmarks = self.load_bookmarks()
+        
+        # Batch state (see batch())
+        self._batch_depth = 0
+        self._dirty = False
+        self._batch_snapshot = None
+        
+        # id -> (bookmark, location), id -> row in its location,
+        # url -> [(bookmark, location), ...] and the search index, all
+        # built lazily
+        self._id_index = None
+        self._row_index = None
+        self._url_index = None
+        self._search_index = None
+        
+        self._init_id_counter()
     
     @staticmethod
     def get_bookmarks_path():
@@ -43,7 +857,16 @@ class BookmarksManager:
         return bookmarks_dir / "bookmarks.json"
     
     def load_bookmarks(self):
-        """Load bookmarks from file."""
+        """Load bookmarks from file.
+        
+        Changes made while the SQLite backend was in use are written back
+        to the file first.
+        """
+        SQLiteBookmarksManager.export_pending(self.bookmarks_file)
+        return self._read_json()
+    
+    def _read_json(self):
+        """Read the bookmarks file, or the default structure without one."""
         if self.bookmarks_file.exists():
             try:
                 with open(self.bookmarks_file, 'r', encoding='utf-8') as f:
@@ -60,9 +883,43 @@ class BookmarksManager:
         return {
             "bookmarks_bar": [],
             "other_bookmarks": [],
-            "folders": {}
+            "folders": {},
+            "next_id": 1
         }
     
+    def _init_id_counter(self):
+        """Seed the persisted ID counter for stores that predate it.
+        
+        Older stores used microsecond timestamps as IDs, which could
+        collide; the counter starts above them and duplicates get new IDs.
+        """
+        if isinstance(self.bookmarks.get("next_id"), int):
+            return
+        
+        seen = set()
+        duplicates = []
+        highest = 0
+        for location, items in self.iter_locations():
+            for bookmark in items:
+                bookmark_id = bookmark.get("id")
+                if bookmark_id is None or bookmark_id in seen:
+                    duplicates.append((bookmark, location))
+                    continue
+                seen.add(bookmark_id)
+                try:
+                    highest = max(highest, int(bookmark_id))
+                except (TypeError, ValueError):
+                    pass
+        
+        self.bookmarks["next_id"] = highest + 1
+        old_ids = [bookmark.get("id") for bookmark, _ in duplicates]
+        for bookmark, _ in duplicates:
+            bookmark["id"] = self.generate_id()
+        for (bookmark, location), old_id in reversed(list(zip(duplicates, old_ids))):
+            self._store_id(bookmark, old_id, location)
+        if duplicates:
+            self.save_bookmarks()
+    
     def save_bookmarks(self):
         """Save bookmarks to file."""
         try:
@@ -71,6 +928,234 @@ class BookmarksManager:
         except IOError as e:
             print(f"Error saving bookmarks: {e}")
     
+    # Row-level persistence hooks. The JSON store rewrites the whole file
+    # in save_bookmarks, so they do nothing here; SQLiteBookmarksManager
+    # overrides them to write only the affected rows.
+    def _store_bookmark(self, bookmark, location):
+        """Persist a bookmark added to the end of a location."""
+    
+    def _store_update(self, bookmark):
+        """Persist a bookmark's changed title and URL."""
+    
+    def _store_id(self, bookmark, old_id, location):
+        """Persist a new ID given to a bookmark that shared ``old_id``.
+        
+        Bookmarks are renumbered from the last to the first, so this is
+        the last one in ``location`` still holding ``old_id``.
+        """
+    
+    def _store_delete(self, bookmark_ids):
+        """Persist the removal of bookmarks."""
+    
+    def _store_folder(self, folder_name):
+        """Persist a new folder."""
+    
+    def _store_delete_folder(self, folder_name):
+        """Persist the removal of a folder and its bookmarks."""
+    
+    @contextmanager
+    def batch(self):
+        """Group several mutations into one index update and one save.
+        
+        Inside the block, mutations skip incremental index maintenance and
+        persistence; both happen once when the outermost batch exits. If
+        the block raises, the locations it changed are put back as they
+        were before the outermost batch and nothing is saved.
+        
+            with manager.batch():
+                manager.remove_bookmarks(ids)
+                manager.add_bookmarks(entries)
+        """
+        if self._batch_depth == 0:
+            # Locations are copied as they are first changed; see
+            # _snapshot_location
+            self._batch_snapshot = {"next_id": self.bookmarks.get("next_id"), "locations": {}}
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._dirty = False
+                self._rollback(self._batch_snapshot)
+                self._batch_snapshot = None
+            raise
+        
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._batch_snapshot = None
+            if self._dirty:
+                self._dirty = False
+                self._invalidate_indexes()
+                self.save_bookmarks()
+                self.bookmarks_reset.emit()
+    
+    def _snapshot_location(self, location):
+        """Remember a location before a batch first changes it.
+        
+        Only the bookmarks of changed locations are copied, so rolling
+        back costs nothing for the rest of the store. Outside a batch this
+        does nothing.
+        """
+        if not self._batch_depth:
+            return
+        snapshot = self._batch_snapshot
+        if location in snapshot["locations"]:
+            return
+        items = self.get_location_items(location)
+        snapshot["locations"][location] = (
+            None if items is None else [dict(bookmark) for bookmark in items]
+        )
+        if location not in self.ROOT_LOCATIONS and "folders" not in snapshot:
+            # Keep the folder order in case folders are added or deleted
+            snapshot["folders"] = list(self.bookmarks.get("folders", {}))
+    
+    def _rollback(self, snapshot):
+        """Restore the locations a failed batch changed."""
+        folders = self.bookmarks.setdefault("folders", {})
+        for location, items in snapshot["locations"].items():
+            if location in self.ROOT_LOCATIONS:
+                self.bookmarks[location] = items
+            elif items is None:
+                folders.pop(location, None)
+            else:
+                folders[location] = items
+        if "folders" in snapshot:
+            order = {name: i for i, name in enumerate(snapshot["folders"])}
+            self.bookmarks["folders"] = dict(
+                sorted(folders.items(), key=lambda folder: order.get(folder[0], len(order)))
+            )
+        if snapshot["next_id"] is None:
+            self.bookmarks.pop("next_id", None)
+        else:
+            self.bookmarks["next_id"] = snapshot["next_id"]
+        self._invalidate_indexes()
+        self.bookmarks_reset.emit()
+    
+    def _commit(self, signal=None, *args):
+        """Persist a mutation and emit its change signal.
+        
+        Inside a batch both are deferred to the end of the batch.
+        """
+        if self._batch_depth:
+            self._dirty = True
+        else:
+            self.save_bookmarks()
+            if signal is not None:
+                signal.emit(*args)
+    
+    def iter_locations(self):
+        """Yield (location, bookmarks list) for every location."""
+        for location in self.ROOT_LOCATIONS:
+            yield location, self.bookmarks.setdefault(location, [])
+        yield from self.bookmarks.setdefault("folders", {}).items()
+    
+    def location_names(self):
+        """Get the names of all locations, in display order."""
+        return list(self.ROOT_LOCATIONS) + list(self.bookmarks.get("folders", {}))
+    
+    def get_location_items(self, location):
+        """Get the bookmarks list of a location, or None if it doesn't exist."""
+        if location in self.ROOT_LOCATIONS:
+            return self.bookmarks.setdefault(location, [])
+        return self.bookmarks.get("folders", {}).get(location)
+    
+    def _get_url_index(self):
+        """Get the URL index, rebuilding it if it was invalidated."""
+        if self._url_index is None:
+            index = {}
+            for location, items in self.iter_locations():
+                for bookmark in items:
+                    index.setdefault(bookmark.get("url"), []).append((bookmark, location))
+            self._url_index = index
+        return self._url_index
+    
+    def _get_id_index(self):
+        """Get the ID index, rebuilding it if it was invalidated."""
+        if self._id_index is None:
+            self._id_index = {
+                bookmark.get("id"): (bookmark, location)
+                for location, items in self.iter_locations()
+                for bookmark in items
+            }
+        return self._id_index
+    
+    def _get_row_index(self):
+        """Get the row index; bookmark_row fills it one location at a time."""
+        if self._row_index is None:
+            self._row_index = {}
+        return self._row_index
+    
+    def bookmark_row(self, bookmark, location):
+        """Get the row of a bookmark in its location, or None.
+        
+        Rows come from the row index. A location missing from it, or an
+        entry left stale by a bulk reorder, is caught by checking the row
+        and re-numbers only that location.
+        """
+        items = self.get_location_items(location)
+        if not items:
+            return None
+        rows = self._get_row_index()
+        bookmark_id = bookmark.get("id")
+        row = rows.get(bookmark_id)
+        if row is None or row >= len(items) or items[row] is not bookmark:
+            for i, item in enumerate(items):
+                rows[item.get("id")] = i
+            row = rows.get(bookmark_id)
+            if row is None or items[row] is not bookmark:
+                return None
+        return row
+    
+    def _get_search_index(self):
+        """Get the search index, rebuilding it if it was invalidated."""
+        if self._search_index is None:
+            index = BookmarkSearchIndex()
+            index.add_many(
+                (bookmark, location)
+                for location, items in self.iter_locations()
+                for bookmark in items
+            )
+            self._search_index = index
+        return self._search_index
+    
+    def _invalidate_indexes(self):
+        """Drop the indexes; they are rebuilt on next use."""
+        self._id_index = None
+        self._row_index = None
+        self._url_index = None
+        self._search_index = None
+    
+    def _index_add(self, bookmark, location):
+        """Record an added bookmark in the indexes."""
+        if self._batch_depth:
+            self._invalidate_indexes()
+            return
+        if self._id_index is not None:
+            self._id_index[bookmark.get("id")] = (bookmark, location)
+        if self._row_index is not None:
+            # New bookmarks are appended; an updated one keeps its row
+            self._row_index.setdefault(bookmark.get("id"), len(self.get_location_items(location)) - 1)
+        if self._url_index is not None:
+            self._url_index.setdefault(bookmark.get("url"), []).append((bookmark, location))
+        if self._search_index is not None:
+            self._search_index.add(bookmark, location)
+    
+    def _index_remove(self, bookmark):
+        """Drop a removed bookmark from the indexes."""
+        if self._batch_depth:
+            self._invalidate_indexes()
+            return
+        if self._id_index is not None:
+            self._id_index.pop(bookmark.get("id"), None)
+        if self._url_index is not None:
+            entries = self._url_index.get(bookmark.get("url"), [])
+            entries[:] = [entry for entry in entries if entry[0] is not bookmark]
+            if not entries:
+                self._url_index.pop(bookmark.get("url"), None)
+        if self._search_index is not None:
+            self._search_index.remove(bookmark)
+    
     def add_bookmark(self, url, title, folder="other_bookmarks"):
         """Add a bookmark."""
         bookmark = {
@@ -80,38 +1165,161 @@ class BookmarksManager:
             "id": self.generate_id()
         }
         
-        if folder in self.bookmarks:
-            self.bookmarks[folder].append(bookmark)
-        elif folder in self.bookmarks.get("folders", {}):
-            self.bookmarks["folders"][folder].append(bookmark)
-        else:
-            self.bookmarks["other_bookmarks"].append(bookmark)
+        if self.get_location_items(folder) is None:
+            folder = "other_bookmarks"
+        self._snapshot_location(folder)
+        items = self.get_location_items(folder)
+        items.append(bookmark)
+        self._index_add(bookmark, folder)
+        self._store_bookmark(bookmark, folder)
         
-        self.save_bookmarks()
+        self._commit(self.bookmarks_inserted, folder, len(items) - 1, len(items) - 1)
         return bookmark
     
-    def remove_bookmark(self, bookmark_id, folder=None):
-        """Remove a bookmark by ID."""
-        # Search in all locations
-        locations = ["bookmarks_bar", "other_bookmarks"]
-        locations.extend(self.bookmarks.get("folders", {}).keys())
+    def add_bookmarks(self, entries):
+        """Add many bookmarks in one batch.
         
-        for loc in locations:
-            if folder and loc != folder:
-                continue
+        ``entries`` is an iterable of dicts with ``url`` and ``title`` and
+        optional ``folder`` and ``date_added`` keys. Missing folders are
+        created and bookmarks already present in the same location are
+        skipped. Returns the list of added bookmarks.
+        """
+        existing = set()
+        for location, items in self.iter_locations():
+            for bookmark in items:
+                existing.add((location, bookmark.get("url")))
+        
+        added = []
+        with self.batch():
+            for entry in entries:
+                location = entry.get("folder") or "other_bookmarks"
+                url = entry["url"]
+                if (location, url) in existing:
+                    continue
+                existing.add((location, url))
                 
-            if loc in ["bookmarks_bar", "other_bookmarks"]:
-                items = self.bookmarks[loc]
-            else:
-                items = self.bookmarks["folders"].get(loc, [])
+                bookmark = {
+                    "url": url,
+                    "title": entry.get("title") or url,
+                    "date_added": entry.get("date_added") or datetime.now().isoformat(),
+                    "id": self.generate_id()
+                }
+                
+                self._snapshot_location(location)
+                items = self.get_location_items(location)
+                if items is None:
+                    items = self.bookmarks["folders"][location] = []
+                    self._store_folder(location)
+                items.append(bookmark)
+                added.append(bookmark)
+                self._store_bookmark(bookmark, location)
             
-            for i, bookmark in enumerate(items):
-                if bookmark.get("id") == bookmark_id:
-                    items.pop(i)
-                    self.save_bookmarks()
-                    return True
+            if added:
+                self._commit()
+        return added
+    
+    def find_bookmark(self, bookmark_id):
+        """Get (bookmark, location) for an ID, or (None, None)."""
+        return self._get_id_index().get(bookmark_id, (None, None))
+    
+    def _group_by_location(self, bookmark_ids):
+        """Group existing bookmark IDs by their location."""
+        index = self._get_id_index()
+        groups = {}
+        for bookmark_id in bookmark_ids:
+            entry = index.get(bookmark_id)
+            if entry is not None:
+                groups.setdefault(entry[1], set()).add(bookmark_id)
+        return groups
+    
+    def remove_bookmark(self, bookmark_id, folder=None):
+        """Remove a bookmark by ID."""
+        bookmark, loc = self.find_bookmark(bookmark_id)
+        if bookmark is None or (folder and loc != folder):
+            return False
         
-        return False
+        i = self.bookmark_row(bookmark, loc)
+        if i is None:
+            return False
+        
+        self._snapshot_location(loc)
+        items = self.get_location_items(loc)
+        if not self._batch_depth:
+            self.bookmark_about_to_be_removed.emit(loc, i)
+        items.pop(i)
+        self._index_remove(bookmark)
+        if self._row_index is not None:
+            # Bookmarks after the removed one move up a row
+            self._row_index.pop(bookmark_id, None)
+            for row in range(i, len(items)):
+                self._row_index[items[row].get("id")] = row
+        self._store_delete([bookmark_id])
+        self._commit(self.bookmark_removed, loc, i)
+        return True
+    
+    def remove_bookmarks(self, bookmark_ids):
+        """Remove many bookmarks by ID, one pass per affected location.
+        
+        Returns the number of bookmarks removed.
+        """
+        removed = 0
+        with self.batch():
+            for location, ids in self._group_by_location(bookmark_ids).items():
+                self._snapshot_location(location)
+                items = self.get_location_items(location)
+                items[:] = [b for b in items if b.get("id") not in ids]
+                self._store_delete(ids)
+                removed += len(ids)
+            if removed:
+                self._invalidate_indexes()
+                self._commit()
+        return removed
+    
+    def move_bookmarks(self, bookmark_ids, folder):
+        """Move many bookmarks to another location, one pass per source.
+        
+        Returns the number of bookmarks moved.
+        """
+        target = self.get_location_items(folder)
+        if target is None:
+            return 0
+        
+        moved = []
+        with self.batch():
+            for location, ids in self._group_by_location(bookmark_ids).items():
+                items = self.get_location_items(location)
+                if items is target:
+                    continue
+                self._snapshot_location(location)
+                kept = []
+                for bookmark in items:
+                    (moved if bookmark.get("id") in ids else kept).append(bookmark)
+                items[:] = kept
+            if moved:
+                self._snapshot_location(folder)
+                target.extend(moved)
+                for bookmark in moved:
+                    self._store_bookmark(bookmark, folder)
+                self._invalidate_indexes()
+                self._commit()
+        return len(moved)
+    
+    def update_bookmark(self, bookmark_id, title=None, url=None, folder=None):
+        """Update the title and/or URL of a bookmark."""
+        bookmark, loc = self.find_bookmark(bookmark_id)
+        if bookmark is None or (folder and loc != folder):
+            return False
+        
+        self._snapshot_location(loc)
+        self._index_remove(bookmark)
+        if title is not None:
+            bookmark["title"] = title
+        if url is not None:
+            bookmark["url"] = url
+        self._index_add(bookmark, loc)
+        self._store_update(bookmark)
+        self._commit(self.bookmark_changed, loc, self.bookmark_row(bookmark, loc))
+        return True
     
     def create_folder(self, folder_name):
         """Create a new bookmark folder."""
@@ -119,114 +1327,851 @@ class BookmarksManager:
             self.bookmarks["folders"] = {}
         
         if folder_name not in self.bookmarks["folders"]:
+            self._snapshot_location(folder_name)
             self.bookmarks["folders"][folder_name] = []
-            self.save_bookmarks()
+            self._store_folder(folder_name)
+            self._commit(self.folder_created, folder_name)
             return True
         return False
     
+    def delete_folder(self, folder_name):
+        """Delete a folder and all its bookmarks."""
+        folders = self.bookmarks.get("folders", {})
+        if folder_name not in folders:
+            return False
+        
+        self._snapshot_location(folder_name)
+        del folders[folder_name]
+        self._invalidate_indexes()
+        self._store_delete_folder(folder_name)
+        self._commit(self.folder_deleted, folder_name)
+        return True
+    
     def is_bookmarked(self, url):
         """Check if URL is bookmarked."""
         url_str = url if isinstance(url, str) else url.toString()
-        
-        # Check all locations
-        for bookmarks in [
-            self.bookmarks.get("bookmarks_bar", []),
-            self.bookmarks.get("other_bookmarks", [])
-        ]:
-            for bookmark in bookmarks:
-                if bookmark.get("url") == url_str:
-                    return True
-        
-        # Check folders
-        for folder_bookmarks in self.bookmarks.get("folders", {}).values():
-            for bookmark in folder_bookmarks:
-                if bookmark.get("url") == url_str:
-                    return True
-        
-        return False
+        return url_str in self._get_url_index()
     
     def get_bookmark_by_url(self, url):
         """Get bookmark by URL."""
         url_str = url if isinstance(url, str) else url.toString()
         
-        # Search all locations
-        for location in ["bookmarks_bar", "other_bookmarks"]:
-            for bookmark in self.bookmarks.get(location, []):
-                if bookmark.get("url") == url_str:
-                    return bookmark, location
-        
-        for folder_name, folder_bookmarks in self.bookmarks.get("folders", {}).items():
-            for bookmark in folder_bookmarks:
-                if bookmark.get("url") == url_str:
-                    return bookmark, folder_name
-        
+        entries = self._get_url_index().get(url_str)
+        if entries:
+            return entries[0]
         return None, None
     
     def search_bookmarks(self, query):
         """Search bookmarks by title or URL."""
-        results = []
-        query_lower = query.lower()
+        return self._get_search_index().search(query)
+    
+    def fuzzy_search_bookmarks(self, query, limit=50):
+        """Search bookmarks tolerating typos and abbreviations.
         
-        # Search all locations
-        for location in ["bookmarks_bar", "other_bookmarks"]:
-            for bookmark in self.bookmarks.get(location, []):
-                if (query_lower in bookmark.get("title", "").lower() or
-                    query_lower in bookmark.get("url", "").lower()):
-                    results.append((bookmark, location))
+        Returns up to ``limit`` (bookmark, location) tuples, best match first.
+        """
+        return [
+            (bookmark, location)
+            for _, bookmark, location in self._get_search_index().fuzzy_search(query, limit)
+        ]
+    
+    def generate_id(self):
+        """Allocate the next bookmark ID from the persisted counter."""
+        next_id = self.bookmarks.get("next_id", 1)
+        self.bookmarks["next_id"] = next_id + 1
+        return str(next_id)
+    
+    def import_bookmarks(self, filepath):
+        """Import bookmarks from a Netscape HTML file.
         
-        for folder_name, folder_bookmarks in self.bookmarks.get("folders", {}).items():
-            for bookmark in folder_bookmarks:
-                if (query_lower in bookmark.get("title", "").lower() or
-                    query_lower in bookmark.get("url", "").lower()):
-                    results.append((bookmark, folder_name))
+        Returns the number of bookmarks added, or None on error.
+        """
+        try:
+            return len(self.add_bookmarks(NetscapeBookmarkParser.iter_file(filepath)))
+        except (IOError, UnicodeError) as e:
+            print(f"Import error: {e}")
+            return None
+    
+    def find_duplicates(self):
+        """Analyze the bookmarks for duplicates and dead entries.
         
-        return results
+        See BookmarkDuplicateFinder.analyze for the report layout.
+        """
+        return BookmarkDuplicateFinder.analyze(BookmarkDuplicateFinder.snapshot(self))
     
-    def generate_id(self):
-        """Generate unique bookmark ID."""
-        import time
-        return str(int(time.time() * 1000000))
+    def merge_duplicates(self, report, remove_dead=False):
+        """Remove the redundant bookmarks of a report in one bulk operation.
+        
+        The first bookmark of each duplicate group is kept. Returns the
+        number of bookmarks removed.
+        """
+        bookmark_ids = BookmarkDuplicateFinder.redundant_ids(report["duplicates"])
+        if remove_dead:
+            bookmark_ids.extend(bookmark_id for bookmark_id, _ in report["dead"])
+        return self.remove_bookmarks(bookmark_ids)
+    
+    def export_snapshot(self):
+        """Copy the bookmarks into ``(location, bookmarks)`` pairs for export."""
+        return [
+            (location, [dict(bookmark) for bookmark in items])
+            for location, items in self.iter_locations()
+        ]
     
-    def export_bookmarks(self, filepath):
-        """Export bookmarks to HTML file."""
+    def export_bookmarks(self, filepath, fmt=None):
+        """Export bookmarks to an HTML, JSON or CSV file."""
+        return BookmarkExporter(self.export_snapshot()).write(filepath, fmt)
+
+
+class SQLiteBookmarksManager(BookmarksManager):
+    """BookmarksManager backed by a SQLite database instead of JSON.
+    
+    Folders and bookmarks live in their own tables. The in-memory layout
+    is the same as the JSON store's, but each mutation writes only its own
+    rows and save_bookmarks just commits the open transaction, so a batch
+    becomes a single transaction. A location's bookmarks are only read
+    when it is first used, and URL and ID lookups are answered by the
+    database until then, so opening the store reads just the folder list.
+    
+    The ``json_mtime`` and ``json_stale`` meta keys track the two stores
+    across backend switches: bookmarks.json is imported when it is new
+    or was changed after the last sync, and the JSON backend exports the
+    database back (see export_pending) when it has changes of its own.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS folders (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS bookmarks (
+            id TEXT PRIMARY KEY,
+            parent INTEGER NOT NULL REFERENCES folders(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            title TEXT,
+            date_added TEXT
+        );
+        CREATE INDEX IF NOT EXISTS bookmarks_url ON bookmarks(url);
+        CREATE INDEX IF NOT EXISTS bookmarks_parent ON bookmarks(parent, position);
+    """
+    
+    def __init__(self):
+        self.conn = None
+        self._folder_ids = {}
+        self._position = 0
+        self._migrating = False
+        self._unloaded = set()  # locations whose rows haven't been read yet
+        super().__init__()
+        if self._migrating:
+            self._migrate()
+    
+    @staticmethod
+    def get_database_path(bookmarks_file):
+        """Get the database path, next to bookmarks.json."""
+        return Path(bookmarks_file).with_name("bookmarks.db")
+    
+    @classmethod
+    def connect(cls, bookmarks_file):
+        """Open the database next to ``bookmarks_file``."""
+        conn = sqlite3.connect(cls.get_database_path(bookmarks_file))
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(cls.SCHEMA)
+        return conn
+    
+    @staticmethod
+    def _get_meta(conn, key):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+    
+    @staticmethod
+    def _json_mtime(bookmarks_file):
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write('<!DOCTYPE NETSCAPE-Bookmark-file-1>\n')
-                f.write('<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n')
-                f.write('<TITLE>Bookmarks</TITLE>\n')
-                f.write('<H1>Bookmarks</H1>\n')
-                f.write('<DL><p>\n')
-                
-                # Bookmarks bar
-                if self.bookmarks.get("bookmarks_bar"):
-                    f.write('    <DT><H3>Bookmarks Bar</H3>\n')
-                    f.write('    <DL><p>\n')
-                    for bookmark in self.bookmarks["bookmarks_bar"]:
-                        f.write(f'        <DT><A HREF="{bookmark["url"]}">{bookmark["title"]}</A>\n')
-                    f.write('    </DL><p>\n')
-                
-                # Other bookmarks
-                if self.bookmarks.get("other_bookmarks"):
-                    f.write('    <DT><H3>Other Bookmarks</H3>\n')
-                    f.write('    <DL><p>\n')
-                    for bookmark in self.bookmarks["other_bookmarks"]:
-                        f.write(f'        <DT><A HREF="{bookmark["url"]}">{bookmark["title"]}</A>\n')
-                    f.write('    </DL><p>\n')
-                
-                # Folders
-                for folder_name, folder_bookmarks in self.bookmarks.get("folders", {}).items():
-                    f.write(f'    <DT><H3>{folder_name}</H3>\n')
-                    f.write('    <DL><p>\n')
-                    for bookmark in folder_bookmarks:
-                        f.write(f'        <DT><A HREF="{bookmark["url"]}">{bookmark["title"]}</A>\n')
-                    f.write('    </DL><p>\n')
-                
-                f.write('</DL><p>\n')
+            return str(os.stat(bookmarks_file).st_mtime_ns)
+        except OSError:
+            return None
+    
+    @classmethod
+    def export_pending(cls, bookmarks_file):
+        """Write changes made in the database back to ``bookmarks_file``.
+        
+        Does nothing unless a database exists and was changed since it
+        was last in sync with the JSON file.
+        """
+        if not cls.get_database_path(bookmarks_file).exists():
+            return
+        try:
+            conn = cls.connect(bookmarks_file)
+        except sqlite3.Error as e:
+            print(f"Error exporting bookmarks: {e}")
+            return
+        try:
+            if cls._get_meta(conn, "json_stale") != "1":
+                return
+            bookmarks = {"bookmarks_bar": [], "other_bookmarks": [], "folders": {}}
+            locations = {}
+            for folder_id, name in conn.execute("SELECT id, name FROM folders ORDER BY id"):
+                if name in cls.ROOT_LOCATIONS:
+                    locations[folder_id] = bookmarks[name]
+                else:
+                    locations[folder_id] = bookmarks["folders"][name] = []
+            rows = conn.execute(
+                "SELECT id, parent, url, title, date_added FROM bookmarks "
+                "ORDER BY parent, position"
+            )
+            for bookmark_id, parent, url, title, date_added in rows:
+                locations[parent].append({
+                    "url": url,
+                    "title": title,
+                    "date_added": date_added,
+                    "id": bookmark_id
+                })
+            next_id = cls._get_meta(conn, "next_id")
+            if next_id is not None:
+                bookmarks["next_id"] = int(next_id)
             
-            return True
-        except Exception as e:
-            print(f"Export error: {e}")
+            with open(bookmarks_file, 'w', encoding='utf-8') as f:
+                json.dump(bookmarks, f, indent=2, ensure_ascii=False)
+            cls._set_meta(conn, "json_stale", 0)
+            cls._set_meta(conn, "json_mtime", cls._json_mtime(bookmarks_file) or "")
+            conn.commit()
+        except (sqlite3.Error, IOError, ValueError) as e:
+            print(f"Error exporting bookmarks: {e}")
+        finally:
+            conn.close()
+    
+    def load_bookmarks(self):
+        """Load the folder list from the database, or JSON if it is newer."""
+        self.conn = self.connect(self.bookmarks_file)
+        
+        self._folder_ids = dict(self.conn.execute("SELECT name, id FROM folders ORDER BY id"))
+        json_mtime = self._json_mtime(self.bookmarks_file)
+        synced_mtime = self._get_meta(self.conn, "json_mtime")
+        if not self._folder_ids or (json_mtime and synced_mtime and json_mtime != synced_mtime):
+            # New database, or the JSON backend has been used since
+            self._migrating = True
+            return self._read_json()
+        
+        bookmarks = self.get_default_structure()
+        for name in self._folder_ids:
+            if name not in self.ROOT_LOCATIONS:
+                bookmarks["folders"][name] = []
+        self._unloaded = set(self._folder_ids)
+        
+        try:
+            self._position = self.conn.execute(
+                "SELECT MAX(position) FROM bookmarks"
+            ).fetchone()[0] or 0
+            next_id = self._get_meta(self.conn, "next_id")
+            if next_id is not None:
+                bookmarks["next_id"] = int(next_id)
+            else:
+                del bookmarks["next_id"]
+        except sqlite3.Error as e:
+            print(f"Error loading bookmarks: {e}")
+        return bookmarks
+    
+    def _load_location(self, location, items):
+        """Read a location's bookmarks into its (empty) list."""
+        self._unloaded.discard(location)
+        folder_id = self._folder_ids.get(location)
+        if folder_id is None:
+            return
+        try:
+            rows = self.conn.execute(
+                "SELECT id, url, title, date_added FROM bookmarks "
+                "WHERE parent = ? ORDER BY position", (folder_id,)
+            )
+            items.extend(
+                {"url": url, "title": title, "date_added": date_added, "id": bookmark_id}
+                for bookmark_id, url, title, date_added in rows
+            )
+        except sqlite3.Error as e:
+            print(f"Error loading bookmarks: {e}")
+    
+    def get_location_items(self, location):
+        items = super().get_location_items(location)
+        if items is not None and location in self._unloaded:
+            self._load_location(location, items)
+        return items
+    
+    def iter_locations(self):
+        for location, items in super().iter_locations():
+            if location in self._unloaded:
+                self._load_location(location, items)
+            yield location, items
+    
+    def _find_in_location(self, location, bookmark_id):
+        """Get a bookmark of a location by ID, reading the location if needed."""
+        for bookmark in self.get_location_items(location) or ():
+            if bookmark.get("id") == bookmark_id:
+                return bookmark, location
+        return None, None
+    
+    def find_bookmark(self, bookmark_id):
+        if not self._unloaded or self._id_index is not None:
+            return super().find_bookmark(bookmark_id)
+        row = self.conn.execute(
+            "SELECT folders.name FROM bookmarks JOIN folders ON folders.id = bookmarks.parent "
+            "WHERE bookmarks.id = ?", (bookmark_id,)
+        ).fetchone()
+        return (None, None) if row is None else self._find_in_location(row[0], bookmark_id)
+    
+    def is_bookmarked(self, url):
+        if not self._unloaded or self._url_index is not None:
+            return super().is_bookmarked(url)
+        url_str = url if isinstance(url, str) else url.toString()
+        return self.conn.execute(
+            "SELECT 1 FROM bookmarks WHERE url = ? LIMIT 1", (url_str,)
+        ).fetchone() is not None
+    
+    def get_bookmark_by_url(self, url):
+        if not self._unloaded or self._url_index is not None:
+            return super().get_bookmark_by_url(url)
+        url_str = url if isinstance(url, str) else url.toString()
+        row = self.conn.execute(
+            "SELECT bookmarks.id, folders.name FROM bookmarks "
+            "JOIN folders ON folders.id = bookmarks.parent "
+            "WHERE bookmarks.url = ? ORDER BY bookmarks.parent, bookmarks.position LIMIT 1",
+            (url_str,)
+        ).fetchone()
+        return (None, None) if row is None else self._find_in_location(row[1], row[0])
+    
+    def _migrate(self):
+        """Replace the database contents with the bookmarks read from JSON."""
+        self._migrating = False
+        self.conn.execute("DELETE FROM folders")
+        self._folder_ids = {}
+        self._position = 0
+        rows = []
+        for location, items in self.iter_locations():
+            self._store_folder(location)
+            for bookmark in items:
+                self._position += 1
+                rows.append((
+                    bookmark.get("id"), self._folder_ids[location], self._position,
+                    bookmark.get("url", ""), bookmark.get("title"), bookmark.get("date_added")
+                ))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO bookmarks (id, parent, position, url, title, date_added) "
+            "VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        self.save_bookmarks()
+        try:
+            self._set_meta(self.conn, "json_stale", 0)
+            self._set_meta(self.conn, "json_mtime", self._json_mtime(self.bookmarks_file) or "")
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error saving bookmarks: {e}")
+    
+    def save_bookmarks(self):
+        """Commit the pending row changes."""
+        try:
+            self._set_meta(self.conn, "next_id", self.bookmarks.get("next_id", 1))
+            self._set_meta(self.conn, "json_stale", 1)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error saving bookmarks: {e}")
+    
+    def _rollback(self, snapshot):
+        """Drop the failed batch's uncommitted rows as well."""
+        try:
+            self.conn.rollback()
+            self._folder_ids = dict(self.conn.execute("SELECT name, id FROM folders ORDER BY id"))
+        except sqlite3.Error as e:
+            print(f"Error rolling back bookmarks: {e}")
+        super()._rollback(snapshot)
+    
+    def close(self):
+        """Close the database connection."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    def _store_bookmark(self, bookmark, location):
+        self._position += 1
+        self.conn.execute(
+            "INSERT OR REPLACE INTO bookmarks (id, parent, position, url, title, date_added) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (bookmark.get("id"), self._folder_ids[location], self._position,
+             bookmark.get("url", ""), bookmark.get("title"), bookmark.get("date_added"))
+        )
+    
+    def _store_update(self, bookmark):
+        self.conn.execute(
+            "UPDATE bookmarks SET url = ?, title = ? WHERE id = ?",
+            (bookmark.get("url", ""), bookmark.get("title"), bookmark.get("id"))
+        )
+    
+    def _store_id(self, bookmark, old_id, location):
+        self.conn.execute(
+            "UPDATE bookmarks SET id = ? WHERE rowid = ("
+            "SELECT rowid FROM bookmarks WHERE id IS ? AND parent = ? "
+            "ORDER BY position DESC LIMIT 1)",
+            (bookmark.get("id"), old_id, self._folder_ids.get(location))
+        )
+    
+    def _store_delete(self, bookmark_ids):
+        self.conn.executemany(
+            "DELETE FROM bookmarks WHERE id = ?",
+            ((bookmark_id,) for bookmark_id in bookmark_ids)
+        )
+    
+    def _store_folder(self, folder_name):
+        if folder_name in self._folder_ids:
+            return
+        cursor = self.conn.execute("INSERT INTO folders (name) VALUES (?)", (folder_name,))
+        self._folder_ids[folder_name] = cursor.lastrowid
+    
+    def _store_delete_folder(self, folder_name):
+        self._unloaded.discard(folder_name)
+        folder_id = self._folder_ids.pop(folder_name, None)
+        if folder_id is not None:
+            self.conn.execute("DELETE FROM folders WHERE id = ?", (folder_id,))
+
+
+class _LocationKey:
+    """Stable internal pointer identifying a location in BookmarksModel."""
+    
+    __slots__ = ("location",)
+    
+    def __init__(self, location):
+        self.location = location
+
+
+class BookmarksModel(QAbstractItemModel):
+    """Lazy tree model over BookmarksManager data.
+    
+    Top-level rows are locations (bookmarks bar, other bookmarks and
+    folders). Their bookmarks are read straight from the manager's lists
+    and revealed in chunks through fetchMore as folders expand, so no
+    per-bookmark items are built up front. Manager change signals are
+    translated into row insert/remove notifications.
+    
+    A row filter (see set_row_filter) narrows each location to a sorted
+    list of bookmark rows, which are fetched the same way; searches use
+    it so only matches are ever turned into rows.
+    """
+    
+    COLUMNS = ["Title", "URL", "Date Added"]
+    FETCH_CHUNK = 256
+    LocationRole = Qt.ItemDataRole.UserRole + 1
+    
+    LOCATION_NAMES = {
+        "bookmarks_bar": "Bookmarks Bar",
+        "other_bookmarks": "Other Bookmarks",
+    }
+    LOCATION_ICONS = {
+        "bookmarks_bar": 'fa5s.star',
+        "other_bookmarks": 'fa5s.bookmark',
+    }
+    
+    def __init__(self, bookmarks_manager, parent=None, favicon_store=None):
+        super().__init__(parent)
+        self.bookmarks_manager = bookmarks_manager
+        self.favicon_store = favicon_store
+        self._keys = {}  # location -> _LocationKey, kept alive for internal pointers
+        self._icons = {}
+        # Set while a row change is being reported. Manager signals arrive
+        # after the data changed, so fetching then would count rows twice.
+        self._changing = False
+        self._filter = None  # location -> sorted bookmark rows to show, or None
+        self._load_locations()
+        
+        bookmarks_manager.bookmarks_inserted.connect(self._on_bookmarks_inserted)
+        bookmarks_manager.bookmark_about_to_be_removed.connect(
+            self._on_bookmark_about_to_be_removed
+        )
+        bookmarks_manager.bookmark_removed.connect(self._on_bookmark_removed)
+        bookmarks_manager.bookmark_changed.connect(self._on_bookmark_changed)
+        bookmarks_manager.folder_created.connect(self._on_folder_created)
+        bookmarks_manager.folder_deleted.connect(self._on_folder_deleted)
+        bookmarks_manager.bookmarks_reset.connect(self._on_reset)
+        if favicon_store is not None:
+            favicon_store.icon_changed.connect(self._on_icon_changed)
+    
+    def detach(self):
+        """Stop following the manager and the favicon store."""
+        manager = self.bookmarks_manager
+        manager.bookmarks_inserted.disconnect(self._on_bookmarks_inserted)
+        manager.bookmark_about_to_be_removed.disconnect(self._on_bookmark_about_to_be_removed)
+        manager.bookmark_removed.disconnect(self._on_bookmark_removed)
+        manager.bookmark_changed.disconnect(self._on_bookmark_changed)
+        manager.folder_created.disconnect(self._on_folder_created)
+        manager.folder_deleted.disconnect(self._on_folder_deleted)
+        manager.bookmarks_reset.disconnect(self._on_reset)
+        if self.favicon_store is not None:
+            self.favicon_store.icon_changed.disconnect(self._on_icon_changed)
+    
+    def _load_locations(self):
+        """Snapshot the location list; bookmarks are fetched on demand."""
+        self._locations = self.bookmarks_manager.location_names()
+        self._location_rows = {location: row for row, location in enumerate(self._locations)}
+        self._fetched = {}
+    
+    def _key(self, location):
+        key = self._keys.get(location)
+        if key is None:
+            key = self._keys[location] = _LocationKey(location)
+        return key
+    
+    def _icon(self, name):
+        if name not in self._icons:
+            self._icons[name] = qta.icon(name)
+        return self._icons[name]
+    
+    # --- Helpers ---
+    
+    def set_row_filter(self, rows):
+        """Show only some bookmarks of each location, or all with None.
+        
+        ``rows`` maps locations to sorted rows in their bookmark lists;
+        locations missing from it show no bookmarks.
+        """
+        self._changing = True
+        self.beginResetModel()
+        self._filter = rows
+        self._fetched = {}
+        self.endResetModel()
+        self._changing = False
+    
+    def _row_count(self, location):
+        """Get how many rows a location can show once fully fetched."""
+        if self._filter is not None:
+            return len(self._filter.get(location, ()))
+        return len(self.bookmarks_manager.get_location_items(location) or [])
+    
+    def _model_row(self, location, row):
+        """Map a row in a location's bookmark list to a model row, or None."""
+        if self._filter is None:
+            return row
+        rows = self._filter.get(location, [])
+        i = bisect.bisect_left(rows, row)
+        return i if i < len(rows) and rows[i] == row else None
+    
+    def is_folder(self, index):
+        """Check whether an index is a location row."""
+        return index.isValid() and index.internalPointer() is None
+    
+    def location_for_index(self, index):
+        """Get the location of a folder or bookmark index."""
+        if not index.isValid():
+            return None
+        key = index.internalPointer()
+        if key is None:
+            return self._locations[index.row()]
+        return key.location
+    
+    def bookmark_for_index(self, index):
+        """Get the bookmark dict of a bookmark index, or None."""
+        if not index.isValid() or index.internalPointer() is None:
+            return None
+        location = index.internalPointer().location
+        row = index.row()
+        if self._filter is not None:
+            rows = self._filter.get(location, [])
+            if row >= len(rows):
+                return None
+            row = rows[row]
+        items = self.bookmarks_manager.get_location_items(location)
+        if items is None or row >= len(items):
+            return None
+        return items[row]
+    
+    def folder_index(self, location):
+        """Get the top-level index of a location."""
+        row = self._location_rows.get(location)
+        if row is None:
+            return QModelIndex()
+        return self.createIndex(row, 0, None)
+    
+    def location_display_name(self, location):
+        return self.LOCATION_NAMES.get(location, location)
+    
+    # --- QAbstractItemModel ---
+    
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, None)
+        return self.createIndex(row, column, self._key(self._locations[parent.row()]))
+    
+    def parent(self, index):
+        if not index.isValid() or index.internalPointer() is None:
+            return QModelIndex()
+        return self.folder_index(index.internalPointer().location)
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        if not parent.isValid():
+            return len(self._locations)
+        if parent.internalPointer() is None:
+            return self._fetched.get(self._locations[parent.row()], 0)
+        return 0
+    
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+    
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._locations)
+        if parent.internalPointer() is None and parent.column() == 0:
+            return self._row_count(self._locations[parent.row()]) > 0
+        return False
+    
+    def canFetchMore(self, parent):
+        if self._changing or not self.is_folder(parent):
             return False
+        location = self._locations[parent.row()]
+        return self._fetched.get(location, 0) < self._row_count(location)
+    
+    def fetchMore(self, parent):
+        if not self.is_folder(parent):
+            return
+        location = self._locations[parent.row()]
+        fetched = self._fetched.get(location, 0)
+        count = min(self.FETCH_CHUNK, self._row_count(location) - fetched)
+        if count <= 0:
+            return
+        self._changing = True
+        self.beginInsertRows(parent, fetched, fetched + count - 1)
+        self._fetched[location] = fetched + count
+        self.endInsertRows()
+        self._changing = False
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        column = index.column()
+        if index.internalPointer() is None:
+            location = self._locations[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole and column == 0:
+                return self.location_display_name(location)
+            if role == Qt.ItemDataRole.DecorationRole and column == 0 and HAS_ICONS:
+                return self._icon(self.LOCATION_ICONS.get(location, 'fa5s.folder'))
+            if role == self.LocationRole:
+                return location
+            return None
+        
+        bookmark = self.bookmark_for_index(index)
+        if bookmark is None:
+            return None
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return bookmark.get("title", "Untitled")
+            if column == 1:
+                return bookmark.get("url", "")
+            if column == 2:
+                return self.format_date(bookmark.get("date_added", ""))
+        elif role == Qt.ItemDataRole.DecorationRole and column == 0:
+            if self.favicon_store is not None:
+                icon = self.favicon_store.icon_for_url(bookmark.get("url", ""))
+                if icon is not None:
+                    return icon
+            if HAS_ICONS:
+                return self._icon('fa5s.link')
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            return bookmark.get("url", "")
+        elif role == Qt.ItemDataRole.UserRole:
+            return bookmark.get("id")
+        elif role == self.LocationRole:
+            return index.internalPointer().location
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+    
+    @staticmethod
+    def format_date(date_str):
+        """Format an ISO date for display."""
+        if date_str:
+            try:
+                return datetime.fromisoformat(date_str).strftime("%Y-%m-%d %H:%M")
+            except ValueError:
+                pass
+        return date_str
+    
+    # --- Manager signals ---
+    
+    def _on_bookmarks_inserted(self, location, first, last):
+        if self._filter is not None:
+            # Shift the filtered rows after the insert; whether the new
+            # bookmarks match is up to whoever set the filter
+            rows = self._filter.get(location, [])
+            for i in range(bisect.bisect_left(rows, first), len(rows)):
+                rows[i] += last - first + 1
+            return
+        row = self._location_rows.get(location)
+        fetched = self._fetched.get(location, 0)
+        if row is None or first > fetched:
+            # Not fetched this far yet; fetchMore will reveal the new rows
+            return
+        self._changing = True
+        self.beginInsertRows(self.folder_index(location), first, last)
+        self._fetched[location] = fetched + (last - first + 1)
+        self.endInsertRows()
+        self._changing = False
+    
+    def _on_bookmark_about_to_be_removed(self, location, row):
+        row = self._model_row(location, row)
+        if location not in self._location_rows or row is None or row >= self._fetched.get(location, 0):
+            return
+        self._changing = True
+        self.beginRemoveRows(self.folder_index(location), row, row)
+    
+    def _on_bookmark_removed(self, location, row):
+        if self._filter is not None:
+            rows = self._filter.get(location, [])
+            i = bisect.bisect_left(rows, row)
+            if i < len(rows) and rows[i] == row:
+                del rows[i]
+            for i in range(i, len(rows)):
+                rows[i] -= 1
+        if not self._changing:
+            return
+        self._fetched[location] -= 1
+        self.endRemoveRows()
+        self._changing = False
+    
+    def _on_bookmark_changed(self, location, row):
+        row = self._model_row(location, row)
+        if location not in self._location_rows or row is None or row >= self._fetched.get(location, 0):
+            return
+        parent = self.folder_index(location)
+        self.dataChanged.emit(
+            self.index(row, 0, parent), self.index(row, len(self.COLUMNS) - 1, parent)
+        )
+    
+    def _on_icon_changed(self, host):
+        # Cheaper than finding the rows on that host: one range per location
+        for location, fetched in self._fetched.items():
+            if fetched:
+                parent = self.folder_index(location)
+                self.dataChanged.emit(
+                    self.index(0, 0, parent), self.index(fetched - 1, 0, parent),
+                    [Qt.ItemDataRole.DecorationRole]
+                )
+    
+    def _on_folder_created(self, location):
+        row = len(self._locations)
+        self._changing = True
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._locations.append(location)
+        self._location_rows[location] = row
+        self.endInsertRows()
+        self._changing = False
+    
+    def _on_folder_deleted(self, location):
+        row = self._location_rows.get(location)
+        if row is None:
+            return
+        self._changing = True
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._locations[row]
+        self._location_rows = {loc: i for i, loc in enumerate(self._locations)}
+        self._fetched.pop(location, None)
+        if self._filter is not None:
+            self._filter.pop(location, None)
+        self.endRemoveRows()
+        self._changing = False
+    
+    def _on_reset(self):
+        self._changing = True
+        self.beginResetModel()
+        self._filter = None  # its rows may be gone; searches set it again
+        self._load_locations()
+        self.endResetModel()
+        self._changing = False
+
+
+class BookmarksFilterProxyModel(QSortFilterProxyModel):
+    """Filters BookmarksModel rows to the results of an indexed search.
+    
+    The matches come from BookmarksManager.search_bookmarks and are
+    mapped to their rows, which become the source model's row filter,
+    so only matched bookmarks are ever fetched and checked. The proxy
+    itself hides the folders without matches.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.query = ""
+        self.matched_locations = set()
+    
+    def set_query(self, query):
+        """Set the search query and re-filter."""
+        self.query = query
+        model = self.sourceModel()
+        rows = None
+        if query:
+            manager = model.bookmarks_manager
+            # Fall back to approximate matches when nothing contains the query
+            results = (manager.search_bookmarks(query) or
+                       manager.fuzzy_search_bookmarks(query))
+            rows = {}  # location -> matched rows
+            for bookmark, location in results:
+                row = manager.bookmark_row(bookmark, location)
+                if row is not None:
+                    rows.setdefault(location, []).append(row)
+            for location_rows in rows.values():
+                location_rows.sort()
+        self.matched_locations = set(rows or ())
+        model.set_row_filter(rows)
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.query or source_parent.isValid():
+            return True  # bookmark rows are already narrowed by the model
+        model = self.sourceModel()
+        return model.location_for_index(model.index(source_row, 0)) in self.matched_locations
+
+
+class BookmarkExportThread(QThread):
+    """Runs a BookmarkExporter off the GUI thread."""
+    
+    progress = pyqtSignal(int, int)
+    export_finished = pyqtSignal(bool)
+    
+    def __init__(self, snapshot, filepath, fmt=None, parent=None):
+        super().__init__(parent)
+        self.exporter = BookmarkExporter(snapshot)
+        self.filepath = filepath
+        self.fmt = fmt
+    
+    def run(self):
+        ok = self.exporter.write(
+            self.filepath, self.fmt,
+            progress=self.progress.emit,
+            should_stop=self.isInterruptionRequested
+        )
+        self.export_finished.emit(ok)
+
+
+class BookmarkAnalysisThread(QThread):
+    """Runs BookmarkDuplicateFinder off the GUI thread."""
+    
+    analysis_finished = pyqtSignal(object)
+    
+    def __init__(self, snapshot, parent=None):
+        super().__init__(parent)
+        self.snapshot = snapshot
+    
+    def run(self):
+        self.analysis_finished.emit(BookmarkDuplicateFinder.analyze(self.snapshot))
 
 
 class BookmarksDialog(QDialog):
@@ -234,13 +2179,16 @@ class BookmarksDialog(QDialog):
     
     bookmark_activated = pyqtSignal(str)  # URL
     
-    def __init__(self, bookmarks_manager, parent=None):
+    def __init__(self, bookmarks_manager, parent=None, favicon_store=None):
         super().__init__(parent)
         self.bookmarks_manager = bookmarks_manager
+        self.favicon_store = favicon_store
+        self.export_thread = None
+        self.export_progress = None
+        self.analysis_thread = None
         self.setWindowTitle("Bookmarks Manager")
         self.setMinimumSize(800, 600)
         self.init_ui()
-        self.load_bookmarks_tree()
     
     def init_ui(self):
         """Initialize UI."""
@@ -259,6 +2207,8 @@ class BookmarksDialog(QDialog):
             toolbar.addSeparator()
             import_action = toolbar.addAction(qta.icon('fa5s.file-import'), "Import")
             export_action = toolbar.addAction(qta.icon('fa5s.file-export'), "Export")
+            toolbar.addSeparator()
+            duplicates_action = toolbar.addAction(qta.icon('fa5s.clone'), "Find Duplicates")
         else:
             add_action = toolbar.addAction("Add")
             folder_action = toolbar.addAction("New Folder")
@@ -266,12 +2216,15 @@ class BookmarksDialog(QDialog):
             toolbar.addSeparator()
             import_action = toolbar.addAction("Import")
             export_action = toolbar.addAction("Export")
+            toolbar.addSeparator()
+            duplicates_action = toolbar.addAction("Find Duplicates")
         
         add_action.triggered.connect(self.add_bookmark)
         folder_action.triggered.connect(self.add_folder)
         delete_action.triggered.connect(self.delete_selected)
         import_action.triggered.connect(self.import_bookmarks)
         export_action.triggered.connect(self.export_bookmarks)
+        duplicates_action.triggered.connect(self.find_duplicates)
         
         layout.addWidget(toolbar)
         
@@ -291,13 +2244,28 @@ class BookmarksDialog(QDialog):
         layout.addWidget(search_widget)
         
         # Bookmarks tree
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Title", "URL", "Date Added"])
+        self.model = BookmarksModel(self.bookmarks_manager, self, self.favicon_store)
+        self.proxy = BookmarksFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        
+        self.tree = QTreeView()
+        self.tree.setModel(self.proxy)
+        self.tree.setUniformRowHeights(True)
         self.tree.setColumnWidth(0, 300)
         self.tree.setColumnWidth(1, 350)
         self.tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self.show_context_menu)
-        self.tree.itemDoubleClicked.connect(self.open_bookmark)
+        self.tree.doubleClicked.connect(lambda index: self.open_bookmark(self.source_index(index)))
+        self.tree.setSelectionMode(QTreeView.SelectionMode.ExtendedSelection)
+        self.tree.setSelectionBehavior(QTreeView.SelectionBehavior.SelectRows)
+        
+        for location in BookmarksManager.ROOT_LOCATIONS:
+            self.tree.expand(self.proxy.mapFromSource(self.model.folder_index(location)))
+        
+        # Keep an active search in sync with edits
+        self.bookmarks_manager.bookmarks_inserted.connect(self.refresh_filter)
+        self.bookmarks_manager.bookmark_changed.connect(self.refresh_filter)
+        self.bookmarks_manager.bookmarks_reset.connect(self.refresh_filter)
         
         layout.addWidget(self.tree)
         
@@ -311,156 +2279,84 @@ class BookmarksDialog(QDialog):
         
         layout.addLayout(button_layout)
     
-    def load_bookmarks_tree(self):
-        """Load bookmarks into tree."""
-        self.tree.clear()
-        bookmarks = self.bookmarks_manager.bookmarks
-        
-        # Bookmarks bar
-        if bookmarks.get("bookmarks_bar"):
-            bar_item = QTreeWidgetItem(self.tree, ["Bookmarks Bar", "", ""])
-            bar_item.setData(0, Qt.ItemDataRole.UserRole, "bookmarks_bar")
-            if HAS_ICONS:
-                bar_item.setIcon(0, qta.icon('fa5s.star'))
-            
-            for bookmark in bookmarks["bookmarks_bar"]:
-                self.add_bookmark_item(bar_item, bookmark, "bookmarks_bar")
-            
-            bar_item.setExpanded(True)
-        
-        # Other bookmarks
-        if bookmarks.get("other_bookmarks"):
-            other_item = QTreeWidgetItem(self.tree, ["Other Bookmarks", "", ""])
-            other_item.setData(0, Qt.ItemDataRole.UserRole, "other_bookmarks")
-            if HAS_ICONS:
-                other_item.setIcon(0, qta.icon('fa5s.bookmark'))
-            
-            for bookmark in bookmarks["other_bookmarks"]:
-                self.add_bookmark_item(other_item, bookmark, "other_bookmarks")
-            
-            other_item.setExpanded(True)
-        
-        # Folders
-        for folder_name, folder_bookmarks in bookmarks.get("folders", {}).items():
-            folder_item = QTreeWidgetItem(self.tree, [folder_name, "", ""])
-            folder_item.setData(0, Qt.ItemDataRole.UserRole, f"folder:{folder_name}")
-            if HAS_ICONS:
-                folder_item.setIcon(0, qta.icon('fa5s.folder'))
-            
-            for bookmark in folder_bookmarks:
-                self.add_bookmark_item(folder_item, bookmark, folder_name)
-            
-            folder_item.setExpanded(True)
+    def source_index(self, index):
+        """Map a view index to a column-0 BookmarksModel index."""
+        index = self.proxy.mapToSource(index)
+        return index.siblingAtColumn(0) if index.isValid() else index
     
-    def add_bookmark_item(self, parent, bookmark, location):
-        """Add bookmark to tree."""
-        date_str = bookmark.get("date_added", "")
-        if date_str:
-            try:
-                date_obj = datetime.fromisoformat(date_str)
-                date_str = date_obj.strftime("%Y-%m-%d %H:%M")
-            except:
-                pass
-        
-        item = QTreeWidgetItem(parent, [
-            bookmark.get("title", "Untitled"),
-            bookmark.get("url", ""),
-            date_str
-        ])
-        item.setData(0, Qt.ItemDataRole.UserRole, bookmark.get("id"))
-        item.setData(1, Qt.ItemDataRole.UserRole, location)
-        
-        if HAS_ICONS:
-            item.setIcon(0, qta.icon('fa5s.link'))
-        
-        return item
+    def selected_indexes(self):
+        """Get source indexes of the selected rows."""
+        return [
+            self.source_index(index)
+            for index in self.tree.selectionModel().selectedRows(0)
+        ]
+    
+    def selected_bookmark_ids(self):
+        """Get IDs of the selected bookmarks (folders are skipped)."""
+        return [
+            index.data(Qt.ItemDataRole.UserRole)
+            for index in self.selected_indexes()
+            if not self.model.is_folder(index)
+        ]
     
     def filter_bookmarks(self, query):
         """Filter bookmarks by search query."""
-        if not query:
-            # Show all
-            for i in range(self.tree.topLevelItemCount()):
-                item = self.tree.topLevelItem(i)
-                self.show_item_recursive(item, True)
+        self.proxy.set_query(query)
+        if query:
+            self.tree.expandAll()
         else:
-            # Hide non-matching
-            query_lower = query.lower()
-            for i in range(self.tree.topLevelItemCount()):
-                item = self.tree.topLevelItem(i)
-                self.filter_item_recursive(item, query_lower)
+            for location in BookmarksManager.ROOT_LOCATIONS:
+                self.tree.expand(self.proxy.mapFromSource(self.model.folder_index(location)))
     
-    def filter_item_recursive(self, item, query):
-        """Recursively filter items."""
-        has_visible_child = False
-        
-        for i in range(item.childCount()):
-            child = item.child(i)
-            child_visible = self.filter_item_recursive(child, query)
-            has_visible_child = has_visible_child or child_visible
-        
-        # Check if this item matches
-        title = item.text(0).lower()
-        url = item.text(1).lower()
-        matches = query in title or query in url
-        
-        visible = matches or has_visible_child
-        item.setHidden(not visible)
-        
-        return visible
-    
-    def show_item_recursive(self, item, visible):
-        """Recursively show/hide items."""
-        item.setHidden(not visible)
-        for i in range(item.childCount()):
-            self.show_item_recursive(item.child(i), visible)
+    def refresh_filter(self, *args):
+        """Re-run the current search after the bookmarks changed."""
+        if self.proxy.query:
+            self.filter_bookmarks(self.proxy.query)
     
     def show_context_menu(self, pos):
         """Show context menu."""
-        item = self.tree.itemAt(pos)
-        if not item:
+        index = self.source_index(self.tree.indexAt(pos))
+        if not index.isValid():
             return
         
         menu = QMenu(self)
         
-        # Check if it's a bookmark or folder
-        bookmark_id = item.data(0, Qt.ItemDataRole.UserRole)
-        
-        if item.childCount() == 0 and item.text(1):  # It's a bookmark
+        if not self.model.is_folder(index):  # It's a bookmark
             if HAS_ICONS:
                 open_action = menu.addAction(qta.icon('fa5s.external-link-alt'), "Open")
                 open_new_action = menu.addAction(qta.icon('fa5s.window-maximize'), "Open in New Tab")
                 menu.addSeparator()
                 edit_action = menu.addAction(qta.icon('fa5s.edit'), "Edit")
+                move_action = menu.addAction(qta.icon('fa5s.folder-open'), "Move to...")
                 delete_action = menu.addAction(qta.icon('fa5s.trash'), "Delete")
             else:
                 open_action = menu.addAction("Open")
                 open_new_action = menu.addAction("Open in New Tab")
                 menu.addSeparator()
                 edit_action = menu.addAction("Edit")
+                move_action = menu.addAction("Move to...")
                 delete_action = menu.addAction("Delete")
             
-            open_action.triggered.connect(lambda: self.open_bookmark(item))
-            open_new_action.triggered.connect(lambda: self.open_bookmark(item, new_tab=True))
-            edit_action.triggered.connect(lambda: self.edit_bookmark(item))
-            delete_action.triggered.connect(lambda: self.delete_bookmark(item))
+            open_action.triggered.connect(lambda: self.open_bookmark(index))
+            open_new_action.triggered.connect(lambda: self.open_bookmark(index, new_tab=True))
+            edit_action.triggered.connect(lambda: self.edit_bookmark(index))
+            move_action.triggered.connect(self.move_selected)
+            delete_action.triggered.connect(lambda: self.delete_bookmark(index))
         else:  # It's a folder
             if HAS_ICONS:
                 delete_action = menu.addAction(qta.icon('fa5s.trash'), "Delete Folder")
             else:
                 delete_action = menu.addAction("Delete Folder")
             
-            delete_action.triggered.connect(lambda: self.delete_folder(item))
+            delete_action.triggered.connect(lambda: self.delete_folder(index))
         
         menu.exec(QCursor.pos())
     
-    def open_bookmark(self, item, column=0, new_tab=False):
+    def open_bookmark(self, index, new_tab=False):
         """Open selected bookmark."""
-        if item.childCount() > 0:  # It's a folder
-            return
-        
-        url = item.text(1)
-        if url:
-            self.bookmark_activated.emit(url)
+        bookmark = self.model.bookmark_for_index(index)
+        if bookmark and bookmark.get("url"):
+            self.bookmark_activated.emit(bookmark["url"])
             if not new_tab:
                 self.accept()
     
@@ -475,70 +2371,56 @@ class BookmarksDialog(QDialog):
             return
         
         self.bookmarks_manager.add_bookmark(url, title)
-        self.load_bookmarks_tree()
     
     def add_folder(self):
         """Add new folder."""
         folder_name, ok = QInputDialog.getText(self, "New Folder", "Folder name:")
         if ok and folder_name:
-            if self.bookmarks_manager.create_folder(folder_name):
-                self.load_bookmarks_tree()
-            else:
+            if not self.bookmarks_manager.create_folder(folder_name):
                 QMessageBox.warning(self, "Error", "Folder already exists!")
     
-    def edit_bookmark(self, item):
+    def edit_bookmark(self, index):
         """Edit bookmark."""
-        old_title = item.text(0)
-        old_url = item.text(1)
+        bookmark = self.model.bookmark_for_index(index)
+        if bookmark is None:
+            return
         
-        title, ok1 = QInputDialog.getText(self, "Edit Bookmark", "Title:", text=old_title)
+        title, ok1 = QInputDialog.getText(
+            self, "Edit Bookmark", "Title:", text=bookmark.get("title", "")
+        )
         if not ok1:
             return
         
-        url, ok2 = QInputDialog.getText(self, "Edit Bookmark", "URL:", text=old_url)
+        url, ok2 = QInputDialog.getText(
+            self, "Edit Bookmark", "URL:", text=bookmark.get("url", "")
+        )
         if not ok2:
             return
         
-        # Update bookmark
-        bookmark_id = item.data(0, Qt.ItemDataRole.UserRole)
-        location = item.data(1, Qt.ItemDataRole.UserRole)
-        
-        # Find and update
-        if location in ["bookmarks_bar", "other_bookmarks"]:
-            bookmarks_list = self.bookmarks_manager.bookmarks[location]
-        else:
-            bookmarks_list = self.bookmarks_manager.bookmarks["folders"].get(location, [])
-        
-        for bookmark in bookmarks_list:
-            if bookmark.get("id") == bookmark_id:
-                bookmark["title"] = title
-                bookmark["url"] = url
-                break
-        
-        self.bookmarks_manager.save_bookmarks()
-        self.load_bookmarks_tree()
+        location = self.model.location_for_index(index)
+        self.bookmarks_manager.update_bookmark(bookmark.get("id"), title, url, location)
     
-    def delete_bookmark(self, item):
+    def delete_bookmark(self, index):
         """Delete bookmark."""
+        bookmark = self.model.bookmark_for_index(index)
+        if bookmark is None:
+            return
+        
         reply = QMessageBox.question(
             self, "Delete Bookmark",
-            f"Delete bookmark '{item.text(0)}'?",
+            f"Delete bookmark '{bookmark.get('title', '')}'?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            bookmark_id = item.data(0, Qt.ItemDataRole.UserRole)
-            location = item.data(1, Qt.ItemDataRole.UserRole)
-            self.bookmarks_manager.remove_bookmark(bookmark_id, location)
-            self.load_bookmarks_tree()
+            location = self.model.location_for_index(index)
+            self.bookmarks_manager.remove_bookmark(bookmark.get("id"), location)
     
-    def delete_folder(self, item):
+    def delete_folder(self, index):
         """Delete folder."""
-        folder_data = item.data(0, Qt.ItemDataRole.UserRole)
+        folder_name = self.model.location_for_index(index)
         
-        if folder_data.startswith("folder:"):
-            folder_name = folder_data.replace("folder:", "")
-            
+        if folder_name and folder_name not in BookmarksManager.ROOT_LOCATIONS:
             reply = QMessageBox.question(
                 self, "Delete Folder",
                 f"Delete folder '{folder_name}' and all its bookmarks?",
@@ -546,43 +2428,191 @@ class BookmarksDialog(QDialog):
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                if folder_name in self.bookmarks_manager.bookmarks.get("folders", {}):
-                    del self.bookmarks_manager.bookmarks["folders"][folder_name]
-                    self.bookmarks_manager.save_bookmarks()
-                    self.load_bookmarks_tree()
+                self.bookmarks_manager.delete_folder(folder_name)
+    
+    def move_selected(self):
+        """Move selected bookmarks to another folder."""
+        bookmark_ids = self.selected_bookmark_ids()
+        if not bookmark_ids:
+            return
+        
+        names = {}
+        for location in self.bookmarks_manager.location_names():
+            names[self.model.location_display_name(location)] = location
+        
+        choice, ok = QInputDialog.getItem(
+            self, "Move Bookmarks", "Move to:", list(names), 0, False
+        )
+        if ok and choice:
+            self.bookmarks_manager.move_bookmarks(bookmark_ids, names[choice])
     
     def delete_selected(self):
-        """Delete selected item."""
-        item = self.tree.currentItem()
-        if not item:
+        """Delete selected items."""
+        indexes = self.selected_indexes()
+        if not indexes:
             return
         
-        if item.childCount() > 0:
-            self.delete_folder(item)
-        else:
-            self.delete_bookmark(item)
+        if len(indexes) == 1:
+            index = indexes[0]
+            if self.model.is_folder(index):
+                self.delete_folder(index)
+            else:
+                self.delete_bookmark(index)
+            return
+        
+        bookmark_ids = self.selected_bookmark_ids()
+        if not bookmark_ids:
+            return
+        
+        reply = QMessageBox.question(
+            self, "Delete Bookmarks",
+            f"Delete {len(bookmark_ids)} selected bookmarks?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            self.bookmarks_manager.remove_bookmarks(bookmark_ids)
     
     def import_bookmarks(self):
-        """Import bookmarks from HTML file."""
+        """Import bookmarks from an HTML, Chromium or Firefox bookmarks file."""
         filepath, _ = QFileDialog.getOpenFileName(
-            self, "Import Bookmarks", "", "HTML Files (*.html);;All Files (*)"
+            self, "Import Bookmarks", "",
+            "Bookmarks Files (*.html *.htm Bookmarks *.sqlite);;All Files (*)"
         )
         
         if filepath:
-            # TODO: Implement HTML parsing
-            QMessageBox.information(
-                self, "Import",
-                "Import feature will be available in the next update!"
-            )
+            if ProfileImporter.is_profile_file(filepath):
+                result = ProfileImporter(self.bookmarks_manager).import_file(filepath)
+                count = None if result is None else result[0]
+            else:
+                count = self.bookmarks_manager.import_bookmarks(filepath)
+            if count is None:
+                QMessageBox.warning(self, "Import", "Failed to import bookmarks!")
+            else:
+                QMessageBox.information(self, "Import", f"Imported {count} bookmarks.")
     
     def export_bookmarks(self):
-        """Export bookmarks to HTML file."""
-        filepath, _ = QFileDialog.getSaveFileName(
-            self, "Export Bookmarks", "bookmarks.html", "HTML Files (*.html)"
+        """Export bookmarks to an HTML, JSON or CSV file in the background."""
+        if self.export_thread is not None:
+            return
+        
+        filepath, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Bookmarks", "bookmarks.html",
+            "HTML Files (*.html);;JSON Files (*.json);;CSV Files (*.csv)"
         )
+        if not filepath:
+            return
         
-        if filepath:
-            if self.bookmarks_manager.export_bookmarks(filepath):
-                QMessageBox.information(self, "Export", "Bookmarks exported successfully!")
-            else:
-                QMessageBox.warning(self, "Export", "Failed to export bookmarks!")  
\ No newline at end of file
+        fmt = BookmarkExporter.format_for_path(filepath)
+        if not Path(filepath).suffix:
+            fmt = selected_filter.split()[0].lower()
+            filepath += f".{fmt}"
+        
+        self.export_progress = QProgressDialog("Exporting bookmarks...", "Cancel", 0, 100, self)
+        self.export_progress.setWindowTitle("Export")
+        self.export_progress.setMinimumDuration(300)
+        
+        self.export_thread = BookmarkExportThread(
+            self.bookmarks_manager.export_snapshot(), filepath, fmt, self
+        )
+        self.export_thread.progress.connect(self.on_export_progress)
+        self.export_thread.export_finished.connect(self.on_export_finished)
+        self.export_progress.canceled.connect(self.export_thread.requestInterruption)
+        self.export_thread.start()
+    
+    def on_export_progress(self, done, total):
+        """Update the export progress dialog."""
+        if self.export_progress is not None:
+            self.export_progress.setValue(done * 100 // total if total else 100)
+    
+    def on_export_finished(self, ok):
+        """Report the export result and release the worker."""
+        if self.export_thread is None:
+            return  # stopped by done(); the result was already queued
+        cancelled = self.export_thread.isInterruptionRequested()
+        self.export_thread.wait()
+        self.export_thread.deleteLater()
+        self.export_thread = None
+        self.export_progress.close()
+        self.export_progress = None
+        
+        if ok:
+            QMessageBox.information(self, "Export", "Bookmarks exported successfully!")
+        elif not cancelled:
+            QMessageBox.warning(self, "Export", "Failed to export bookmarks!")
+    
+    def find_duplicates(self):
+        """Look for duplicate and dead bookmarks in the background."""
+        if self.analysis_thread is not None:
+            return
+        
+        self.setCursor(Qt.CursorShape.BusyCursor)
+        self.analysis_thread = BookmarkAnalysisThread(
+            BookmarkDuplicateFinder.snapshot(self.bookmarks_manager), self
+        )
+        self.analysis_thread.analysis_finished.connect(self.on_analysis_finished)
+        self.analysis_thread.start()
+    
+    def on_analysis_finished(self, report):
+        """Offer to clean up the duplicates and dead entries found."""
+        if self.analysis_thread is None:
+            return  # stopped by done(); the result was already queued
+        self.analysis_thread.wait()
+        self.analysis_thread.deleteLater()
+        self.analysis_thread = None
+        self.unsetCursor()
+        
+        duplicates = len(BookmarkDuplicateFinder.redundant_ids(report["duplicates"]))
+        dead = len(report["dead"])
+        if not duplicates and not dead:
+            QMessageBox.information(self, "Find Duplicates", "No duplicate or dead bookmarks found.")
+            return
+        
+        box = QMessageBox(self)
+        box.setWindowTitle("Find Duplicates")
+        box.setText(
+            f"Found {duplicates} duplicate bookmarks in {len(report['duplicates'])} groups "
+            f"and {dead} bookmarks with invalid URLs.\n\n"
+            "The first bookmark of each group is kept."
+        )
+        merge_btn = box.addButton("Remove Duplicates", QMessageBox.ButtonRole.AcceptRole)
+        all_btn = box.addButton("Remove Duplicates and Invalid", QMessageBox.ButtonRole.DestructiveRole)
+        box.addButton(QMessageBox.StandardButton.Cancel)
+        merge_btn.setEnabled(duplicates > 0)
+        all_btn.setEnabled(dead > 0)
+        box.exec()
+        
+        if box.clickedButton() in (merge_btn, all_btn):
+            # The store may have changed while the analysis ran; remove_bookmarks
+            # ignores IDs that no longer exist.
+            self.bookmarks_manager.merge_duplicates(report, box.clickedButton() is all_btn)
+    
+    def done(self, result):
+        """Stop the workers and the manager signals once the dialog is closed.
+        
+        Every way of closing (Close, Escape, the window's close button)
+        ends here.
+        """
+        if self.export_thread is not None:
+            self.export_thread.progress.disconnect(self.on_export_progress)
+            self.export_thread.export_finished.disconnect(self.on_export_finished)
+            self.export_thread.requestInterruption()
+            self.export_thread.wait()
+            self.export_thread.deleteLater()
+            self.export_thread = None
+            self.export_progress.close()
+            self.export_progress = None
+        if self.analysis_thread is not None:
+            self.analysis_thread.analysis_finished.disconnect(self.on_analysis_finished)
+            self.analysis_thread.requestInterruption()
+            self.analysis_thread.wait()
+            self.analysis_thread.deleteLater()
+            self.analysis_thread = None
+            self.unsetCursor()
+        if self.model is not None:
+            self.model.detach()
+            self.model = None
+            self.bookmarks_manager.bookmarks_inserted.disconnect(self.refresh_filter)
+            self.bookmarks_manager.bookmark_changed.disconnect(self.refresh_filter)
+            self.bookmarks_manager.bookmarks_reset.disconnect(self.refresh_filter)
+        super().done(result)  
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 import sys
 import os
+import time
 from pathlib import Path
 from PyQt6.QtCore import (
     QUrl, Qt, QSize, QTimer, QStandardPaths, QEvent, pyqtSignal
@@ -24,12 +25,22 @@ from PyQt6.QtGui import (
 # Import QtAwesome for Font Awesome icons
 import qtawesome as qta
 
+# psutil is optional; without it tabs are only unloaded after idling
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
 # Import our modules
 from config_manager import ConfigManager
 from settings_dialog import SettingsDialog
-from bookmarks_manager import BookmarksManager, BookmarksDialog
+from bookmarks_manager import BookmarksManager, SQLiteBookmarksManager, BookmarksDialog
+from profile_importer import ProfileImporter
+from favicon_store import FaviconStore
 from history_manager import HistoryManager, HistoryDialog
-from downloads_manager import DownloadsManager, DownloadsDialog
+from downloads_manager import DownloadsManager, DownloadsDialog, DownloadItem
+from download_engine import HttpDownload
 from find_dialog import FindBar
 from content_blocker import ContentBlocker
 
@@ -477,10 +488,21 @@ class HeaderBar(QWidget):
 
 
 class TabbedBrowserWidget(QWidget):
-    """Enhanced tabbed browser widget with all features."""
+    """Enhanced tabbed browser widget with all features.
+    
+    Background tabs left idle for ``tab_discard_minutes``, or the longest
+    idle one when system memory is nearly full, have their page put in
+    the Discarded lifecycle state. That frees the renderer while the
+    view keeps its URL, title, icon and history, so every caller can
+    keep treating the tab as a QWebEngineView; QtWebEngine reloads the
+    page when the tab is shown again.
+    """
     
     status_message = pyqtSignal(str)
     
+    DISCARD_CHECK_INTERVAL = 30000  # ms
+    SPEED_LIMITS_SAVE_DELAY = 1000  # ms after the last change
+    
     def __init__(self, config_manager, storage_manager, bookmarks_manager, 
                  history_manager, downloads_manager, parent=None):
         super().__init__(parent)
@@ -489,6 +511,22 @@ class TabbedBrowserWidget(QWidget):
         self.bookmarks = bookmarks_manager
         self.history = history_manager
         self.downloads = downloads_manager
+        self.downloads.set_max_active(self.config.get("max_concurrent_downloads", 3))
+        self.downloads.set_speed_limits(
+            self.config.get("download_speed_limit", 0) * 1024,
+            self.config.get("download_item_speed_limit", 0) * 1024
+        )
+        # Spin boxes change the limits on every step; save once they settle
+        self.speed_limits_timer = QTimer(self)
+        self.speed_limits_timer.setSingleShot(True)
+        self.speed_limits_timer.setInterval(self.SPEED_LIMITS_SAVE_DELAY)
+        self.speed_limits_timer.timeout.connect(self.save_speed_limits)
+        self.downloads.speed_limits_changed.connect(lambda *_: self.speed_limits_timer.start())
+        self.downloads.configure_post_processing(
+            self.config.get("download_rules", []),
+            self.config.get("extract_downloaded_archives", False)
+        )
+        self.favicons = FaviconStore(self)
         self._vertical_mode = False
         
         # Track tabs
@@ -496,6 +534,13 @@ class TabbedBrowserWidget(QWidget):
         self.recently_closed = []  # For Ctrl+Shift+T
         self.pinned_tabs = set()  # Track pinned tabs
         
+        # Unload idle background tabs
+        self.discard_timer = QTimer(self)
+        self.discard_timer.setInterval(self.DISCARD_CHECK_INTERVAL)
+        self.discard_timer.timeout.connect(self.discard_idle_tabs)
+        if self.config.get("discard_inactive_tabs", True):
+            self.discard_timer.start()
+        
         # Components
         self.tab_bar = QTabBar(self)
         self.content_stack = QStackedWidget(self)
@@ -580,6 +625,12 @@ class TabbedBrowserWidget(QWidget):
                 mute_action = menu.addAction(IconManager.get_icon('fa5s.volume-mute'), "Mute Tab")
             mute_action.triggered.connect(lambda: self.toggle_mute_tab(index))
         
+        # Unload
+        if (browser and browser is not self.current_browser() and not self.is_tab_discarded(browser)
+                and not self.is_tab_loading(browser)):
+            discard_action = menu.addAction(IconManager.get_icon('fa5s.moon'), "Unload Tab")
+            discard_action.triggered.connect(lambda: self.discard_tab(browser))
+        
         menu.addSeparator()
         
         # Close
@@ -627,6 +678,72 @@ class TabbedBrowserWidget(QWidget):
             is_muted = browser.page().isAudioMuted()
             browser.page().setAudioMuted(not is_muted)
 
+    @staticmethod
+    def is_tab_discarded(browser):
+        """Check whether a tab's page is unloaded."""
+        page = browser.page()
+        return page is not None and page.lifecycleState() == QWebEnginePage.LifecycleState.Discarded
+
+    def is_tab_loading(self, browser):
+        """Check whether a tab's page has a load in flight."""
+        data = self.tab_data.get(id(browser))
+        return data is not None and data.get('loading', False)
+
+    def discard_tab(self, browser):
+        """Unload a background tab's page to free its renderer memory."""
+        page = browser.page()
+        if (page is None or browser is self.current_browser() or self.is_tab_discarded(browser)
+                or self.is_tab_loading(browser)):
+            # A pending loadFinished would consume the scroll restore meant for the reload
+            return False
+        
+        # Remember where the page was scrolled to for when it is reloaded
+        data = self.tab_data.get(id(browser))
+        if data is not None:
+            position = page.scrollPosition()
+            data['scroll'] = (round(position.x()), round(position.y()))
+            data['discarded'] = True
+        page.setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+        return True
+
+    def discard_idle_tabs(self):
+        """Unload background tabs that have been idle too long.
+        
+        Pinned tabs and pages QtWebEngine wants kept running (playing
+        audio, inspected in DevTools) are left alone.
+        """
+        now = time.monotonic()
+        idle_limit = self.config.get("tab_discard_minutes", 30) * 60
+        current = self.current_browser()
+        candidates = []
+        for index in range(self.content_stack.count()):
+            browser = self.content_stack.widget(index)
+            data = self.tab_data.get(id(browser))
+            if browser is None or data is None:
+                continue
+            if browser is current:
+                data['last_active'] = now
+                continue
+            page = browser.page()
+            if (page is None or index in self.pinned_tabs or self.is_tab_discarded(browser)
+                    or self.is_tab_loading(browser)
+                    or page.recommendedState() == QWebEnginePage.LifecycleState.Active):
+                continue
+            idle = now - data.get('last_active', now)
+            if idle >= idle_limit:
+                self.discard_tab(browser)
+            else:
+                candidates.append((idle, browser))
+        
+        if candidates and self.memory_pressure():
+            self.discard_tab(max(candidates, key=lambda candidate: candidate[0])[1])
+
+    def memory_pressure(self):
+        """Check whether system memory use is above the discard threshold."""
+        if not HAS_PSUTIL:
+            return False
+        return psutil.virtual_memory().percent >= self.config.get("tab_discard_memory_percent", 85)
+
     def close_other_tabs(self, keep_index):
         """Close all tabs except the specified one."""
         # Close from end to beginning to maintain indices
@@ -755,6 +872,12 @@ class TabbedBrowserWidget(QWidget):
         """Handle tab change."""
         browser = self.current_browser()
         if browser:
+            data = self.tab_data.get(id(browser))
+            if data is not None:
+                data['last_active'] = time.monotonic()
+            # Showing the view reactivates an unloaded page; make sure of it
+            if self.is_tab_discarded(browser):
+                browser.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
             self.url_bar.setText(browser.url().toString())
             self.update_navigation_buttons()
             self.update_bookmark_button()
@@ -1013,7 +1136,7 @@ class TabbedBrowserWidget(QWidget):
 
     def show_bookmarks(self):
         """Show bookmarks manager."""
-        dialog = BookmarksDialog(self.bookmarks, self)
+        dialog = BookmarksDialog(self.bookmarks, self, favicon_store=self.favicons)
         dialog.bookmark_activated.connect(lambda url: self.add_tab(QUrl(url)))
         dialog.exec()
 
@@ -1109,7 +1232,8 @@ class TabbedBrowserWidget(QWidget):
         tab_id = id(browser)
         self.tab_data[tab_id] = {
             'url': qurl,
-            'title': label
+            'title': label,
+            'last_active': time.monotonic()
         }
         
         browser.setUrl(qurl)
@@ -1117,7 +1241,7 @@ class TabbedBrowserWidget(QWidget):
         # Connect signals
         browser.urlChanged.connect(lambda url, b=browser: self.update_urlbar(url, b))
         browser.titleChanged.connect(lambda title, b=browser: self.update_tab_title(title, b))
-        browser.loadStarted.connect(self.on_load_start)
+        browser.loadStarted.connect(lambda b=browser: self.on_load_start(b))
         browser.loadProgress.connect(self.on_load_progress)
         browser.loadFinished.connect(lambda ok, b=browser: self.on_load_finish(ok, b))
         browser.iconChanged.connect(lambda icon, b=browser: self.update_tab_icon(icon, b))
@@ -1125,9 +1249,12 @@ class TabbedBrowserWidget(QWidget):
         # Add to stack
         index = self.content_stack.addWidget(browser)
         
-        # Add tab
+        # Add tab, showing the cached favicon until the page provides one
         tab_index = self.tab_bar.addTab(label)
         self.tab_bar.setTabToolTip(tab_index, qurl.toString())
+        cached_icon = self.favicons.icon_for_url(qurl.toString())
+        if cached_icon is not None:
+            self.tab_bar.setTabIcon(tab_index, cached_icon)
         
         # Switch to new tab
         self.tab_bar.setCurrentIndex(tab_index)
@@ -1138,6 +1265,30 @@ class TabbedBrowserWidget(QWidget):
         # Ask where to save (if enabled in settings)
         ask_location = self.config.get("ask_download_location", True)
         
+        # Offer a copy downloaded before instead of fetching it again
+        existing = self.downloads.find_existing(url=download.url().toString())
+        if existing is not None:
+            from PyQt6.QtWidgets import QMessageBox
+            size = DownloadItem.format_bytes(existing["total_bytes"])
+            box = QMessageBox(self)
+            box.setWindowTitle("Already Downloaded")
+            box.setText(f"This file was downloaded before ({size}):\n{existing['path']}")
+            use_button = box.addButton("Use Existing File", QMessageBox.ButtonRole.AcceptRole)
+            again_button = box.addButton("Download Again", QMessageBox.ButtonRole.DestructiveRole)
+            box.addButton(QMessageBox.StandardButton.Cancel)
+            box.exec()
+            
+            if box.clickedButton() is not again_button:
+                download.cancel()
+                if box.clickedButton() is use_button:
+                    # Hard-link it into the download folder unless a location is picked per file
+                    target = None
+                    if not ask_location:
+                        target = str(Path(self.downloads.download_path) / download.suggestedFileName())
+                    item = self.downloads.reuse_download(existing, target)
+                    self.status_message.emit(f"Using existing {item.path}")
+                return
+        
         if ask_location:
             suggested_name = download.suggestedFileName()
             filepath, _ = QFileDialog.getSaveFileName(
@@ -1155,15 +1306,59 @@ class TabbedBrowserWidget(QWidget):
             filepath = str(Path(download_path) / download.suggestedFileName())
             download.setDownloadFileName(filepath)
         
+        # Catch a full disk before any bandwidth is spent on the file
+        wait_for_space = False
+        fits, free, needed = self.downloads.check_space(filepath, download.totalBytes())
+        if not fits:
+            from PyQt6.QtWidgets import QMessageBox
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Icon.Warning)
+            box.setWindowTitle("Not Enough Disk Space")
+            box.setText(
+                f"Downloading {Path(filepath).name} needs {DownloadItem.format_bytes(needed)}, "
+                f"but only {DownloadItem.format_bytes(free)} is free on that drive."
+            )
+            wait_button = box.addButton("Wait for Space", QMessageBox.ButtonRole.AcceptRole)
+            anyway_button = box.addButton("Download Anyway", QMessageBox.ButtonRole.DestructiveRole)
+            box.addButton(QMessageBox.StandardButton.Cancel)
+            box.exec()
+            
+            if box.clickedButton() not in (wait_button, anyway_button):
+                download.cancel()
+                return
+            wait_for_space = box.clickedButton() is wait_button
+        
+        # Large files from plain HTTP(S) URLs can go to the segmented engine
+        url = download.url().toString()
+        if (self.config.get("segmented_downloads", False)
+                and url.startswith(("http://", "https://"))
+                and download.totalBytes() >= 2 * HttpDownload.MIN_SEGMENT_SIZE):
+            download.cancel()
+            self.downloads.add_managed_download(
+                url, filepath, download.totalBytes(),
+                self.config.get("download_segments", 4), wait_for_space
+            )
+            self.status_message.emit(f"Downloading {Path(filepath).name}...")
+            return
+        
         # Add to downloads manager
         download_item = self.downloads.add_download(download)
         download_item.path = filepath
         
-        # Accept download
+        # Accept download; the manager pauses it if too many are running
+        # or, when asked to, until it fits on disk
         download.accept()
+        self.downloads.schedule(download_item, wait_for_space=wait_for_space)
         
         self.status_message.emit(f"Downloading {download.suggestedFileName()}...")
         
+    def save_speed_limits(self):
+        """Remember bandwidth limits changed in the downloads dialog."""
+        self.speed_limits_timer.stop()
+        self.config.config.set_setting("download_speed_limit", self.downloads.speed_limit // 1024)
+        self.config.config.set_setting("download_item_speed_limit", self.downloads.item_speed_limit // 1024)
+        self.config.config.save_config()
+        
     def close_tab(self, index):
         """Close tab."""
         if self.content_stack.count() < 2:
@@ -1260,6 +1455,7 @@ class TabbedBrowserWidget(QWidget):
         index = self.content_stack.indexOf(browser)
         if index != -1 and not icon.isNull():
             self.tab_bar.setTabIcon(index, icon)
+            self.favicons.store_icon(browser.url().toString(), icon, browser.iconUrl().toString())
             
     def update_urlbar(self, url, browser=None):
         """Update URL bar."""
@@ -1282,8 +1478,11 @@ class TabbedBrowserWidget(QWidget):
         self.update_navigation_buttons()
         self.update_bookmark_button()
 
-    def on_load_start(self):
+    def on_load_start(self, browser):
         """Handle load start."""
+        data = self.tab_data.get(id(browser))
+        if data is not None:
+            data['loading'] = True
         self.loading_indicator.start_loading()
         self.reload_btn.setIcon(IconManager.get_icon('fa5s.times'))
         self.reload_btn.setToolTip("Stop loading")
@@ -1296,6 +1495,9 @@ class TabbedBrowserWidget(QWidget):
 
     def on_load_finish(self, success, browser):
         """Handle load finish."""
+        data = self.tab_data.get(id(browser))
+        if data is not None:
+            data['loading'] = False
         self.loading_indicator.finish_loading()
         self.reload_btn.setIcon(IconManager.get_icon('fa5s.redo'))
         self.reload_btn.setToolTip("Reload (F5)")
@@ -1305,6 +1507,12 @@ class TabbedBrowserWidget(QWidget):
         else:
             self.status_message.emit("Failed to load page")
         
+        # Put a reloaded, previously unloaded tab back where it was scrolled to
+        if data is not None and data.pop('discarded', False):
+            x, y = data.pop('scroll', (0, 0))
+            if success and (x or y):
+                browser.page().runJavaScript(f"window.scrollTo({x}, {y});")
+        
         self.update_navigation_buttons()
 
     def show_settings(self):
@@ -1453,6 +1661,17 @@ class TabbedBrowserWidget(QWidget):
         self.storage.content_blocker.set_block_ads(block_ads)
         self.storage.content_blocker.set_block_trackers(block_trackers)
         
+        self.downloads.set_max_active(self.config.get("max_concurrent_downloads", 3))
+        self.downloads.configure_post_processing(
+            self.config.get("download_rules", []),
+            self.config.get("extract_downloaded_archives", False)
+        )
+        
+        if self.config.get("discard_inactive_tabs", True):
+            self.discard_timer.start()
+        else:
+            self.discard_timer.stop()
+        
         self.tab_bar.style().unpolish(self.tab_bar)
         self.tab_bar.style().polish(self.tab_bar)
         self.update()
@@ -1461,11 +1680,13 @@ class TabbedBrowserWidget(QWidget):
 class WelcomeDialog(QDialog):
     """A modern welcome and onboarding dialog for Flux."""
 
-    def __init__(self, config_manager, settings_dialog_cls, bookmarks_manager, parent=None):
+    def __init__(self, config_manager, settings_dialog_cls, bookmarks_manager, parent=None,
+                 history_manager=None):
         super().__init__(parent)
         self.config_manager = config_manager
         self.settings_dialog_cls = settings_dialog_cls
         self.bookmarks_manager = bookmarks_manager
+        self.history_manager = history_manager
 
         self.setWindowTitle("Welcome to Flux")
         self.setModal(True)
@@ -1571,20 +1792,56 @@ class WelcomeDialog(QDialog):
         dlg.exec()
 
     def import_bookmarks(self):
-        # Simple import implementation: open file and merge if possible
-        dlg = QFileDialog(self)
-        dlg.setFileMode(QFileDialog.FileMode.ExistingFile)
-        dlg.setNameFilter("Bookmarks Files (*.html *.htm);;All Files (*)")
-        if dlg.exec():
-            files = dlg.selectedFiles()
-            # Basic import: attempt to read as exported HTML and ignore complexity
-            try:
-                with open(files[0], 'r', encoding='utf-8') as f:
-                    data = f.read()
-                # store imported file as a single bookmark for now
-                self.bookmarks_manager.add_bookmark(f'file://{files[0]}', 'Imported Bookmarks')
-            except Exception as e:
-                pass
+        # Import a Netscape bookmarks.html, a Chromium "Bookmarks" file or a
+        # Firefox places.sqlite from another browser
+        from PyQt6.QtWidgets import QMessageBox
+        
+        profiles = ProfileImporter.find_profiles()
+        filepath = None
+        if profiles:
+            names = [name for name, _ in profiles] + ["Choose a file..."]
+            choice, ok = QInputDialog.getItem(
+                self, "Import Bookmarks", "Import from:", names, 0, False
+            )
+            if not ok:
+                return
+            filepath = dict(profiles).get(choice)
+        
+        if filepath is None:
+            dlg = QFileDialog(self)
+            dlg.setFileMode(QFileDialog.FileMode.ExistingFile)
+            dlg.setNameFilter("Bookmarks Files (*.html *.htm Bookmarks *.sqlite);;All Files (*)")
+            if not dlg.exec():
+                return
+            filepath = dlg.selectedFiles()[0]
+        
+        if not ProfileImporter.is_profile_file(filepath):
+            count = self.bookmarks_manager.import_bookmarks(filepath)
+            if count is None:
+                QMessageBox.warning(self, "Import", "Failed to import bookmarks!")
+            else:
+                QMessageBox.information(self, "Import", f"Imported {count} bookmarks.")
+            return
+        
+        importer = ProfileImporter(self.bookmarks_manager, self.history_manager)
+        include_history = False
+        if importer.can_import_history():
+            include_history = QMessageBox.question(
+                self, "Import", "Also import browsing history?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            ) == QMessageBox.StandardButton.Yes
+        
+        result = importer.import_file(filepath, include_history)
+        if result is None:
+            QMessageBox.warning(self, "Import", "Failed to import bookmarks!")
+        else:
+            added, visits = result
+            message = f"Imported {added} bookmarks."
+            if include_history:
+                message += f"\nImported {visits} history entries."
+            elif self.history_manager is not None and not importer.can_import_history():
+                message += "\nHistory was not imported: the history store can't keep visit times."
+            QMessageBox.information(self, "Import", message)
 
     def finish(self):
         if self.dont_show_cb.isChecked():
@@ -1634,6 +1891,11 @@ class BrowserWindow(QMainWindow):
         self.blocker_label = QLabel()
         self.status_bar.addPermanentWidget(self.blocker_label)
         
+        # Combined download speed in status bar
+        self.downloads_label = QLabel()
+        self.status_bar.addPermanentWidget(self.downloads_label)
+        self.downloads.throughput_changed.connect(self.update_download_throughput)
+        
         # Update blocker stats periodically
         self.stats_timer = QTimer(self)
         self.stats_timer.timeout.connect(self.update_blocker_stats)
@@ -1666,6 +1928,13 @@ class BrowserWindow(QMainWindow):
         blocked = self.storage.content_blocker.get_blocked_count()
         self.blocker_label.setText(f"🛡️ {blocked} blocked")
 
+    def update_download_throughput(self, rate):
+        """Show the combined speed of active downloads."""
+        if rate >= 1:
+            self.downloads_label.setText(f"⬇ {DownloadItem.format_bytes(rate)}/s")
+        else:
+            self.downloads_label.clear()
+
     def show_status_message(self, message, timeout=3000):
         """Show status message."""
         self.status_bar.showMessage(message, timeout)
@@ -1689,6 +1958,10 @@ class BrowserWindow(QMainWindow):
         if self.storage._profile:
             self.storage._profile.deleteLater()
         
+        self.browser_widget.favicons.save()
+        if self.browser_widget.speed_limits_timer.isActive():
+            self.browser_widget.save_speed_limits()
+        self.downloads.close()
         event.accept()
 
     def show_welcome_if_first_run(self):
@@ -1697,7 +1970,8 @@ class BrowserWindow(QMainWindow):
             cfg_mgr = self.config.config
             first = cfg_mgr.get_setting('first_run')
             if first:
-                dlg = WelcomeDialog(cfg_mgr, SettingsDialog, self.bookmarks, self)
+                dlg = WelcomeDialog(cfg_mgr, SettingsDialog, self.bookmarks, self,
+                                    history_manager=self.history)
                 dlg.exec()
                 # mark as shown
                 cfg_mgr.set_setting('first_run', False)
@@ -1715,7 +1989,10 @@ if __name__ == '__main__':
     # Initialize managers
     config_manager = ConfigManager()
     storage_manager = StorageManager()
-    bookmarks_manager = BookmarksManager()
+    if config_manager.get_setting('bookmarks_backend') == 'sqlite':
+        bookmarks_manager = SQLiteBookmarksManager()
+    else:
+        bookmarks_manager = BookmarksManager()
     history_manager = HistoryManager()
     downloads_manager = DownloadsManager()
     
@@ -31,6 +31,13 @@ class ConfigManager:
         "new_tab_page": "homepage",  # "homepage", "blank", or "restore"
         "search_engine": "https://www.google.com/search?q={}",
         "ask_download_location": True,
+        "max_concurrent_downloads": 3,
+        "segmented_downloads": False,  # fetch large files over several connections
+        "download_segments": 4,
+        "download_speed_limit": 0,  # KiB/s for all downloads together, 0 = unlimited
+        "download_item_speed_limit": 0,  # KiB/s for each download, 0 = unlimited
+        "download_rules": [],  # {"folder": ..., "extensions": [...], "hosts": [...]}
+        "extract_downloaded_archives": False,
         
         # Appearance
         "tab_position": "top",  # "top" or "left"
@@ -45,6 +52,10 @@ class ConfigManager:
         
         # Advanced
         "hardware_acceleration": True,
+        "bookmarks_backend": "json",  # "json" or "sqlite" (applied on restart)
+        "discard_inactive_tabs": True,  # unload background tabs to free memory
+        "tab_discard_minutes": 30,
+        "tab_discard_memory_percent": 85,  # unload sooner above this system memory use (needs psutil)
         "javascript_enabled": True,
         "auto_load_images": True,
         "plugins_enabled": False,
@@ -0,0 +1,504 @@
+# download_engine.py
+"""
+Download Engine - Resumable HTTP transfers
+Features: HTTP Range resume, partial-download metadata, pause/resume/cancel,
+parallel byte-range segments, token-bucket bandwidth limits,
+disk-space checks and preallocation
+"""
+
+import errno
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+USER_AGENT = "Mozilla/5.0 (compatible; Flux)"
+CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+_seek_lock = threading.Lock()
+
+
+def write_at(fd, data, offset):
+    """Write all of ``data`` at ``offset`` without moving a shared position."""
+    if hasattr(os, "pwrite"):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data = data[written:]
+            offset += written
+    else:
+        # Windows has no pwrite; serialize seek+write on the shared fd
+        with _seek_lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            while data:
+                data = data[os.write(fd, data):]
+
+
+class DownloadError(Exception):
+    """A transfer stopped early; the partial data is kept for resuming."""
+
+
+def free_space(path):
+    """Get the free bytes on the volume ``path`` (or its nearest existing parent) is on."""
+    directory = Path(path).absolute()
+    while not directory.exists() and directory != directory.parent:
+        directory = directory.parent
+    try:
+        return shutil.disk_usage(directory).free
+    except OSError:
+        return None
+
+
+def check_free_space(path, needed):
+    """Raise DownloadError if ``needed`` bytes will not fit next to ``path``."""
+    free = free_space(path)
+    if free is not None and needed > free:
+        raise DownloadError(
+            f"Not enough disk space: {needed / 1048576:.1f} MB needed, {free / 1048576:.1f} MB free"
+        )
+
+
+def preallocate(fd, size):
+    """Reserve ``size`` bytes of disk for a file.
+    
+    Uses posix_fallocate where the platform and filesystem support it, so
+    running out of space fails here and the file is laid out in one
+    piece; otherwise the file is extended sparsely.
+    """
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError as e:
+            if e.errno in (errno.ENOSPC, errno.EDQUOT):
+                raise DownloadError("Not enough disk space") from e
+    os.ftruncate(fd, size)
+
+
+class TokenBucket:
+    """Thread-safe token bucket that paces bytes to a rate.
+    
+    Tokens accrue at ``rate`` bytes per second, up to one second's worth.
+    Bytes are charged after they arrive, which can take the bucket into
+    debt; the caller then waits until the debt is repaid. A rate of 0
+    means unlimited. Several transfers can share one bucket for a
+    global cap.
+    """
+    
+    __slots__ = ("_lock", "rate", "_tokens", "_time")
+    
+    BURST = 1.0  # seconds of traffic that may pass at once
+    
+    def __init__(self, rate=0):
+        self._lock = threading.Lock()
+        self.rate = max(0, rate)
+        self._tokens = self.rate * self.BURST
+        self._time = time.monotonic()
+    
+    def _refill(self, now):
+        self._tokens = min(self.rate * self.BURST, self._tokens + (now - self._time) * self.rate)
+        self._time = now
+    
+    def set_rate(self, rate):
+        """Change the rate; takes effect for the next charge."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(0, rate)
+            self._tokens = min(self._tokens, self.rate * self.BURST)
+    
+    def charge(self, count):
+        """Take ``count`` bytes now. Returns seconds until out of debt."""
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            self._refill(time.monotonic())
+            self._tokens -= count
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+    
+    def consume(self, count, should_stop=None):
+        """Take ``count`` bytes and sleep until the bucket is out of debt."""
+        deadline = time.monotonic() + self.charge(count)
+        while not (should_stop is not None and should_stop()):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.1))
+
+
+class PartialDownload:
+    """Data and metadata of an unfinished download.
+    
+    Bytes go to ``<file>.part`` and the metadata needed to continue them
+    to ``<file>.part.json``. The ETag or Last-Modified value is sent back
+    in ``If-Range`` so a file that changed on the server is fetched again
+    instead of being spliced onto stale data.
+    
+    A segmented download also records ``segments``, a list of
+    ``[start, end, done]`` byte counts, since its part file is
+    preallocated and its size says nothing about progress.
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.part_path = self.path.with_name(self.path.name + ".part")
+        self.meta_path = self.path.with_name(self.path.name + ".part.json")
+        self.url = None
+        self.etag = None
+        self.last_modified = None
+        self.total_bytes = -1
+        self.segments = None
+    
+    def load(self):
+        """Read the metadata file. Returns False if there is none."""
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.url = meta.get("url")
+        self.etag = meta.get("etag")
+        self.last_modified = meta.get("last_modified")
+        self.total_bytes = meta.get("total_bytes", -1)
+        self.segments = meta.get("segments")
+        return True
+    
+    def save(self):
+        """Write the metadata file."""
+        meta = {
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "total_bytes": self.total_bytes,
+            "segments": self.segments,
+        }
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    
+    def adopt(self, url):
+        """Treat a file left at the final path as partial data.
+        
+        QtWebEngine writes straight to the target path, so an interrupted
+        download leaves its bytes there with no metadata. Returns True if
+        such a file was taken over.
+        """
+        if self.part_path.exists() or self.meta_path.exists() or not self.path.is_file():
+            return False
+        os.replace(self.path, self.part_path)
+        self.url = url
+        self.save()
+        return True
+    
+    def received_bytes(self):
+        """Get the number of bytes already on disk."""
+        if self.segments:
+            return sum(done for _, _, done in self.segments)
+        try:
+            return self.part_path.stat().st_size
+        except OSError:
+            return 0
+    
+    def validator(self):
+        """Get the value for If-Range, or None if the server gave none."""
+        # Weak ETags are not allowed in If-Range
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+    
+    def discard(self):
+        """Delete the partial data and its metadata."""
+        for path in (self.part_path, self.meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self.etag = None
+        self.last_modified = None
+        self.total_bytes = -1
+        self.segments = None
+    
+    def finish(self):
+        """Move the finished data to the final path."""
+        os.replace(self.part_path, self.path)
+        try:
+            self.meta_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class HttpDownload:
+    """One HTTP(S) transfer that can be paused and resumed.
+    
+    ``run`` blocks until the transfer completes, is paused or cancelled,
+    or fails; call it from a worker thread. Each run continues from the
+    bytes already in the partial file with a Range request, and starts
+    over only if the server ignores the range or the file changed.
+    
+    With ``segments`` above 1, a file of at least two ``MIN_SEGMENT_SIZE``
+    pieces is split into byte ranges fetched by a thread pool. They are
+    written with positional writes into a part file preallocated to the
+    full size, so nothing is reassembled afterwards. Servers that do not
+    answer a range probe with 206 get the single-connection transfer.
+    
+    Every chunk is paid for in each bucket of ``limiters``: ``limit``
+    caps this download and the owner may add a shared global bucket.
+    """
+    
+    CHUNK_SIZE = 256 * 1024
+    TIMEOUT = 30  # seconds
+    MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+    SAVE_INTERVAL = 1.0  # seconds between segment progress saves
+    
+    def __init__(self, url, path, total_bytes=-1, segments=1):
+        self.url = url
+        self.partial = PartialDownload(path)
+        self.total_bytes = total_bytes
+        self.received_bytes = 0
+        self.segments = max(1, segments)
+        self._stop = threading.Event()
+        self._abort = threading.Event()  # a segment failed
+        self._changed = False  # the server's copy changed mid-download
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self.limit = TokenBucket()
+        self.limiters = [self.limit]
+        
+        if self.partial.load() and self.partial.url == url:
+            self.received_bytes = self.partial.received_bytes()
+            self.total_bytes = self.partial.total_bytes
+    
+    def pause(self):
+        """Make a running ``run`` return "paused" after the current chunk."""
+        self._stop.set()
+    
+    def resume(self):
+        """Let the next ``run`` transfer again after a pause."""
+        self._stop.clear()
+    
+    def cancel(self):
+        """Make a running ``run`` return "cancelled" and drop the data."""
+        self._cancelled = True
+        self._stop.set()
+    
+    def _read_size(self):
+        """Get the chunk size, smaller under a low limit so pacing stays smooth."""
+        sizes = [max(16 * 1024, int(bucket.rate / 4)) for bucket in self.limiters if bucket.rate]
+        return min([self.CHUNK_SIZE] + sizes)
+    
+    def _throttle(self, count):
+        """Pay for ``count`` bytes in every bucket, waiting if one is in debt."""
+        for bucket in self.limiters:
+            bucket.consume(count, self._stop.is_set)
+    
+    def _request(self, range_header=None):
+        """Build a request, with If-Range when asking for a range."""
+        request = urllib.request.Request(self.url, headers={"User-Agent": USER_AGENT})
+        if range_header:
+            request.add_header("Range", range_header)
+            validator = self.partial.validator()
+            if validator:
+                request.add_header("If-Range", validator)
+        return request
+    
+    def _open(self, offset):
+        """Send the request. Returns the response, or None if already complete."""
+        request = self._request(f"bytes={offset}-" if offset else None)
+        try:
+            return urllib.request.urlopen(request, timeout=self.TIMEOUT)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset and offset == self.partial.total_bytes:
+                return None
+            if e.code == 416:
+                # The partial file does not fit the resource any more
+                self.partial.discard()
+                return self._open(0)
+            raise DownloadError(f"HTTP {e.code} {e.reason}") from e
+        except (urllib.error.URLError, OSError) as e:
+            raise DownloadError(str(e)) from e
+    
+    def _start_response(self, response, offset):
+        """Check a response and record its metadata. Returns the write offset."""
+        headers = response.headers
+        if response.status == 206:
+            match = CONTENT_RANGE_RE.match(headers.get("Content-Range", ""))
+            if not match or int(match.group(1)) != offset:
+                raise DownloadError("Server sent an unexpected range")
+            total = int(match.group(3)) if match.group(3) != "*" else -1
+        else:
+            # Range ignored or If-Range failed: the whole file follows
+            offset = 0
+            length = headers.get("Content-Length")
+            total = int(length) if length and length.isdigit() else -1
+            self.partial.etag = None
+            self.partial.last_modified = None
+        
+        self.partial.url = self.url
+        self.partial.total_bytes = total
+        self.partial.etag = headers.get("ETag") or self.partial.etag
+        self.partial.last_modified = headers.get("Last-Modified") or self.partial.last_modified
+        self.partial.save()
+        self.total_bytes = total
+        self.received_bytes = offset
+        return offset
+    
+    def run(self, progress=None):
+        """Transfer the file.
+        
+        ``progress`` is called with (received bytes, total bytes) after
+        each chunk; the total is -1 when unknown. Returns "completed",
+        "paused" or "cancelled", or raises DownloadError. A pause or
+        cancel asked for before the run starts is honoured; call
+        ``resume`` to run again after a pause.
+        """
+        self._abort.clear()
+        self._changed = False
+        if self.partial.url != self.url:
+            self.partial.discard()
+        
+        try:
+            # A part file from a single-connection run is continued as one
+            segmented = self.partial.segments or (
+                self.segments > 1 and not self.partial.received_bytes()
+            )
+            if not segmented or not self._run_segmented(progress):
+                self._run_single(progress)
+        except OSError as e:
+            raise DownloadError(str(e)) from e
+        
+        if self._cancelled:
+            self.partial.discard()
+            return "cancelled"
+        if self._stop.is_set():
+            return "paused"
+        if 0 < self.total_bytes != self.received_bytes:
+            raise DownloadError("Connection closed before the end of the file")
+        self.partial.finish()
+        return "completed"
+    
+    def _run_single(self, progress):
+        """Fetch the rest of the file over one connection."""
+        offset = self.partial.received_bytes()
+        self.received_bytes = offset
+        response = self._open(offset)
+        if response is not None:
+            with response:
+                offset = self._start_response(response, offset)
+                if self.total_bytes > 0:
+                    check_free_space(self.partial.part_path, self.total_bytes - offset)
+                with open(self.partial.part_path, 'r+b' if offset else 'wb') as f:
+                    f.seek(offset)
+                    f.truncate()
+                    while not self._stop.is_set():
+                        chunk = response.read(self._read_size())
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        self.received_bytes += len(chunk)
+                        if progress is not None:
+                            progress(self.received_bytes, self.total_bytes)
+                        self._throttle(len(chunk))
+    
+    def _probe(self):
+        """Ask for the first byte. Returns (total size, whether ranges work)."""
+        try:
+            response = urllib.request.urlopen(self._request("bytes=0-0"), timeout=self.TIMEOUT)
+        except (urllib.error.URLError, OSError) as e:
+            raise DownloadError(str(e)) from e
+        with response:
+            headers = response.headers
+            self.partial.etag = headers.get("ETag")
+            self.partial.last_modified = headers.get("Last-Modified")
+            match = CONTENT_RANGE_RE.match(headers.get("Content-Range", ""))
+            if response.status == 206 and match and match.group(3) != "*":
+                return int(match.group(3)), True
+            length = headers.get("Content-Length")
+            return (int(length) if length and length.isdigit() else -1), False
+    
+    def _run_segmented(self, progress):
+        """Fetch the file in parallel ranges. Returns False to fall back."""
+        partial = self.partial
+        if not partial.segments:
+            total, ranges = self._probe()
+            if not ranges or total < 2 * self.MIN_SEGMENT_SIZE:
+                partial.etag = partial.last_modified = None
+                return False
+            count = min(self.segments, total // self.MIN_SEGMENT_SIZE)
+            size = -(-total // count)
+            partial.url = self.url
+            partial.total_bytes = total
+            partial.segments = [
+                [start, min(start + size, total) - 1, 0] for start in range(0, total, size)
+            ]
+            try:
+                with open(partial.part_path, 'wb') as f:
+                    preallocate(f.fileno(), total)
+            except (DownloadError, OSError):
+                partial.discard()
+                raise
+            partial.save()
+        
+        self.total_bytes = partial.total_bytes
+        self.received_bytes = partial.received_bytes()
+        pending = [segment for segment in partial.segments if segment[0] + segment[2] <= segment[1]]
+        if not pending:
+            return True
+        
+        fd = os.open(partial.part_path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        try:
+            with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="segment") as pool:
+                futures = [pool.submit(self._fetch_segment, fd, segment, progress) for segment in pending]
+                errors = [future.exception() for future in futures if future.exception()]
+        finally:
+            os.close(fd)
+            if self._changed:
+                partial.discard()
+            else:
+                with self._lock:
+                    partial.save()
+        if errors:
+            raise errors[0]
+        return True
+    
+    def _fetch_segment(self, fd, segment, progress):
+        """Fetch the rest of one ``[start, end, done]`` range into the part file."""
+        start, end, done = segment
+        position = start + done
+        try:
+            response = urllib.request.urlopen(
+                self._request(f"bytes={position}-{end}"), timeout=self.TIMEOUT
+            )
+            with response:
+                match = CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+                if (response.status != 206 or not match or int(match.group(1)) != position
+                        or match.group(3) != str(self.partial.total_bytes)):
+                    # If-Range failed: the file changed since the first segment
+                    self._changed = True
+                    raise DownloadError("File changed on the server; it will restart from the beginning")
+                
+                view = memoryview(bytearray(self.CHUNK_SIZE))
+                while position <= end and not (self._stop.is_set() or self._abort.is_set()):
+                    count = response.readinto(view[:min(self._read_size(), end - position + 1)])
+                    if not count:
+                        raise DownloadError("Connection closed before the end of a segment")
+                    write_at(fd, view[:count], position)
+                    position += count
+                    with self._lock:
+                        segment[2] += count
+                        self.received_bytes += count
+                        now = time.monotonic()
+                        if now - self._last_save >= self.SAVE_INTERVAL:
+                            self._last_save = now
+                            self.partial.save()
+                    if progress is not None:
+                        progress(self.received_bytes, self.total_bytes)
+                    self._throttle(count)
+        except (urllib.error.URLError, OSError, DownloadError) as e:
+            self._abort.set()
+            if isinstance(e, DownloadError):
+                raise
+            raise DownloadError(str(e)) from e
\ No newline at end of file
@@ -1,21 +1,39 @@
 # downloads_manager.py
 """
 Complete Downloads Management System
-Features: Track downloads, progress, pause/resume, history
+Features: Track downloads, progress, pause/resume, history, checksums,
+bandwidth limits
 """
 
+import hashlib
+import heapq
 import os
+import queue
+import re
+import shutil
+import sqlite3
+import tarfile
+import threading
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QWidget,
-    QPushButton, QProgressBar, QLabel, QHeaderView, QMenu, QFileDialog,
-    QMessageBox, QToolBar
+    QDialog, QVBoxLayout, QHBoxLayout, QTableView, QStyledItemDelegate,
+    QStyleOptionProgressBar, QStyle, QApplication,
+    QPushButton, QLabel, QHeaderView, QMenu, QFileDialog,
+    QMessageBox, QToolBar, QInputDialog, QSpinBox
+)
+from PyQt6.QtCore import (
+    Qt, pyqtSignal, QUrl, QStandardPaths, QTimer, QObject, QThread,
+    QAbstractTableModel, QModelIndex
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QUrl, QStandardPaths, QTimer
 from PyQt6.QtWebEngineCore import QWebEngineDownloadRequest
 from PyQt6.QtGui import QCursor, QDesktopServices
+from download_engine import HttpDownload, DownloadError, TokenBucket, free_space
 
 try:
     import qtawesome as qta
@@ -24,11 +42,89 @@ except ImportError:
     HAS_ICONS = False
 
 
+class RateEstimator:
+    """Exponentially weighted transfer rate on a monotonic clock.
+    
+    Each sample folds the bytes received since the previous sample into
+    the rate, weighted by the time between them, so an update is O(1) and
+    the estimate follows pauses and stalls within a few half-lives
+    instead of averaging over the whole download. The average starts
+    from zero, so it is divided by the total weight of the samples seen
+    (bias correction) to be accurate from the first second.
+    """
+    
+    __slots__ = ("_average", "_weight", "_last_time", "_last_bytes")
+    
+    HALF_LIFE = 2.0  # seconds
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self, received_bytes=0):
+        """Restart sampling, e.g. after a pause; the rate drops to zero."""
+        self._average = 0.0
+        self._weight = 0.0
+        self._last_time = None
+        self._last_bytes = received_bytes
+    
+    @property
+    def rate(self):
+        """Rate as of the last sample, in bytes per second."""
+        return self._average / self._weight if self._weight else 0.0
+    
+    def update(self, received_bytes, now=None):
+        """Add a sample of the total bytes received so far."""
+        now = time.monotonic() if now is None else now
+        if self._last_time is None:
+            self._last_time = now
+            self._last_bytes = received_bytes
+            return self.rate
+        
+        elapsed = now - self._last_time
+        if elapsed <= 0:
+            return self.rate
+        instant = (received_bytes - self._last_bytes) / elapsed
+        alpha = 1.0 - 0.5 ** (elapsed / self.HALF_LIFE)
+        self._average += alpha * (instant - self._average)
+        self._weight += alpha * (1.0 - self._weight)
+        self._last_time = now
+        self._last_bytes = received_bytes
+        return self.rate
+    
+    def current(self, now=None):
+        """Get the rate, decayed as if nothing arrived since the last sample."""
+        if self._last_time is None:
+            return self.rate
+        now = time.monotonic() if now is None else now
+        return self.rate * 0.5 ** (max(0.0, now - self._last_time) / self.HALF_LIFE)
+    
+    def eta(self, remaining_bytes, now=None):
+        """Get the seconds left for ``remaining_bytes``, or None if unknown."""
+        rate = self.current(now)
+        if remaining_bytes <= 0 or rate < 1.0:
+            return None
+        return remaining_bytes / rate
+
+
 class DownloadItem:
     """Represents a single download."""
     
-    def __init__(self, download_request):
+    # Slots keep a long download log compact
+    __slots__ = (
+        "download_request", "on_change", "id", "url", "filename", "path",
+        "total_bytes", "received_bytes", "state", "start_time", "end_time",
+        "sha256", "verification", "rate", "limit", "priority", "queued_at",
+        "duplicate_of", "post_status", "wait_for_space", "__weakref__"  # PyQt holds slots to bound methods weakly
+    )
+    
+    STATES = ("starting", "queued", "downloading", "paused", "completed", "cancelled", "interrupted")
+    ACTIVE_STATES = ("starting", "queued", "downloading", "paused")
+    FINISHED_STATES = ("completed", "cancelled", "interrupted")
+    
+    def __init__(self, download_request, on_change=None):
         self.download_request = download_request
+        self.on_change = on_change  # called with (item, state_changed)
+        self.id = uuid.uuid4().hex
         self.url = download_request.url().toString()
         self.filename = download_request.suggestedFileName()
         self.path = ""
@@ -36,21 +132,43 @@ class DownloadItem:
         self.received_bytes = 0
         self.state = "starting"
         self.start_time = datetime.now()
-        self.speed = 0
+        self.end_time = None
+        self.sha256 = None
+        self.verification = None  # checksum status, see ChecksumVerifier.verify
+        self.rate = RateEstimator()
+        self.limit = TokenBucket()  # per-download bandwidth cap
+        self.priority = 0
+        self.queued_at = None  # monotonic time it was put in the queue
+        self.duplicate_of = None  # path of an earlier download with the same content
+        self.post_status = None  # post-processing progress or result
+        self.wait_for_space = False  # hold in the queue until it fits on disk
         
         # Connect signals
         download_request.receivedBytesChanged.connect(self.update_progress)
         download_request.stateChanged.connect(self.state_changed)
     
+    def attach(self, download_request):
+        """Continue this download through a new request (a ManagedDownload)."""
+        self.download_request = download_request
+        self.received_bytes = download_request.receivedBytes()
+        self.state = "starting"
+        self.end_time = None
+        self.rate.reset(self.received_bytes)
+        download_request.receivedBytesChanged.connect(self.update_progress)
+        download_request.stateChanged.connect(self.state_changed)
+    
     def update_progress(self):
         """Update download progress."""
         self.received_bytes = self.download_request.receivedBytes()
         self.total_bytes = self.download_request.totalBytes()
         
-        # Calculate speed
-        elapsed = (datetime.now() - self.start_time).total_seconds()
-        if elapsed > 0:
-            self.speed = self.received_bytes / elapsed
+        self.rate.update(self.received_bytes)
+        self.notify(False)
+    
+    @property
+    def speed(self):
+        """Current transfer rate in bytes per second."""
+        return self.rate.current() if self.state == "downloading" else 0.0
     
     def state_changed(self, state):
         """Handle state changes."""
@@ -59,24 +177,94 @@ class DownloadItem:
         elif state == QWebEngineDownloadRequest.DownloadState.DownloadCancelled:
             self.state = "cancelled"
         elif state == QWebEngineDownloadRequest.DownloadState.DownloadInProgress:
-            self.state = "downloading"
+            # A queued or paused transfer is still "in progress" to QtWebEngine
+            if self.state not in ("queued", "paused"):
+                self.state = "downloading"
         elif state == QWebEngineDownloadRequest.DownloadState.DownloadInterrupted:
             self.state = "interrupted"
+        if self.state != "downloading":
+            self.rate.reset(self.received_bytes)
+        if self.state in self.FINISHED_STATES:
+            self.end_time = datetime.now()
+        self.notify(True)
     
     def pause(self):
         """Pause download."""
         self.download_request.pause()
         self.state = "paused"
+        self.rate.reset(self.received_bytes)
+        self.notify(True)
+    
+    def queue(self):
+        """Hold the download until the scheduler gives it a slot."""
+        self.download_request.pause()
+        self.state = "queued"
+        self.rate.reset(self.received_bytes)
+        self.notify(True)
     
     def resume(self):
         """Resume download."""
         self.download_request.resume()
         self.state = "downloading"
+        self.notify(True)
     
     def cancel(self):
         """Cancel download."""
         self.download_request.cancel()
         self.state = "cancelled"
+        self.end_time = datetime.now()
+        self.notify(True)
+    
+    @classmethod
+    def from_record(cls, record, on_change=None):
+        """Rebuild a finished download from a history record."""
+        item = cls.__new__(cls)
+        item.download_request = None
+        item.on_change = on_change
+        item.id = record["id"]
+        item.url = record["url"]
+        item.filename = record["filename"]
+        item.path = record["path"] or ""
+        item.total_bytes = record["total_bytes"] or 0
+        item.received_bytes = record["received_bytes"] or 0
+        item.state = record["state"]
+        if item.state not in cls.FINISHED_STATES:
+            # The browser closed while it was running
+            item.state = "interrupted"
+        item.start_time = datetime.fromisoformat(record["start_time"])
+        item.end_time = datetime.fromisoformat(record["end_time"]) if record["end_time"] else None
+        item.sha256 = record["sha256"]
+        # A check cut short by closing the browser is not a result
+        item.verification = record["verification"] if record["verification"] != "pending" else None
+        item.rate = RateEstimator()
+        item.limit = TokenBucket()
+        item.priority = 0
+        item.queued_at = None
+        item.duplicate_of = None
+        item.post_status = None
+        item.wait_for_space = False
+        return item
+    
+    def to_record(self):
+        """Get the fields stored in the download history."""
+        return {
+            "id": self.id,
+            "url": self.url,
+            "filename": self.filename,
+            "path": self.path,
+            "total_bytes": self.total_bytes,
+            "received_bytes": self.received_bytes,
+            "state": self.state,
+            "start_time": self.start_time.isoformat(),
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "sha256": self.sha256,
+            "verification": self.verification,
+        }
+    
+    def notify(self, state_changed):
+        """Tell the owner that this download changed."""
+        if self.on_change is not None:
+            self.on_change(self, state_changed)
     
     def get_progress_percent(self):
         """Get progress percentage."""
@@ -88,6 +276,27 @@ class DownloadItem:
         """Get human-readable speed."""
         return self.format_bytes(self.speed) + "/s"
     
+    def get_eta(self):
+        """Get the estimated seconds left, or None if unknown."""
+        if self.state != "downloading" or self.total_bytes <= 0:
+            return None
+        return self.rate.eta(self.total_bytes - self.received_bytes)
+    
+    def get_eta_text(self):
+        """Get human-readable time left."""
+        return self.format_duration(self.get_eta())
+    
+    @staticmethod
+    def format_duration(seconds):
+        """Format seconds as h:mm:ss or m:ss ("-" when unknown)."""
+        if seconds is None:
+            return "-"
+        minutes, seconds = divmod(int(seconds + 0.5), 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f"{hours}:{minutes:02d}:{seconds:02d}"
+        return f"{minutes}:{seconds:02d}"
+    
     @staticmethod
     def format_bytes(bytes_value):
         """Format bytes to human-readable size."""
@@ -98,12 +307,746 @@ class DownloadItem:
         return f"{bytes_value:.2f} PB"
 
 
-class DownloadsManager:
-    """Manages browser downloads."""
+class DownloadThread(QThread):
+    """Runs an HttpDownload off the GUI thread."""
     
-    def __init__(self):
+    PROGRESS_INTERVAL = 0.1  # seconds between progress signals
+    
+    progress = pyqtSignal('qint64', 'qint64')
+    transfer_finished = pyqtSignal(str, str)  # result, error
+    
+    def __init__(self, transfer, parent=None):
+        super().__init__(parent)
+        self.transfer = transfer
+        self._last_progress = 0.0
+    
+    def report(self, received, total):
+        now = time.monotonic()
+        if now - self._last_progress >= self.PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress.emit(received, total)
+    
+    def run(self):
+        try:
+            result = self.transfer.run(self.report)
+        except DownloadError as e:
+            self.transfer_finished.emit("interrupted", str(e))
+            return
+        self.progress.emit(self.transfer.received_bytes, self.transfer.total_bytes)
+        self.transfer_finished.emit(result, "")
+
+
+class ManagedDownload(QObject):
+    """A download run by Flux instead of QtWebEngine.
+    
+    It offers the parts of QWebEngineDownloadRequest that DownloadItem
+    uses, so it is queued, shown and recorded like any other download.
+    Transfers go through download_engine.HttpDownload, which keeps the
+    partial file and continues it with HTTP Range requests; this is how
+    interrupted downloads are resumed, also after a restart.
+    """
+    
+    DownloadState = QWebEngineDownloadRequest.DownloadState
+    
+    receivedBytesChanged = pyqtSignal()
+    stateChanged = pyqtSignal(object)  # QWebEngineDownloadRequest.DownloadState
+    
+    def __init__(self, url, path, total_bytes=-1, segments=1, parent=None):
+        super().__init__(parent)
+        self.transfer = HttpDownload(url, path, total_bytes, segments)
+        self.error = ""
+        self._state = self.DownloadState.DownloadRequested
+        self._paused = False
+        self._restart = False
+        self._cancelled = False
+        self._thread = None
+    
+    def url(self):
+        return QUrl(self.transfer.url)
+    
+    def suggestedFileName(self):
+        return self.transfer.partial.path.name
+    
+    def downloadFileName(self):
+        return str(self.transfer.partial.path)
+    
+    def totalBytes(self):
+        return self.transfer.total_bytes
+    
+    def receivedBytes(self):
+        return self.transfer.received_bytes
+    
+    def state(self):
+        return self._state
+    
+    def isPaused(self):
+        return self._paused
+    
+    def adopt_partial(self):
+        """Continue from a file QtWebEngine left at the target path."""
+        if self.transfer.partial.adopt(self.transfer.url):
+            self.transfer.received_bytes = self.transfer.partial.received_bytes()
+    
+    def accept(self):
+        """Start the transfer."""
+        if self._state != self.DownloadState.DownloadRequested:
+            return
+        self._set_state(self.DownloadState.DownloadInProgress)
+        self._start()
+    
+    def pause(self):
+        """Stop transferring, keeping the partial file."""
+        if self._state != self.DownloadState.DownloadInProgress:
+            return
+        self._paused = True
+        self._restart = False
+        self.transfer.pause()
+    
+    def resume(self):
+        """Continue transferring from the partial file."""
+        if self._state != self.DownloadState.DownloadInProgress:
+            return
+        self._paused = False
+        if self._thread is not None:
+            # The previous run has not noticed the pause yet
+            self._restart = True
+        else:
+            self._start()
+    
+    def cancel(self):
+        """Stop transferring and delete the partial file.
+        
+        Works before ``accept`` and while paused or queued, too; a run
+        that is still winding down from a pause is cancelled when it ends.
+        """
+        if self._state not in (self.DownloadState.DownloadRequested, self.DownloadState.DownloadInProgress):
+            return
+        self._paused = False
+        self._restart = False
+        if self._thread is not None:
+            self._cancelled = True
+            self.transfer.cancel()
+        else:
+            self.transfer.partial.discard()
+            self._set_state(self.DownloadState.DownloadCancelled)
+    
+    def shutdown(self):
+        """Stop a running transfer and wait for its thread, keeping the data."""
+        if self._thread is not None:
+            self.transfer.pause()
+            self._thread.wait()
+    
+    def _start(self):
+        self.transfer.resume()
+        self._thread = DownloadThread(self.transfer, self)
+        self._thread.progress.connect(self._on_progress)
+        self._thread.transfer_finished.connect(self._on_finished)
+        self._thread.start()
+    
+    def _set_state(self, state):
+        self._state = state
+        self.stateChanged.emit(state)
+    
+    def _on_progress(self, received, total):
+        self.receivedBytesChanged.emit()
+    
+    def _on_finished(self, result, error):
+        self._thread.wait()
+        self._thread.deleteLater()
+        self._thread = None
+        
+        if result == "completed":
+            self._set_state(self.DownloadState.DownloadCompleted)
+        elif result == "cancelled" or self._cancelled:
+            # Cancelled after the run had already stopped for a pause or error
+            self.transfer.partial.discard()
+            self._set_state(self.DownloadState.DownloadCancelled)
+        elif result == "interrupted":
+            self.error = error
+            print(f"Download error: {error}")
+            self._set_state(self.DownloadState.DownloadInterrupted)
+        elif self._restart:
+            self._restart = False
+            self._start()
+
+
+class ChecksumVerifier:
+    """Streaming file digests checked against a published checksum.
+    
+    Files are read in large chunks into one reused buffer, so memory use
+    stays flat for multi-GB files; hashlib releases the GIL while it
+    hashes, so the GUI thread keeps running. The algorithm of an expected
+    value is picked from its length, so MD5, SHA-1 and SHA-512 sums work
+    alongside SHA-256, which is always computed.
+    """
+    
+    CHUNK_SIZE = 4 * 1024 * 1024
+    ALGORITHMS_BY_LENGTH = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+    SUMS_FILES = ("SHA256SUMS", "sha256sums.txt")
+    HEX_RE = re.compile(r"^\s*([0-9a-fA-F]{32,128})(?:\s+\*?(.+?))?\s*$")
+    
+    @classmethod
+    def parse_expected(cls, text, filename=None):
+        """Get the hex digest for a file from checksum text, or None.
+        
+        Accepts a bare digest or ``sha256sum`` output; with several
+        lines, the one naming ``filename`` wins.
+        """
+        for line in text.splitlines():
+            match = cls.HEX_RE.match(line)
+            if not match or len(match.group(1)) not in cls.ALGORITHMS_BY_LENGTH:
+                continue
+            name = match.group(2)
+            if name is None or filename is None or os.path.basename(name) == filename:
+                return match.group(1).lower()
+        return None
+    
+    @classmethod
+    def find_expected(cls, path):
+        """Look for ``<file>.sha256`` or a SHA256SUMS file next to a download."""
+        path = Path(path)
+        candidates = [path.with_name(path.name + ".sha256")]
+        candidates += [path.with_name(name) for name in cls.SUMS_FILES]
+        for candidate in candidates:
+            try:
+                text = candidate.read_text(encoding='utf-8', errors='replace')
+            except OSError:
+                continue
+            expected = cls.parse_expected(text, path.name)
+            if expected:
+                return expected
+        return None
+    
+    @classmethod
+    def digest_file(cls, path, algorithms=("sha256",), should_stop=None, progress=None):
+        """Hash a file with several algorithms in one pass.
+        
+        ``progress`` is called with the fraction read. Returns a dict of
+        algorithm -> hex digest, or None if stopped.
+        """
+        hashes = {name: hashlib.new(name) for name in algorithms}
+        view = memoryview(bytearray(cls.CHUNK_SIZE))
+        with open(path, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            done = 0
+            while True:
+                if should_stop is not None and should_stop():
+                    return None
+                count = f.readinto(view)
+                if not count:
+                    break
+                for digest in hashes.values():
+                    digest.update(view[:count])
+                done += count
+                if progress is not None and size:
+                    progress(done / size)
+        return {name: digest.hexdigest() for name, digest in hashes.items()}
+    
+    @classmethod
+    def verify(cls, path, expected=None, should_stop=None, progress=None):
+        """Hash a download and compare it with the expected digest.
+        
+        Returns ``(digests, status)`` where status is "verified",
+        "mismatch", "unverified" (nothing to compare with) or "failed";
+        digests is None unless the file was read.
+        """
+        if not expected:
+            expected = cls.find_expected(path)
+        algorithm = cls.ALGORITHMS_BY_LENGTH.get(len(expected)) if expected else None
+        algorithms = ["sha256"]
+        if algorithm and algorithm not in algorithms:
+            algorithms.append(algorithm)
+        
+        try:
+            digests = cls.digest_file(path, algorithms, should_stop, progress)
+        except OSError as e:
+            print(f"Checksum error: {e}")
+            return None, "failed"
+        if digests is None:
+            return None, "failed"
+        if algorithm is None:
+            return digests, "unverified"
+        return digests, "verified" if digests[algorithm] == expected.lower() else "mismatch"
+
+
+class PostProcessError(Exception):
+    """A post-processing stage failed; later stages are skipped."""
+
+
+class PostProcessJob:
+    """A completed download passing through the post-processing stages.
+    
+    Stages read and update ``path`` (a move changes it) and leave their
+    results on the job; the GUI thread copies them to the item when the
+    job finishes.
+    """
+    
+    def __init__(self, item, expected=None):
+        self.item = item
+        self.path = item.path
+        self.url = item.url
+        self.expected = expected
+        self.digests = None
+        self.verification = None
+        self.extracted_to = None
+        self.error = None
+
+
+class VerifyStage:
+    """Hash the download and compare it with a published checksum."""
+    
+    label = "Verifying"
+    
+    def __init__(self, stop_on_mismatch=True):
+        self.stop_on_mismatch = stop_on_mismatch
+    
+    def applies(self, job):
+        return True
+    
+    def run(self, job, progress, should_stop):
+        job.digests, job.verification = ChecksumVerifier.verify(
+            job.path, job.expected, should_stop, progress
+        )
+        if job.verification == "mismatch" and self.stop_on_mismatch:
+            raise PostProcessError("Checksum mismatch")
+
+
+class MoveStage:
+    """Move downloads into folders by file extension or source host.
+    
+    Each rule is a dict with a ``folder`` and ``extensions`` and/or
+    ``hosts`` lists; the first rule that matches wins. A relative folder
+    is taken from the download's own folder.
+    """
+    
+    label = "Moving"
+    
+    def __init__(self, rules):
+        self.rules = [rule for rule in rules if isinstance(rule, dict) and rule.get("folder")]
+    
+    def rule_for(self, job):
+        suffix = Path(job.path).suffix.lower().lstrip(".")
+        host = QUrl(job.url).host().lower()
+        for rule in self.rules:
+            extensions = {ext.lower().lstrip(".") for ext in rule.get("extensions", [])}
+            if suffix and suffix in extensions:
+                return rule
+            for pattern in rule.get("hosts", []):
+                pattern = pattern.lower()
+                if host == pattern or host.endswith("." + pattern):
+                    return rule
+        return None
+    
+    def applies(self, job):
+        return self.rule_for(job) is not None
+    
+    def run(self, job, progress, should_stop):
+        source = Path(job.path)
+        folder = Path(os.path.expanduser(self.rule_for(job)["folder"]))
+        if not folder.is_absolute():
+            folder = source.parent / folder
+        if folder.resolve() == source.parent.resolve():
+            return
+        folder.mkdir(parents=True, exist_ok=True)
+        target = unique_path(folder / source.name)
+        shutil.move(str(source), str(target))
+        job.path = str(target)
+
+
+class ExtractStage:
+    """Unpack zip and tar archives into a folder next to them."""
+    
+    label = "Extracting"
+    SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+    # Python's own safety filter for tar members, where available
+    TAR_OPTIONS = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    
+    def applies(self, job):
+        return job.path.lower().endswith(self.SUFFIXES)
+    
+    @staticmethod
+    def _inside(root, name):
+        """Check that an archive member lands inside the target folder."""
+        return (root / name).resolve().is_relative_to(root)
+    
+    def run(self, job, progress, should_stop):
+        source = Path(job.path)
+        name = source.name
+        for suffix in self.SUFFIXES:
+            if name.lower().endswith(suffix):
+                name = name[:-len(suffix)]
+                break
+        target = unique_path(source.parent / name).resolve()
+        target.mkdir(parents=True)
+        
+        try:
+            if source.name.lower().endswith(".zip"):
+                with zipfile.ZipFile(source) as archive:
+                    members = archive.infolist()
+                    for index, member in enumerate(members, 1):
+                        if should_stop():
+                            raise PostProcessError("Stopped")
+                        if not self._inside(target, member.filename):
+                            raise PostProcessError(f"Unsafe path in archive: {member.filename}")
+                        archive.extract(member, target)
+                        progress(index / len(members))
+            else:
+                with tarfile.open(source) as archive:
+                    members = archive.getmembers()
+                    for index, member in enumerate(members, 1):
+                        if should_stop():
+                            raise PostProcessError("Stopped")
+                        if not self._inside(target, member.name) or not (member.isfile() or member.isdir()):
+                            continue  # skip links, devices and escaping paths
+                        archive.extract(member, target, set_attrs=False, **self.TAR_OPTIONS)
+                        progress(index / len(members))
+        except (zipfile.BadZipFile, tarfile.TarError) as e:
+            shutil.rmtree(target, ignore_errors=True)
+            raise PostProcessError(f"Could not extract: {e}") from e
+        except PostProcessError:
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+        job.extracted_to = str(target)
+
+
+def unique_path(path):
+    """Get ``path``, or "name (n).ext" if it is taken."""
+    path = Path(path)
+    candidate = path
+    counter = 1
+    while candidate.exists():
+        candidate = path.with_name(f"{path.stem} ({counter}){path.suffix}")
+        counter += 1
+    return candidate
+
+
+class PostProcessor(QObject):
+    """Runs post-download stages in a bounded thread pool.
+    
+    Each job goes through the stages that apply to it, in order, on a
+    pool thread; a failing stage stops the rest. Progress and results
+    come back as signals, which Qt delivers on the GUI thread. Stages
+    are plain objects with ``label``, ``applies(job)`` and
+    ``run(job, progress, should_stop)``, so new ones can be appended
+    to ``stages``.
+    """
+    
+    job_progress = pyqtSignal(object, str)  # PostProcessJob, status text
+    job_finished = pyqtSignal(object)  # PostProcessJob
+    
+    MAX_WORKERS = 2
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stages = [VerifyStage()]
+        self._pool = None
+        self._stop = threading.Event()
+    
+    def submit(self, job, stages=None):
+        """Queue a job through ``stages`` (default: the configured ones)."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.MAX_WORKERS, thread_name_prefix="postprocess")
+        self._pool.submit(self._run, job, list(stages or self.stages))
+    
+    def _run(self, job, stages):
+        try:
+            for stage in stages:
+                if self._stop.is_set():
+                    return
+                if not stage.applies(job):
+                    continue
+                self.job_progress.emit(job, f"{stage.label}...")
+                reported = [-1]
+                
+                def progress(fraction, label=stage.label):
+                    percent = int(fraction * 100)
+                    if percent != reported[0]:
+                        reported[0] = percent
+                        self.job_progress.emit(job, f"{label} {percent}%")
+                
+                stage.run(job, progress, self._stop.is_set)
+        except Exception as e:
+            # Whatever a stage raises (encrypted archives give RuntimeError,
+            # corrupt ones EOFError or zlib.error) fails the job; it must
+            # still be reported or its row stays at the stage's label
+            job.error = str(e) or type(e).__name__
+        self.job_finished.emit(job)
+    
+    def shutdown(self):
+        """Stop running stages, drop queued jobs and wait for the pool."""
+        self._stop.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+class DownloadHistory:
+    """SQLite log of downloads that survives restarts.
+    
+    Writes are queued and applied by a background thread, which groups
+    everything queued within ``BATCH_WINDOW`` into one transaction, so
+    the GUI thread never waits on disk. Reading is left to the caller
+    (see DownloadsManager.load_history) so it can happen lazily; reads
+    share one connection, and WAL mode keeps them from waiting on the
+    writer.
+    """
+    
+    FIELDS = (
+        "id", "url", "filename", "path", "total_bytes", "received_bytes",
+        "state", "start_time", "end_time", "sha256", "verification"
+    )
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS downloads (
+            id TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            filename TEXT,
+            path TEXT,
+            total_bytes INTEGER,
+            received_bytes INTEGER,
+            state TEXT,
+            start_time TEXT,
+            end_time TEXT,
+            sha256 TEXT,
+            verification TEXT
+        );
+        CREATE INDEX IF NOT EXISTS downloads_start_time ON downloads(start_time);
+        CREATE INDEX IF NOT EXISTS downloads_url ON downloads(url);
+        CREATE INDEX IF NOT EXISTS downloads_sha256 ON downloads(sha256);
+    """
+    BATCH_WINDOW = 0.5  # seconds
+    LOAD_LIMIT = 1000
+    
+    def __init__(self, db_path=None):
+        self.db_path = db_path or self.get_history_path()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._reader = None  # connection for reads, opened on first use
+    
+    @staticmethod
+    def get_history_path():
+        """Get the download history database path."""
+        app_data = QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.AppDataLocation
+        )
+        history_dir = Path(app_data) / "Flux"
+        history_dir.mkdir(parents=True, exist_ok=True)
+        return history_dir / "downloads.db"
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(self.SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(downloads)")}
+        if "verification" not in columns:
+            try:
+                conn.execute("ALTER TABLE downloads ADD COLUMN verification TEXT")
+            except sqlite3.OperationalError:
+                pass  # added by the other connection meanwhile
+        return conn
+    
+    def save(self, item):
+        """Queue a download's current record for writing."""
+        self._put(("save", item.to_record()))
+    
+    def delete(self, download_ids):
+        """Queue the removal of downloads from the history."""
+        self._put(("delete", list(download_ids)))
+    
+    def _put(self, operation):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="download-history", daemon=True
+            )
+            self._thread.start()
+        self._queue.put(operation)
+    
+    def _run(self):
+        """Writer thread: apply queued operations in batched transactions."""
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            print(f"Error opening download history: {e}")
+            return
+        
+        insert = (
+            f"INSERT OR REPLACE INTO downloads ({', '.join(self.FIELDS)}) "
+            f"VALUES ({', '.join('?' * len(self.FIELDS))})"
+        )
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.BATCH_WINDOW
+            while batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            
+            try:
+                with conn:
+                    for operation in batch:
+                        if operation is None:
+                            running = False
+                        elif operation[0] == "save":
+                            conn.execute(insert, [operation[1][field] for field in self.FIELDS])
+                        else:
+                            conn.executemany(
+                                "DELETE FROM downloads WHERE id = ?",
+                                ((download_id,) for download_id in operation[1])
+                            )
+            except sqlite3.Error as e:
+                print(f"Error saving download history: {e}")
+        conn.close()
+    
+    def _read_connection(self):
+        if self._reader is None:
+            self._reader = self._connect()
+        return self._reader
+    
+    def load(self):
+        """Read the most recent records, oldest first."""
+        try:
+            rows = self._read_connection().execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM downloads "
+                "ORDER BY start_time DESC LIMIT ?", (self.LOAD_LIMIT,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading download history: {e}")
+            return []
+        return [dict(zip(self.FIELDS, row)) for row in reversed(rows)]
+    
+    def find_completed(self, url=None, sha256=None, limit=20):
+        """Get completed downloads of a URL or with a SHA-256, newest first."""
+        conditions = []
+        params = []
+        if url:
+            conditions.append("url = ?")
+            params.append(url)
+        if sha256:
+            conditions.append("sha256 = ?")
+            params.append(sha256)
+        if not conditions:
+            return []
+        try:
+            rows = self._read_connection().execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM downloads "
+                f"WHERE state = 'completed' AND ({' OR '.join(conditions)}) "
+                "ORDER BY start_time DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error searching download history: {e}")
+            return []
+        return [dict(zip(self.FIELDS, row)) for row in rows]
+    
+    def close(self):
+        """Flush pending writes, stop the writer thread and close the reader."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+class DownloadsManager(QObject):
+    """Manages browser downloads.
+    
+    QtWebEngine reports progress many times per second per download.
+    Those reports are coalesced so ``download_changed`` fires at most
+    ``MAX_UPDATES_PER_SECOND`` times per download; state changes are
+    passed on immediately. The flush timer only runs while progress is
+    waiting to be reported.
+    
+    Downloads are also filed in a set per state, moved whenever an item
+    reports a state change, so counts and per-state lists cost nothing
+    or only the size of the result.
+    
+    Every state change is written to a DownloadHistory; past downloads are
+    only read back when ``load_history`` is first called.
+    
+    Completed downloads go through a PostProcessor: they are hashed and
+    compared with any published checksum, then moved and extracted as
+    configured, all on pool threads.
+    
+    Bandwidth is capped by token buckets, one shared and one per download.
+    Flux-run transfers pay into them from their own threads. QtWebEngine
+    downloads cannot be paced, so a timer charges what they received
+    and pauses them until the buckets are out of debt.
+    
+    At most ``max_active`` downloads transfer at once. Downloads passed to
+    ``schedule`` beyond that are paused in the "queued" state and started,
+    highest priority first, as running ones finish or are paused. Queued
+    downloads of known size that would not fit on their volume are held
+    back until space is freed.
+    """
+    
+    download_added = pyqtSignal(int)  # row
+    download_changed = pyqtSignal(int)  # row
+    downloads_reset = pyqtSignal()
+    throughput_changed = pyqtSignal(float)  # bytes per second, all downloads
+    speed_limits_changed = pyqtSignal(int, int)  # bytes per second: total, per download
+    
+    MAX_UPDATES_PER_SECOND = 4
+    STALL_CHECK_INTERVAL = 1000  # ms
+    DEFAULT_MAX_ACTIVE = 3
+    WAIT_SAMPLES = 100
+    LIMIT_CHECK_INTERVAL = 250  # ms
+    SPACE_CHECK_INTERVAL = 30000  # ms
+    SPACE_MARGIN = 16 * 1024 * 1024  # bytes kept free on the target volume
+    
+    def __init__(self, history=None):
+        super().__init__()
         self.downloads = []
         self.download_path = self.get_default_download_path()
+        self.history = history if history is not None else DownloadHistory()
+        self.history_loaded = False
+        
+        self._rows = {}  # DownloadItem -> row
+        self._last_emit = {}  # DownloadItem -> monotonic time of last signal
+        self._pending = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush_pending)
+        
+        self._by_state = {state: set() for state in DownloadItem.STATES}
+        self._indexed_state = {}  # DownloadItem -> state it is filed under
+        
+        # Downloads in the "downloading" state. While there are any, a slow
+        # timer repaints the ones that went quiet so speed and ETA decay.
+        self._active = self._by_state["downloading"]
+        self._stall_timer = QTimer(self)
+        self._stall_timer.setInterval(self.STALL_CHECK_INTERVAL)
+        self._stall_timer.timeout.connect(self._check_stalled)
+        
+        # Scheduler. The heap holds (-priority, sequence, item); entries
+        # for items that were started or re-prioritized are skipped when
+        # they surface.
+        self.max_active = self.DEFAULT_MAX_ACTIVE
+        self._running = set()  # items holding a slot
+        self._queued = set()
+        self._queue = []
+        self._queue_sequence = 0
+        self._entries = {}  # queued item -> its live heap entry
+        self._wait_times = deque(maxlen=self.WAIT_SAMPLES)  # seconds, recent starts
+        self._starting = False
+        self._space_timer = QTimer(self)
+        self._space_timer.setInterval(self.SPACE_CHECK_INTERVAL)
+        self._space_timer.timeout.connect(self._start_queued)
+        
+        self.post_processor = PostProcessor(self)
+        self.post_processor.job_progress.connect(self._on_post_progress)
+        self.post_processor.job_finished.connect(self._on_post_finished)
+        
+        # Bandwidth limits, in bytes per second (0 = unlimited)
+        self.speed_limit = 0
+        self.item_speed_limit = 0
+        self.bandwidth = TokenBucket()
+        self._seen_bytes = {}  # QtWebEngine item -> received bytes at last check
+        self._throttled = {}  # QtWebEngine item -> monotonic time to resume it
+        self._limit_timer = QTimer(self)
+        self._limit_timer.setInterval(self.LIMIT_CHECK_INTERVAL)
+        self._limit_timer.timeout.connect(self._enforce_limits)
     
     @staticmethod
     def get_default_download_path():
@@ -114,21 +1057,665 @@ class DownloadsManager:
     
     def add_download(self, download_request):
         """Add a new download."""
-        download_item = DownloadItem(download_request)
+        download_item = DownloadItem(download_request, self._item_changed)
+        self._apply_limits(download_item)
+        self._rows[download_item] = len(self.downloads)
+        self._index_state(download_item)
         self.downloads.append(download_item)
+        self.download_added.emit(len(self.downloads) - 1)
         return download_item
     
+    def schedule(self, item, priority=0, wait_for_space=False):
+        """Let an accepted download run now or queue it for a free slot.
+        
+        With ``wait_for_space``, a download that does not fit on its
+        volume is queued even when a slot is free, and stays queued
+        until it fits; otherwise it starts regardless of space.
+        """
+        item.priority = priority
+        item.wait_for_space = wait_for_space
+        self._running.discard(item)
+        fits = not wait_for_space or self.check_space(item.path, item.total_bytes, item)[0]
+        if fits and len(self._running) < self.max_active:
+            self._running.add(item)
+        else:
+            item.queue()
+    
+    def set_max_active(self, max_active):
+        """Change how many downloads may transfer at once."""
+        self.max_active = max(1, int(max_active))
+        self._start_queued()
+    
+    def set_priority(self, item, priority):
+        """Change the priority of a download; queued ones are reordered."""
+        item.priority = priority
+        if item in self._queued:
+            self._push(item)
+    
+    def start_now(self, item):
+        """Start a queued download without waiting for a free slot."""
+        if item in self._queued:
+            self._dequeue(item)
+            item.resume()
+    
+    def _push(self, item):
+        """Add a heap entry for a queued item, superseding any older one."""
+        self._queue_sequence += 1
+        entry = (-item.priority, self._queue_sequence, item)
+        self._entries[item] = entry
+        heapq.heappush(self._queue, entry)
+    
+    def _dequeue(self, item):
+        """Take an item out of the queue and record how long it waited."""
+        self._queued.discard(item)
+        self._entries.pop(item, None)
+        if item.queued_at is not None:
+            self._wait_times.append(time.monotonic() - item.queued_at)
+            item.queued_at = None
+    
+    def _start_queued(self):
+        """Start queued downloads while there are free slots."""
+        if self._starting:
+            return
+        self._starting = True
+        held = []  # entries for downloads waiting for disk space
+        try:
+            while self._queue and len(self._running) < self.max_active:
+                entry = heapq.heappop(self._queue)
+                item = entry[2]
+                if self._entries.get(item) is not entry:
+                    continue
+                if item.wait_for_space and not self.check_space(item.path, item.total_bytes, item)[0]:
+                    held.append(entry)
+                    continue
+                self._dequeue(item)
+                self._running.add(item)
+                item.resume()
+        finally:
+            for entry in held:
+                heapq.heappush(self._queue, entry)
+            self._starting = False
+        if held:
+            self._space_timer.start()
+        else:
+            self._space_timer.stop()
+    
+    @staticmethod
+    def _volume(path):
+        """Get the device id of the volume ``path`` would be written to."""
+        directory = Path(path).absolute()
+        while not directory.exists() and directory != directory.parent:
+            directory = directory.parent
+        try:
+            return directory.stat().st_dev
+        except OSError:
+            return None
+    
+    def check_space(self, path, total_bytes, item=None):
+        """Check whether a download of ``total_bytes`` fits on the volume of ``path``.
+        
+        What running downloads to the same volume have still to write is
+        counted as taken. Returns (fits, free bytes, bytes needed); a
+        download fits when its size or the free space is unknown.
+        """
+        if not path or total_bytes <= 0:
+            return True, None, 0
+        free = free_space(path)
+        if free is None:
+            return True, None, 0
+        
+        needed = total_bytes + self.SPACE_MARGIN
+        if item is not None:
+            needed -= item.received_bytes
+        volume = self._volume(path)
+        for other in self._running:
+            if (other is not item and other.path and other.total_bytes > 0
+                    and self._volume(other.path) == volume):
+                needed += max(0, other.total_bytes - other.received_bytes)
+        return needed <= free, free, needed
+    
+    def queue_depth(self):
+        """Get the number of downloads waiting for a slot."""
+        return len(self._queued)
+    
+    def queue_stats(self):
+        """Get queue depth and wait times in seconds.
+        
+        ``average_wait`` covers recently started downloads; ``longest_wait``
+        is how long the oldest queued download has been waiting so far.
+        """
+        now = time.monotonic()
+        return {
+            "depth": len(self._queued),
+            "running": len(self._running),
+            "average_wait": sum(self._wait_times) / len(self._wait_times) if self._wait_times else 0.0,
+            "longest_wait": max((now - item.queued_at for item in self._queued), default=0.0),
+        }
+    
+    def _item_changed(self, item, state_changed):
+        """Report a change now, or queue it if the item reported recently."""
+        if item not in self._rows:
+            return  # a late signal from a cleared download
+        now = time.monotonic()
+        interval = 1.0 / self.MAX_UPDATES_PER_SECOND
+        if state_changed:
+            self.history.save(item)
+            self._index_state(item)
+            self._update_slots(item)
+            if item.state == "completed" and item.verification is None:
+                self.post_process(item)
+            if self._active and not self._stall_timer.isActive():
+                self._stall_timer.start()
+            elif not self._active:
+                self._stall_timer.stop()
+            self._update_limit_timer()
+        
+        if state_changed or now - self._last_emit.get(item, 0.0) >= interval:
+            self._pending.discard(item)
+            self._emit_changed(item, now)
+        else:
+            self._pending.add(item)
+            if not self._flush_timer.isActive():
+                remaining = self._last_emit[item] + interval - now
+                self._flush_timer.start(max(1, int(remaining * 1000)))
+    
+    def configure_post_processing(self, rules=(), extract=False):
+        """Set the stages run after the checksum: move rules and extraction."""
+        stages = [VerifyStage()]
+        if rules:
+            stages.append(MoveStage(rules))
+        if extract:
+            stages.append(ExtractStage())
+        self.post_processor.stages = stages
+    
+    def post_process(self, item, expected=None, stages=None):
+        """Run a completed download through the post-processing stages."""
+        if item.state != "completed" or not item.path:
+            return False
+        item.verification = "pending"
+        item.post_status = "Waiting..."
+        self.post_processor.submit(PostProcessJob(item, expected), stages)
+        self._emit_changed(item, time.monotonic())
+        return True
+    
+    def verify(self, item, expected=None):
+        """Hash a completed download and check it against ``expected``.
+        
+        Without an expected digest, a ``.sha256`` or SHA256SUMS file next
+        to the download is used if there is one.
+        """
+        return self.post_process(item, expected, [VerifyStage(stop_on_mismatch=False)])
+    
+    def _on_post_progress(self, job, status):
+        if job.item not in self._rows:
+            return
+        job.item.post_status = status
+        self._item_changed(job.item, False)
+    
+    def _on_post_finished(self, job):
+        """Copy a job's results to its download."""
+        item = job.item
+        if item not in self._rows:
+            # Cleared from the list while the job ran; saving it would
+            # bring it back into the history
+            return
+        item.verification = job.verification
+        item.post_status = None
+        if job.error and job.verification != "mismatch":
+            item.post_status = f"Failed: {job.error}"
+        if job.path != item.path:
+            item.path = job.path
+            item.filename = os.path.basename(job.path)
+        if job.extracted_to and not job.error:
+            item.post_status = "Extracted"
+        if job.digests:
+            item.sha256 = job.digests["sha256"]
+            if job.verification != "mismatch":
+                original = self.find_existing(sha256=item.sha256, exclude=item.id)
+                if original is not None and not self._same_file(original["path"], item.path):
+                    item.duplicate_of = original["path"]
+        self.history.save(item)
+        self._emit_changed(item, time.monotonic())
+    
+    @staticmethod
+    def _file_intact(path, size):
+        """Check that a finished download is still on disk at its size."""
+        try:
+            return bool(path) and (size <= 0 or os.path.getsize(path) == size)
+        except OSError:
+            return False
+    
+    @staticmethod
+    def _same_file(path, other):
+        """Check whether two paths are the same file (or links to it)."""
+        try:
+            return os.path.samefile(path, other)
+        except OSError:
+            return False
+    
+    def find_existing(self, url=None, sha256=None, exclude=None):
+        """Find a completed download of a URL or content still on disk.
+        
+        This session's downloads are checked first, then the history.
+        Returns the download's record, or None. ``exclude`` is an ID to
+        skip, so an item does not find itself.
+        """
+        for item in reversed(self.get_downloads("completed")):
+            if item.id != exclude and ((url and item.url == url) or (sha256 and item.sha256 == sha256)):
+                if self._file_intact(item.path, item.total_bytes):
+                    return item.to_record()
+        for record in self.history.find_completed(url, sha256):
+            if record["id"] != exclude and self._file_intact(record["path"], record["total_bytes"]):
+                return record
+        return None
+    
+    def reuse_download(self, record, path=None):
+        """Stand in a past download for a new one of the same file.
+        
+        With a different ``path``, the earlier file is hard-linked there
+        (or at a free "name (n).ext" if something else is in the way),
+        taking no extra space; if linking fails (another volume, or a file
+        system without links) the earlier path is used. The reuse is
+        added to the list as a completed download. Returns the new item.
+        """
+        target = record["path"]
+        if path and os.path.abspath(path) != os.path.abspath(target):
+            target = self._link_file(target, path) or target
+        
+        now = datetime.now().isoformat()
+        item = DownloadItem.from_record(dict(
+            record, id=uuid.uuid4().hex, path=target, filename=os.path.basename(target),
+            state="completed", start_time=now, end_time=now
+        ), self._item_changed)
+        self._rows[item] = len(self.downloads)
+        self._index_state(item)
+        self.downloads.append(item)
+        self.history.save(item)
+        self.download_added.emit(len(self.downloads) - 1)
+        return item
+    
+    def link_duplicate(self, item):
+        """Replace a download with a hard link to its identical earlier copy."""
+        if not item.duplicate_of or not self._link_file(item.duplicate_of, item.path, replace=True):
+            return False
+        item.duplicate_of = None
+        self._emit_changed(item, time.monotonic())
+        return True
+    
+    @staticmethod
+    def _link_file(source, path, replace=False):
+        """Hard-link ``source`` at ``path``.
+        
+        The link is made under a temporary name next to ``path`` first.
+        A file already at ``path`` is only replaced with ``replace`` (it
+        is the download's own copy); otherwise the link takes a free
+        "name (n).ext". Returns the path linked, or None.
+        """
+        temp_path = f"{path}.link-{uuid.uuid4().hex[:8]}"
+        try:
+            os.link(source, temp_path)
+            if replace:
+                os.replace(temp_path, path)
+                return str(path)
+            while True:
+                candidate = str(unique_path(path))
+                try:
+                    # Unlike a rename, linking never overwrites, so a file
+                    # appearing at the candidate meanwhile is left alone
+                    os.link(temp_path, candidate)
+                    return candidate
+                except FileExistsError:
+                    continue
+        except OSError as e:
+            print(f"Hard link error: {e}")
+            return None
+        finally:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+    
+    def set_speed_limits(self, total=None, per_download=None):
+        """Change the bandwidth caps in bytes per second (0 = unlimited)."""
+        if total is not None:
+            self.speed_limit = max(0, int(total))
+            self.bandwidth.set_rate(self.speed_limit)
+        if per_download is not None:
+            self.item_speed_limit = max(0, int(per_download))
+            for item in self.get_active_downloads():
+                item.limit.set_rate(self.item_speed_limit)
+        if not (self.speed_limit or self.item_speed_limit):
+            self._release_throttled()
+        self._update_limit_timer()
+        self.speed_limits_changed.emit(self.speed_limit, self.item_speed_limit)
+    
+    def _apply_limits(self, item):
+        """Give a download the per-download cap and, if Flux runs it, the global one."""
+        item.limit.set_rate(self.item_speed_limit)
+        if isinstance(item.download_request, ManagedDownload):
+            item.download_request.transfer.limiters = [item.limit, self.bandwidth]
+    
+    def _update_limit_timer(self):
+        """Run the QtWebEngine limit check only while it has work."""
+        limited = self.speed_limit or self.item_speed_limit
+        if (limited and self._active) or self._throttled:
+            if not self._limit_timer.isActive():
+                self._limit_timer.start()
+        else:
+            self._limit_timer.stop()
+            self._seen_bytes.clear()
+    
+    def _enforce_limits(self):
+        """Charge QtWebEngine downloads for what they received; pause any in debt."""
+        now = time.monotonic()
+        for item, until in list(self._throttled.items()):
+            if item.state != "downloading":
+                # Paused, queued or finished meanwhile
+                del self._throttled[item]
+            elif until <= now:
+                del self._throttled[item]
+                item.download_request.resume()
+        
+        seen = {}
+        for item in self._active:
+            if isinstance(item.download_request, ManagedDownload):
+                continue  # paced on its own thread
+            received = item.received_bytes
+            seen[item] = received
+            delta = received - self._seen_bytes.get(item, received)
+            if delta <= 0:
+                continue
+            wait = max(item.limit.charge(delta), self.bandwidth.charge(delta))
+            if wait > 0:
+                if item not in self._throttled:
+                    item.download_request.pause()
+                self._throttled[item] = max(now + wait, self._throttled.get(item, 0.0))
+        self._seen_bytes = seen
+        self._update_limit_timer()
+    
+    def _release_throttled(self):
+        """Resume every download paused only to keep under a limit."""
+        for item in self._throttled:
+            if item.state == "downloading":
+                item.download_request.resume()
+        self._throttled.clear()
+    
+    def _update_slots(self, item):
+        """Track which items hold or wait for a slot after a state change."""
+        if item.state == "queued":
+            self._running.discard(item)
+            if item not in self._queued:
+                self._queued.add(item)
+                item.queued_at = time.monotonic()
+                self._push(item)
+        else:
+            if item in self._queued:
+                # Resumed or cancelled by the user while waiting
+                self._dequeue(item)
+            if item.state in ("starting", "downloading"):
+                self._running.add(item)
+            else:
+                self._running.discard(item)
+        self._start_queued()
+    
+    def _flush_pending(self):
+        """Report queued items whose throttle interval has passed."""
+        now = time.monotonic()
+        interval = 1.0 / self.MAX_UPDATES_PER_SECOND
+        next_due = None
+        for item in list(self._pending):
+            due = self._last_emit.get(item, 0.0) + interval
+            if due <= now:
+                self._pending.discard(item)
+                self._emit_changed(item, now)
+            elif next_due is None or due < next_due:
+                next_due = due
+        if next_due is not None:
+            self._flush_timer.start(max(1, int((next_due - now) * 1000)))
+    
+    def _emit_changed(self, item, now):
+        """Emit download_changed for an item."""
+        if item.state in ("completed", "cancelled", "interrupted"):
+            self._last_emit.pop(item, None)
+        else:
+            self._last_emit[item] = now
+        row = self._rows.get(item)
+        if row is not None:
+            self.download_changed.emit(row)
+        self.throughput_changed.emit(self.total_throughput())
+    
+    def _check_stalled(self):
+        """Repaint active downloads that have not reported for a while."""
+        now = time.monotonic()
+        quiet = self.STALL_CHECK_INTERVAL / 1000.0
+        for item in list(self._active):
+            if now - self._last_emit.get(item, 0.0) >= quiet:
+                self._emit_changed(item, now)
+    
+    def total_throughput(self):
+        """Get the combined rate of all active downloads in bytes per second."""
+        return sum(item.speed for item in self._active)
+    
+    def _index_state(self, item):
+        """File an item under its current state."""
+        if item not in self._rows:
+            return  # already cleared from the list
+        old = self._indexed_state.get(item)
+        if old == item.state:
+            return
+        if old is not None:
+            self._by_state[old].discard(item)
+        self._by_state.setdefault(item.state, set()).add(item)
+        self._indexed_state[item] = item.state
+    
+    def count_downloads(self, *states):
+        """Get the number of downloads in any of the given states."""
+        return sum(len(self._by_state.get(state, ())) for state in states)
+    
+    def get_downloads(self, *states):
+        """Get the downloads in any of the given states, in list order."""
+        items = set().union(*(self._by_state.get(state, ()) for state in states))
+        rows = self._rows
+        return sorted(items, key=lambda item: rows.get(item, -1))
+    
     def get_active_downloads(self):
         """Get list of active downloads."""
-        return [d for d in self.downloads if d.state in ["downloading", "starting", "paused"]]
+        return self.get_downloads(*DownloadItem.ACTIVE_STATES)
     
     def get_completed_downloads(self):
         """Get list of completed downloads."""
-        return [d for d in self.downloads if d.state == "completed"]
+        return self.get_downloads("completed")
+    
+    def load_history(self):
+        """Put past downloads in front of this session's, once."""
+        if self.history_loaded:
+            return
+        self.history_loaded = True
+        
+        current = {item.id for item in self.downloads}
+        past = [
+            DownloadItem.from_record(record, self._item_changed) for record in self.history.load()
+            if record["id"] not in current
+        ]
+        if past:
+            self.downloads[:0] = past
+            self._rows = {item: row for row, item in enumerate(self.downloads)}
+            for item in past:
+                self._index_state(item)
+            self.downloads_reset.emit()
+    
+    def add_managed_download(self, url, path, total_bytes=-1, segments=1, wait_for_space=False):
+        """Download a URL with the Flux engine instead of QtWebEngine."""
+        request = ManagedDownload(url, path, total_bytes, segments, self)
+        item = self.add_download(request)
+        item.path = path
+        request.accept()
+        self.schedule(item, wait_for_space=wait_for_space)
+        return item
+    
+    def can_resume(self, item):
+        """Check whether an interrupted download can be continued."""
+        return (
+            item.state == "interrupted" and bool(item.path)
+            and item.url.startswith(("http://", "https://"))
+        )
+    
+    def resume_interrupted(self, item):
+        """Continue an interrupted download from its partial file.
+        
+        The rest of the file is fetched by a ManagedDownload with an HTTP
+        Range request and appended to what is already on disk.
+        """
+        if not self.can_resume(item):
+            return False
+        request = ManagedDownload(item.url, item.path, item.total_bytes, parent=self)
+        request.adopt_partial()
+        item.attach(request)
+        self._apply_limits(item)
+        request.accept()
+        self.schedule(item, item.priority)
+        return True
+    
+    def close(self):
+        """Stop transfers and post-processing and flush the download history."""
+        self.post_processor.shutdown()
+        for item in self.get_active_downloads():
+            if isinstance(item.download_request, ManagedDownload):
+                item.download_request.shutdown()
+        self.history.close()
     
     def clear_completed(self):
-        """Clear completed downloads from list."""
-        self.downloads = [d for d in self.downloads if d.state != "completed"]
+        """Clear completed downloads from list and history."""
+        completed = self._by_state["completed"]
+        if not completed:
+            return
+        self.history.delete(item.id for item in completed)
+        for item in completed:
+            del self._indexed_state[item]
+            self._pending.discard(item)
+            self._last_emit.pop(item, None)
+        self.downloads = [item for item in self.downloads if item not in completed]
+        self._rows = {item: row for row, item in enumerate(self.downloads)}
+        completed.clear()
+        self.downloads_reset.emit()
+
+
+class DownloadsTableModel(QAbstractTableModel):
+    """Table model over DownloadsManager.downloads.
+    
+    Rows are inserted, repainted and reset from the manager's signals,
+    so only downloads that actually changed are repainted.
+    """
+    
+    COLUMNS = ["File", "Status", "Size", "Progress", "Speed", "Time Left"]
+    PROGRESS_COLUMN = 3
+    DownloadRole = Qt.ItemDataRole.UserRole
+    
+    # Status column text for completed downloads, by checksum result
+    STATUS_TEXT = {
+        "pending": "Verifying...",
+        "verified": "Verified",
+        "mismatch": "Checksum mismatch",
+        "failed": "Completed (not verified)",
+    }
+    
+    def __init__(self, downloads_manager, parent=None):
+        super().__init__(parent)
+        self.downloads_manager = downloads_manager
+        self._items = list(downloads_manager.downloads)
+        
+        downloads_manager.download_added.connect(self._on_download_added)
+        downloads_manager.download_changed.connect(self._on_download_changed)
+        downloads_manager.downloads_reset.connect(self.refresh)
+    
+    def detach(self):
+        """Stop following the manager."""
+        self.downloads_manager.download_added.disconnect(self._on_download_added)
+        self.downloads_manager.download_changed.disconnect(self._on_download_changed)
+        self.downloads_manager.downloads_reset.disconnect(self.refresh)
+    
+    def download_at(self, row):
+        """Get the DownloadItem shown in a row."""
+        if 0 <= row < len(self._items):
+            return self._items[row]
+        return None
+    
+    def refresh(self):
+        """Reload every row from the manager."""
+        self.beginResetModel()
+        self._items = list(self.downloads_manager.downloads)
+        self.endResetModel()
+    
+    def _on_download_added(self, row):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._items.insert(row, self.downloads_manager.downloads[row])
+        self.endInsertRows()
+    
+    def _on_download_changed(self, row):
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        download = self._items[index.row()]
+        column = index.column()
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return download.filename
+            if column == 1:
+                if download.post_status:
+                    return download.post_status
+                return self.STATUS_TEXT.get(download.verification, download.state.capitalize())
+            if column == 2:
+                if download.total_bytes > 0:
+                    return f"{DownloadItem.format_bytes(download.received_bytes)} / {DownloadItem.format_bytes(download.total_bytes)}"
+                return DownloadItem.format_bytes(download.received_bytes)
+            if column == 3:
+                return download.get_progress_percent()
+            if column == 4:
+                return download.get_speed_text() if download.state == "downloading" else "-"
+            if column == 5:
+                return download.get_eta_text()
+        elif role == Qt.ItemDataRole.ToolTipRole and column == 0:
+            return download.path or download.url
+        elif role == Qt.ItemDataRole.ToolTipRole and column == 1 and download.sha256:
+            if download.duplicate_of:
+                return f"SHA-256: {download.sha256}\nSame content as {download.duplicate_of}"
+            return f"SHA-256: {download.sha256}"
+        elif role == self.DownloadRole:
+            return download
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+
+class ProgressBarDelegate(QStyledItemDelegate):
+    """Paints an integer percentage as a progress bar."""
+    
+    def paint(self, painter, option, index):
+        value = index.data(Qt.ItemDataRole.DisplayRole) or 0
+        
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(4, 4, -4, -4)
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = value
+        bar.text = f"{value}%"
+        bar.textVisible = True
+        bar.state = option.state
+        
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ProgressBar, bar, painter, option.widget)
 
 
 class DownloadsDialog(QDialog):
@@ -137,14 +1724,16 @@ class DownloadsDialog(QDialog):
     def __init__(self, downloads_manager, parent=None):
         super().__init__(parent)
         self.downloads_manager = downloads_manager
+        self.downloads_manager.load_history()
         self.setWindowTitle("Downloads")
         self.setMinimumSize(800, 500)
         self.init_ui()
         
-        # Update timer
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update_downloads)
-        self.update_timer.start(500)  # Update every 500ms
+        # Rows repaint themselves from the model; the stats and actions
+        # follow the same signals
+        downloads_manager.download_added.connect(self.update_status)
+        downloads_manager.download_changed.connect(self.update_status)
+        downloads_manager.downloads_reset.connect(self.update_status)
     
     def init_ui(self):
         """Initialize UI."""
@@ -160,30 +1749,62 @@ class DownloadsDialog(QDialog):
             refresh_action = toolbar.addAction(qta.icon('fa5s.sync'), "Refresh")
             open_folder_action = toolbar.addAction(qta.icon('fa5s.folder-open'), "Open Downloads Folder")
             clear_action = toolbar.addAction(qta.icon('fa5s.broom'), "Clear Completed")
+            toolbar.addSeparator()
+            self.pause_action = toolbar.addAction(qta.icon('fa5s.pause'), "Pause")
+            self.resume_action = toolbar.addAction(qta.icon('fa5s.play'), "Resume")
+            self.cancel_action = toolbar.addAction(qta.icon('fa5s.times'), "Cancel")
         else:
             refresh_action = toolbar.addAction("Refresh")
             open_folder_action = toolbar.addAction("Open Folder")
             clear_action = toolbar.addAction("Clear Completed")
+            toolbar.addSeparator()
+            self.pause_action = toolbar.addAction("Pause")
+            self.resume_action = toolbar.addAction("Resume")
+            self.cancel_action = toolbar.addAction("Cancel")
         
         refresh_action.triggered.connect(self.update_downloads)
         open_folder_action.triggered.connect(self.open_downloads_folder)
         clear_action.triggered.connect(self.clear_completed)
+        self.pause_action.triggered.connect(lambda: self.for_selected("downloading", lambda d: d.pause()))
+        self.resume_action.triggered.connect(self.resume_selected)
+        self.cancel_action.triggered.connect(self.cancel_selected)
+        
+        # Bandwidth limits, applied as they are edited
+        toolbar.addSeparator()
+        toolbar.addWidget(QLabel(" Limit: "))
+        self.total_limit_spin = self.create_limit_spin(self.downloads_manager.speed_limit)
+        self.total_limit_spin.setToolTip("Combined speed of all downloads")
+        self.total_limit_spin.valueChanged.connect(
+            lambda value: self.downloads_manager.set_speed_limits(total=value * 1024)
+        )
+        toolbar.addWidget(self.total_limit_spin)
+        toolbar.addWidget(QLabel(" Per download: "))
+        self.item_limit_spin = self.create_limit_spin(self.downloads_manager.item_speed_limit)
+        self.item_limit_spin.setToolTip("Speed of each download")
+        self.item_limit_spin.valueChanged.connect(
+            lambda value: self.downloads_manager.set_speed_limits(per_download=value * 1024)
+        )
+        toolbar.addWidget(self.item_limit_spin)
         
         layout.addWidget(toolbar)
         
         # Downloads table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["File", "Status", "Size", "Progress", "Speed", "Actions"])
+        self.model = DownloadsTableModel(self.downloads_manager, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegateForColumn(DownloadsTableModel.PROGRESS_COLUMN, ProgressBarDelegate(self.table))
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
         self.table.setColumnWidth(1, 100)
-        self.table.setColumnWidth(2, 100)
+        self.table.setColumnWidth(2, 150)
         self.table.setColumnWidth(3, 150)
         self.table.setColumnWidth(4, 100)
-        self.table.setColumnWidth(5, 150)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setColumnWidth(5, 80)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
+        self.table.doubleClicked.connect(self.on_double_click)
+        self.table.selectionModel().selectionChanged.connect(self.update_actions)
         
         layout.addWidget(self.table)
         
@@ -202,99 +1823,134 @@ class DownloadsDialog(QDialog):
         layout.addLayout(button_layout)
         
         # Initial update
-        self.update_downloads()
+        self.update_status()
+    
+    @staticmethod
+    def create_limit_spin(limit):
+        """Create a KiB/s spin box where 0 means unlimited."""
+        spin = QSpinBox()
+        spin.setRange(0, 1024 * 1024)
+        spin.setSingleStep(128)
+        spin.setSuffix(" KiB/s")
+        spin.setSpecialValueText("Unlimited")
+        spin.setValue(limit // 1024)
+        return spin
     
     def update_downloads(self):
-        """Update downloads table."""
-        downloads = self.downloads_manager.downloads
-        self.table.setRowCount(len(downloads))
-        
-        for i, download in enumerate(downloads):
-            # Filename
-            filename_item = QTableWidgetItem(download.filename)
-            self.table.setItem(i, 0, filename_item)
-            
-            # Status
-            status_item = QTableWidgetItem(download.state.capitalize())
-            self.table.setItem(i, 1, status_item)
-            
-            # Size
-            if download.total_bytes > 0:
-                size_text = f"{DownloadItem.format_bytes(download.received_bytes)} / {DownloadItem.format_bytes(download.total_bytes)}"
-            else:
-                size_text = DownloadItem.format_bytes(download.received_bytes)
-            size_item = QTableWidgetItem(size_text)
-            self.table.setItem(i, 2, size_item)
-            
-            # Progress bar
-            progress_widget = QWidget()
-            progress_layout = QVBoxLayout(progress_widget)
-            progress_layout.setContentsMargins(4, 4, 4, 4)
-            
-            progress_bar = QProgressBar()
-            progress_bar.setValue(download.get_progress_percent())
-            progress_layout.addWidget(progress_bar)
-            
-            self.table.setCellWidget(i, 3, progress_widget)
-            
-            # Speed
-            if download.state == "downloading":
-                speed_text = download.get_speed_text()
-            else:
-                speed_text = "-"
-            speed_item = QTableWidgetItem(speed_text)
-            self.table.setItem(i, 4, speed_item)
-            
-            # Actions
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(4, 4, 4, 4)
-            actions_layout.setSpacing(4)
-            
-            if download.state == "downloading":
-                pause_btn = QPushButton("Pause")
-                pause_btn.clicked.connect(lambda checked, d=download: d.pause())
-                actions_layout.addWidget(pause_btn)
-                
-                cancel_btn = QPushButton("Cancel")
-                cancel_btn.clicked.connect(lambda checked, d=download: d.cancel())
-                actions_layout.addWidget(cancel_btn)
-            
-            elif download.state == "paused":
-                resume_btn = QPushButton("Resume")
-                resume_btn.clicked.connect(lambda checked, d=download: d.resume())
-                actions_layout.addWidget(resume_btn)
-                
-                cancel_btn = QPushButton("Cancel")
-                cancel_btn.clicked.connect(lambda checked, d=download: d.cancel())
-                actions_layout.addWidget(cancel_btn)
-            
-            elif download.state == "completed":
-                open_btn = QPushButton("Open")
-                open_btn.clicked.connect(lambda checked, d=download: self.open_file(d))
-                actions_layout.addWidget(open_btn)
-                
-                show_btn = QPushButton("Show in Folder")
-                show_btn.clicked.connect(lambda checked, d=download: self.show_in_folder(d))
-                actions_layout.addWidget(show_btn)
-            
-            self.table.setCellWidget(i, 5, actions_widget)
+        """Reload the downloads table."""
+        self.model.refresh()
+        self.update_status()
+    
+    def update_status(self, *args):
+        """Update the stats label and the toolbar actions."""
+        self.update_actions()
         
         # Update stats
-        active = len(self.downloads_manager.get_active_downloads())
-        completed = len(self.downloads_manager.get_completed_downloads())
-        self.stats_label.setText(f"Active: {active} | Completed: {completed} | Total: {len(downloads)}")
+        active = self.downloads_manager.count_downloads(*DownloadItem.ACTIVE_STATES)
+        completed = self.downloads_manager.count_downloads("completed")
+        total = len(self.downloads_manager.downloads)
+        text = f"Active: {active} | Completed: {completed} | Total: {total}"
+        queued = self.downloads_manager.queue_depth()
+        if queued:
+            text += f" | Queued: {queued}"
+        if active:
+            throughput = self.downloads_manager.total_throughput()
+            text += f" | {DownloadItem.format_bytes(throughput)}/s"
+        self.stats_label.setText(text)
+    
+    def selected_downloads(self):
+        """Get the DownloadItems of the selected rows."""
+        return [
+            self.model.download_at(index.row())
+            for index in self.table.selectionModel().selectedRows()
+        ]
+    
+    def update_actions(self, *args):
+        """Enable the toolbar actions that apply to the selection."""
+        selected = self.selected_downloads()
+        states = {download.state for download in selected}
+        self.pause_action.setEnabled("downloading" in states)
+        self.resume_action.setEnabled(
+            "paused" in states or any(self.downloads_manager.can_resume(d) for d in selected)
+        )
+        self.cancel_action.setEnabled(bool(states & {"downloading", "paused", "starting", "queued"}))
+    
+    def for_selected(self, state, action):
+        """Apply an action to the selected downloads in a given state."""
+        for download in self.selected_downloads():
+            if download.state == state:
+                action(download)
+    
+    def resume_selected(self):
+        """Resume the selected paused or interrupted downloads."""
+        for download in self.selected_downloads():
+            if download.state == "paused":
+                download.resume()
+            else:
+                self.downloads_manager.resume_interrupted(download)
+    
+    def cancel_selected(self):
+        """Cancel the selected unfinished downloads."""
+        for download in self.selected_downloads():
+            if download.state in ("downloading", "paused", "starting", "queued"):
+                download.cancel()
+    
+    def move_to_front(self, download):
+        """Give a queued download the highest priority in the queue."""
+        top = max(item.priority for item in self.downloads_manager.get_downloads("queued"))
+        self.downloads_manager.set_priority(download, top + 1)
+    
+    def on_double_click(self, index):
+        """Open a completed download."""
+        download = self.model.download_at(index.row())
+        if download is not None and download.state == "completed":
+            self.open_file(download)
     
     def show_context_menu(self, pos):
         """Show context menu."""
-        row = self.table.rowAt(pos.y())
-        if row < 0:
+        download = self.model.download_at(self.table.rowAt(pos.y()))
+        if download is None:
             return
         
-        download = self.downloads_manager.downloads[row]
         menu = QMenu(self)
         
-        if download.state == "completed":
+        if download.state == "downloading":
+            if HAS_ICONS:
+                pause_action = menu.addAction(qta.icon('fa5s.pause'), "Pause")
+                cancel_action = menu.addAction(qta.icon('fa5s.times'), "Cancel")
+            else:
+                pause_action = menu.addAction("Pause")
+                cancel_action = menu.addAction("Cancel")
+            
+            pause_action.triggered.connect(download.pause)
+            cancel_action.triggered.connect(download.cancel)
+        
+        elif download.state == "paused":
+            if HAS_ICONS:
+                resume_action = menu.addAction(qta.icon('fa5s.play'), "Resume")
+                cancel_action = menu.addAction(qta.icon('fa5s.times'), "Cancel")
+            else:
+                resume_action = menu.addAction("Resume")
+                cancel_action = menu.addAction("Cancel")
+            
+            resume_action.triggered.connect(download.resume)
+            cancel_action.triggered.connect(download.cancel)
+        
+        elif download.state == "queued":
+            if HAS_ICONS:
+                start_action = menu.addAction(qta.icon('fa5s.play'), "Start Now")
+                next_action = menu.addAction(qta.icon('fa5s.arrow-up'), "Download Next")
+                cancel_action = menu.addAction(qta.icon('fa5s.times'), "Cancel")
+            else:
+                start_action = menu.addAction("Start Now")
+                next_action = menu.addAction("Download Next")
+                cancel_action = menu.addAction("Cancel")
+            
+            start_action.triggered.connect(lambda: self.downloads_manager.start_now(download))
+            next_action.triggered.connect(lambda: self.move_to_front(download))
+            cancel_action.triggered.connect(download.cancel)
+        
+        elif download.state == "completed":
             if HAS_ICONS:
                 open_action = menu.addAction(qta.icon('fa5s.folder-open'), "Open File")
                 show_action = menu.addAction(qta.icon('fa5s.search'), "Show in Folder")
@@ -304,9 +1960,60 @@ class DownloadsDialog(QDialog):
             
             open_action.triggered.connect(lambda: self.open_file(download))
             show_action.triggered.connect(lambda: self.show_in_folder(download))
+            
+            menu.addSeparator()
+            if HAS_ICONS:
+                verify_action = menu.addAction(qta.icon('fa5s.check-circle'), "Verify Checksum...")
+            else:
+                verify_action = menu.addAction("Verify Checksum...")
+            verify_action.setEnabled(download.verification != "pending")
+            verify_action.triggered.connect(lambda: self.verify_checksum(download))
+            
+            if download.duplicate_of:
+                link_action = menu.addAction("Replace with Link to Earlier Copy")
+                link_action.setToolTip(download.duplicate_of)
+                link_action.triggered.connect(lambda: self.link_duplicate(download))
+        
+        elif self.downloads_manager.can_resume(download):
+            if HAS_ICONS:
+                resume_action = menu.addAction(qta.icon('fa5s.redo'), "Resume")
+            else:
+                resume_action = menu.addAction("Resume")
+            
+            resume_action.triggered.connect(lambda: self.downloads_manager.resume_interrupted(download))
         
+        if menu.isEmpty():
+            return
         menu.exec(QCursor.pos())
     
+    def link_duplicate(self, download):
+        """Free the space of a download that duplicates an earlier one."""
+        size = DownloadItem.format_bytes(download.total_bytes)
+        reply = QMessageBox.question(
+            self, "Replace with Link",
+            f"{download.filename} has the same content as\n{download.duplicate_of}.\n\n"
+            f"Replace it with a hard link to free {size}? Both names will then "
+            "share one file, so editing one changes the other.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes and not self.downloads_manager.link_duplicate(download):
+            QMessageBox.warning(self, "Error", "Could not create the link (the files may be on different drives).")
+    
+    def verify_checksum(self, download):
+        """Check a download against a checksum the user pastes."""
+        text, ok = QInputDialog.getText(
+            self, "Verify Checksum",
+            "Paste the published checksum (MD5, SHA-1, SHA-256 or SHA-512).\n"
+            "Leave empty to use a .sha256 file next to the download:"
+        )
+        if not ok:
+            return
+        expected = ChecksumVerifier.parse_expected(text, download.filename) if text.strip() else None
+        if text.strip() and expected is None:
+            QMessageBox.warning(self, "Verify Checksum", "That does not look like a checksum.")
+            return
+        self.downloads_manager.verify(download, expected)
+    
     def open_file(self, download):
         """Open downloaded file."""
         if download.path and os.path.exists(download.path):
@@ -329,9 +2036,13 @@ class DownloadsDialog(QDialog):
     def clear_completed(self):
         """Clear completed downloads."""
         self.downloads_manager.clear_completed()
-        self.update_downloads()
     
-    def closeEvent(self, event):
-        """Handle dialog close."""
-        self.update_timer.stop()
-        super().closeEvent(event)
\ No newline at end of file
+    def done(self, result):
+        """Stop following the manager once the dialog is closed."""
+        if self.model is not None:
+            self.model.detach()
+            self.model = None
+            self.downloads_manager.download_added.disconnect(self.update_status)
+            self.downloads_manager.download_changed.disconnect(self.update_status)
+            self.downloads_manager.downloads_reset.disconnect(self.update_status)
+        super().done(result)
\ No newline at end of file
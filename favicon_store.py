@@ -0,0 +1,149 @@
+# favicon_store.py
+"""
+Favicon Store - Persistent icon cache
+Features: Content-addressed on-disk icons, host/icon URL index, in-memory LRU
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import urlsplit
+from PyQt6.QtCore import QObject, QTimer, QBuffer, QIODevice, QStandardPaths, pyqtSignal
+from PyQt6.QtGui import QIcon
+
+
+class FaviconStore(QObject):
+    """Favicon cache shared by tabs, bookmarks and history.
+    
+    Each distinct image is written once as ``<sha256>.png``; an index maps
+    page hosts and icon URLs to those hashes, so sites sharing an icon
+    share one file. The index is loaded on first use and saved shortly
+    after it changes. Decoded icons are kept in a small LRU.
+    """
+    
+    icon_changed = pyqtSignal(str)  # host
+    
+    ICON_SIZE = 32
+    LRU_SIZE = 256
+    SAVE_DELAY = 2000  # ms
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store_dir = self.get_store_path()
+        self.index_file = self.store_dir / "index.json"
+        self._index = None
+        self._icons = OrderedDict()  # hash -> QIcon
+        
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(self.SAVE_DELAY)
+        self._save_timer.timeout.connect(self.save)
+    
+    @staticmethod
+    def get_store_path():
+        """Get the favicon directory path."""
+        app_data = QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.AppDataLocation
+        )
+        store_dir = Path(app_data) / "Flux" / "favicons"
+        store_dir.mkdir(parents=True, exist_ok=True)
+        return store_dir
+    
+    @staticmethod
+    def host_for_url(url):
+        """Get the host an icon is filed under for a page URL."""
+        try:
+            host = urlsplit(url).hostname or ""
+        except ValueError:
+            return ""
+        return host[4:] if host.startswith("www.") else host
+    
+    def _get_index(self):
+        """Get the host/icon URL index, loading it on first use."""
+        if self._index is None:
+            self._index = {"hosts": {}, "icons": {}}
+            if self.index_file.exists():
+                try:
+                    with open(self.index_file, 'r', encoding='utf-8') as f:
+                        self._index.update(json.load(f))
+                except (json.JSONDecodeError, IOError) as e:
+                    print(f"Error loading favicon index: {e}")
+        return self._index
+    
+    def save(self):
+        """Write the index to disk."""
+        self._save_timer.stop()
+        if self._index is None:
+            return
+        try:
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f)
+        except IOError as e:
+            print(f"Error saving favicon index: {e}")
+    
+    def _load_icon(self, digest):
+        """Get the decoded icon for a hash through the LRU."""
+        icon = self._icons.get(digest)
+        if icon is not None:
+            self._icons.move_to_end(digest)
+            return icon
+        
+        path = self.store_dir / f"{digest}.png"
+        if not path.exists():
+            return None
+        icon = QIcon(str(path))
+        self._remember(digest, icon)
+        return icon
+    
+    def _remember(self, digest, icon):
+        """Put an icon in the LRU, evicting the least recently used."""
+        self._icons[digest] = icon
+        self._icons.move_to_end(digest)
+        if len(self._icons) > self.LRU_SIZE:
+            self._icons.popitem(last=False)
+    
+    def icon_for_url(self, url):
+        """Get the cached icon for a page URL, or None."""
+        digest = self._get_index()["hosts"].get(self.host_for_url(url))
+        return self._load_icon(digest) if digest else None
+    
+    def icon_for_icon_url(self, icon_url):
+        """Get the cached icon for an icon URL, or None."""
+        digest = self._get_index()["icons"].get(icon_url)
+        return self._load_icon(digest) if digest else None
+    
+    def store_icon(self, page_url, icon, icon_url=""):
+        """Remember the icon shown for a page."""
+        host = self.host_for_url(page_url)
+        if not host or icon.isNull():
+            return
+        
+        index = self._get_index()
+        digest = index["icons"].get(icon_url) if icon_url else None
+        if digest is None:
+            buffer = QBuffer()
+            buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+            icon.pixmap(self.ICON_SIZE, self.ICON_SIZE).save(buffer, "PNG")
+            png = bytes(buffer.data())
+            if not png:
+                return
+            
+            digest = hashlib.sha256(png).hexdigest()
+            path = self.store_dir / f"{digest}.png"
+            if not path.exists():
+                try:
+                    path.write_bytes(png)
+                except IOError as e:
+                    print(f"Error saving favicon: {e}")
+                    return
+            self._remember(digest, icon)
+        
+        changed = index["hosts"].get(host) != digest
+        if icon_url and index["icons"].get(icon_url) != digest:
+            index["icons"][icon_url] = digest
+            self._save_timer.start()
+        if changed:
+            index["hosts"][host] = digest
+            self._save_timer.start()
+            self.icon_changed.emit(host)
\ No newline at end of file
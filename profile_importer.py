@@ -0,0 +1,318 @@
+# profile_importer.py
+"""
+Browser Profile Importer
+Features: Import bookmarks and history from Chromium and Firefox profiles
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+class ProfileImporter:
+    """Imports bookmarks and history from other browsers' profile files.
+    
+    Chromium-based browsers keep bookmarks in a ``Bookmarks`` JSON file and
+    history in a ``History`` SQLite database; Firefox keeps both in
+    ``places.sqlite``. Databases are opened read-only and, when the other
+    browser is running and holds a lock, read from a temporary copy.
+    Bookmarks go into BookmarksManager through a single ``add_bookmarks``
+    batch; history visits are handed to the history store's ``add_visits``
+    in batches, and history is not imported into stores without it.
+    """
+    
+    HISTORY_BATCH = 1000
+    CHROMIUM_EPOCH = datetime(1601, 1, 1)
+    
+    # Chromium root node -> Flux location or folder name
+    CHROMIUM_ROOTS = {
+        "bookmark_bar": "bookmarks_bar",
+        "other": "other_bookmarks",
+        "synced": "Mobile Bookmarks",
+    }
+    
+    # Firefox root folder GUID -> Flux location or folder name
+    FIREFOX_ROOTS = {
+        "toolbar_____": "bookmarks_bar",
+        "unfiled_____": "other_bookmarks",
+        "menu________": "Bookmarks Menu",
+        "mobile______": "Mobile Bookmarks",
+    }
+    FIREFOX_TAGS_ROOT = "tags________"
+    
+    def __init__(self, bookmarks_manager, history_manager=None):
+        self.bookmarks_manager = bookmarks_manager
+        self.history_manager = history_manager
+    
+    @staticmethod
+    def find_profiles():
+        """Find installed browser profiles.
+        
+        Returns a list of ``(name, path)`` pairs, where path is a Chromium
+        ``Bookmarks`` file or a Firefox ``places.sqlite`` file.
+        """
+        home = Path.home()
+        if os.name == 'nt':
+            local = Path(os.getenv('LOCALAPPDATA', ''))
+            roaming = Path(os.getenv('APPDATA', ''))
+            chromium_dirs = {
+                "Google Chrome": local / "Google" / "Chrome" / "User Data",
+                "Microsoft Edge": local / "Microsoft" / "Edge" / "User Data",
+                "Brave": local / "BraveSoftware" / "Brave-Browser" / "User Data",
+            }
+            firefox_dir = roaming / "Mozilla" / "Firefox" / "Profiles"
+        elif sys.platform == 'darwin':
+            support = home / "Library" / "Application Support"
+            chromium_dirs = {
+                "Google Chrome": support / "Google" / "Chrome",
+                "Microsoft Edge": support / "Microsoft Edge",
+                "Brave": support / "BraveSoftware" / "Brave-Browser",
+            }
+            firefox_dir = support / "Firefox" / "Profiles"
+        else:
+            config = home / ".config"
+            chromium_dirs = {
+                "Google Chrome": config / "google-chrome",
+                "Chromium": config / "chromium",
+                "Microsoft Edge": config / "microsoft-edge",
+                "Brave": config / "BraveSoftware" / "Brave-Browser",
+            }
+            firefox_dir = home / ".mozilla" / "firefox"
+        
+        profiles = []
+        for name, user_data in chromium_dirs.items():
+            for bookmarks_file in sorted(user_data.glob("*/Bookmarks")):
+                profiles.append((f"{name} ({bookmarks_file.parent.name})", str(bookmarks_file)))
+        for places_file in sorted(firefox_dir.glob("*/places.sqlite")):
+            profiles.append((f"Firefox ({places_file.parent.name})", str(places_file)))
+        return profiles
+    
+    @staticmethod
+    def is_profile_file(filepath):
+        """Check whether a path looks like a Chromium or Firefox bookmarks store."""
+        name = Path(filepath).name.lower()
+        return name == "bookmarks" or name.endswith(".sqlite")
+    
+    def import_file(self, filepath, include_history=False):
+        """Import from a Chromium ``Bookmarks`` or Firefox ``places.sqlite`` file.
+        
+        Returns ``(bookmarks added, visits imported)``, or None on error.
+        """
+        if Path(filepath).suffix.lower() == ".sqlite":
+            return self.import_firefox(filepath, include_history)
+        return self.import_chromium(filepath, include_history)
+    
+    @staticmethod
+    @contextmanager
+    def open_database(filepath):
+        """Open a SQLite database read-only, copying it first if it is locked."""
+        conn = sqlite3.connect(f"{Path(filepath).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        except sqlite3.OperationalError:
+            # The owning browser is running and holds an exclusive lock
+            conn.close()
+            conn = None
+        
+        if conn is not None:
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            copy_path = Path(tmp_dir) / Path(filepath).name
+            shutil.copyfile(filepath, copy_path)
+            wal_path = Path(f"{filepath}-wal")
+            if wal_path.exists():
+                shutil.copyfile(wal_path, f"{copy_path}-wal")
+            conn = sqlite3.connect(copy_path)
+            try:
+                yield conn
+            finally:
+                conn.close()
+    
+    def can_import_history(self):
+        """Check whether the history store takes timestamped visits in batches.
+        
+        Adding visits one at a time would stamp them all with the current
+        time, so history is only imported through ``add_visits``.
+        """
+        return callable(getattr(self.history_manager, "add_visits", None))
+    
+    def _import_history(self, conn, query, to_iso):
+        """Stream visits from a history query to the history store in batches."""
+        if not self.can_import_history():
+            print("History import skipped: the history store has no add_visits")
+            return 0
+        
+        count = 0
+        cursor = conn.execute(query)
+        while True:
+            rows = cursor.fetchmany(self.HISTORY_BATCH)
+            if not rows:
+                break
+            self.history_manager.add_visits([
+                {"url": url, "title": title or url, "visit_time": to_iso(visit_time)}
+                for url, title, visit_time in rows
+            ])
+            count += len(rows)
+        return count
+    
+    @classmethod
+    def chromium_time(cls, value):
+        """Convert a Chromium timestamp (microseconds since 1601) to ISO format."""
+        try:
+            return (cls.CHROMIUM_EPOCH + timedelta(microseconds=int(value))).isoformat()
+        except (TypeError, ValueError, OverflowError):
+            return datetime.now().isoformat()
+    
+    @classmethod
+    def iter_chromium_bookmarks(cls, data):
+        """Yield bookmark entries from a parsed Chromium ``Bookmarks`` file."""
+        for root_name, node in data.get("roots", {}).items():
+            if not isinstance(node, dict) or root_name not in cls.CHROMIUM_ROOTS:
+                continue
+            root = cls.CHROMIUM_ROOTS[root_name]
+            stack = [(child, ()) for child in reversed(node.get("children", []))]
+            while stack:
+                node, path = stack.pop()
+                if node.get("type") == "folder":
+                    path += (node.get("name") or "Untitled",)
+                    stack.extend((child, path) for child in reversed(node.get("children", [])))
+                elif node.get("url"):
+                    yield {
+                        "url": node["url"],
+                        "title": node.get("name") or node["url"],
+                        "folder": cls.folder_for_path(root, path),
+                        "date_added": cls.chromium_time(node.get("date_added")),
+                    }
+    
+    @staticmethod
+    def folder_for_path(root, path):
+        """Map a root location and a folder path to a Flux location.
+        
+        Nested folders are flattened to "Parent/Child" names, the same way
+        the Netscape importer does.
+        """
+        if root in ("bookmarks_bar", "other_bookmarks"):
+            return "/".join(path) if path else root
+        return "/".join((root,) + path)
+    
+    def import_chromium(self, filepath, include_history=False):
+        """Import a Chromium ``Bookmarks`` file and, optionally, its ``History``.
+        
+        Returns ``(bookmarks added, visits imported)``, or None on error.
+        """
+        try:
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except PermissionError:
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    copy_path = shutil.copy(filepath, tmp_dir)
+                    with open(copy_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+            
+            added = len(self.bookmarks_manager.add_bookmarks(self.iter_chromium_bookmarks(data)))
+            
+            visits = 0
+            history_file = Path(filepath).with_name("History")
+            if include_history and history_file.exists():
+                with self.open_database(history_file) as conn:
+                    visits = self._import_history(
+                        conn,
+                        "SELECT u.url, u.title, v.visit_time FROM visits v "
+                        "JOIN urls u ON u.id = v.url ORDER BY v.visit_time",
+                        self.chromium_time
+                    )
+            return added, visits
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Chromium import error: {e}")
+            return None
+    
+    @staticmethod
+    def firefox_time(value):
+        """Convert a Firefox timestamp (microseconds since 1970) to ISO format."""
+        try:
+            return datetime.fromtimestamp(int(value) / 1000000).isoformat()
+        except (TypeError, ValueError, OverflowError, OSError):
+            return datetime.now().isoformat()
+    
+    @classmethod
+    def iter_firefox_bookmarks(cls, conn):
+        """Yield bookmark entries from an open ``places.sqlite`` database."""
+        folders = {}  # id -> (parent id, title, guid)
+        for folder_id, parent, title, guid in conn.execute(
+            "SELECT id, parent, title, guid FROM moz_bookmarks WHERE type = 2"
+        ):
+            folders[folder_id] = (parent, title, guid)
+        
+        locations = {}  # folder id -> Flux location, or None for tags
+        
+        def location_for(folder_id):
+            if folder_id in locations:
+                return locations[folder_id]
+            path = []
+            root = "other_bookmarks"
+            current = folder_id
+            while current in folders:
+                parent, title, guid = folders[current]
+                if guid == cls.FIREFOX_TAGS_ROOT:
+                    root = None
+                    break
+                if guid in cls.FIREFOX_ROOTS:
+                    root = cls.FIREFOX_ROOTS[guid]
+                    break
+                path.append(title or "Untitled")
+                current = parent
+            location = root and cls.folder_for_path(root, tuple(reversed(path)))
+            locations[folder_id] = location
+            return location
+        
+        rows = conn.execute(
+            "SELECT b.parent, b.title, b.dateAdded, p.url FROM moz_bookmarks b "
+            "JOIN moz_places p ON p.id = b.fk "
+            "WHERE b.type = 1 ORDER BY b.parent, b.position"
+        )
+        for parent, title, date_added, url in rows:
+            # place: URLs are saved searches, not pages
+            if not url or url.startswith("place:"):
+                continue
+            location = location_for(parent)
+            if location is None:
+                continue
+            yield {
+                "url": url,
+                "title": title or url,
+                "folder": location,
+                "date_added": cls.firefox_time(date_added),
+            }
+    
+    def import_firefox(self, filepath, include_history=False):
+        """Import bookmarks and, optionally, history from ``places.sqlite``.
+        
+        Returns ``(bookmarks added, visits imported)``, or None on error.
+        """
+        try:
+            with self.open_database(filepath) as conn:
+                added = len(self.bookmarks_manager.add_bookmarks(self.iter_firefox_bookmarks(conn)))
+                visits = 0
+                if include_history:
+                    visits = self._import_history(
+                        conn,
+                        "SELECT p.url, p.title, v.visit_date FROM moz_historyvisits v "
+                        "JOIN moz_places p ON p.id = v.place_id ORDER BY v.visit_date",
+                        self.firefox_time
+                    )
+            return added, visits
+        except (OSError, sqlite3.Error) as e:
+            print(f"Firefox import error: {e}")
+            return None
\ No newline at end of file
@@ -7,7 +7,7 @@ This file can be used standalone or compiled into an executable.
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox, 
     QPushButton, QComboBox, QGroupBox, QSpacerItem, QSizePolicy,
-    QLineEdit, QTabWidget, QWidget, QFrame, QMessageBox
+    QLineEdit, QTabWidget, QWidget, QFrame, QMessageBox, QSpinBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
@@ -366,6 +366,30 @@ class SettingsDialog(QDialog):
         )
         downloads_layout.addWidget(self.ask_download_check)
         
+        concurrent_layout = QHBoxLayout()
+        concurrent_label = QLabel("Simultaneous downloads:")
+        concurrent_label.setMinimumWidth(140)
+        self.concurrent_spin = QSpinBox()
+        self.concurrent_spin.setRange(1, 10)
+        self.concurrent_spin.setToolTip("Further downloads wait in a queue until one finishes")
+        self.concurrent_spin.setValue(self.config.get_setting("max_concurrent_downloads") or 3)
+        concurrent_layout.addWidget(concurrent_label)
+        concurrent_layout.addWidget(self.concurrent_spin)
+        concurrent_layout.addStretch()
+        downloads_layout.addLayout(concurrent_layout)
+        
+        self.segmented_check = QCheckBox("Download large files over several connections")
+        self.segmented_check.setToolTip(
+            "Faster on high-latency links. The file is fetched again without the page's cookies,\n"
+            "so downloads that need a login may fail."
+        )
+        self.segmented_check.setChecked(bool(self.config.get_setting("segmented_downloads")))
+        downloads_layout.addWidget(self.segmented_check)
+        
+        self.extract_check = QCheckBox("Extract downloaded zip and tar archives")
+        self.extract_check.setChecked(bool(self.config.get_setting("extract_downloaded_archives")))
+        downloads_layout.addWidget(self.extract_check)
+        
         layout.addWidget(downloads_group)
         
         # Spacer
@@ -531,6 +555,26 @@ class SettingsDialog(QDialog):
         )
         performance_layout.addWidget(self.hardware_accel_check)
         
+        self.sqlite_bookmarks_check = QCheckBox("Store bookmarks in a database (requires restart)")
+        self.sqlite_bookmarks_check.setToolTip("Faster loading and saving for large bookmark collections")
+        self.sqlite_bookmarks_check.setChecked(
+            self.config.get_setting("bookmarks_backend") == "sqlite"
+        )
+        performance_layout.addWidget(self.sqlite_bookmarks_check)
+        
+        discard_layout = QHBoxLayout()
+        self.discard_tabs_check = QCheckBox("Unload background tabs after")
+        self.discard_tabs_check.setToolTip("Frees memory; an unloaded tab reloads when you switch to it")
+        self.discard_tabs_check.setChecked(bool(self.config.get_setting("discard_inactive_tabs")))
+        self.discard_minutes_spin = QSpinBox()
+        self.discard_minutes_spin.setRange(1, 1440)
+        self.discard_minutes_spin.setSuffix(" min")
+        self.discard_minutes_spin.setValue(self.config.get_setting("tab_discard_minutes") or 30)
+        discard_layout.addWidget(self.discard_tabs_check)
+        discard_layout.addWidget(self.discard_minutes_spin)
+        discard_layout.addStretch()
+        performance_layout.addLayout(discard_layout)
+        
         layout.addWidget(performance_group)
         
         # Content Settings Group
@@ -641,6 +685,9 @@ class SettingsDialog(QDialog):
         self.config.set_setting("new_tab_page", self.newtab_combo.currentData())
         self.config.set_setting("search_engine", self.search_combo.currentData())
         self.config.set_setting("ask_download_location", self.ask_download_check.isChecked())
+        self.config.set_setting("max_concurrent_downloads", self.concurrent_spin.value())
+        self.config.set_setting("segmented_downloads", self.segmented_check.isChecked())
+        self.config.set_setting("extract_downloaded_archives", self.extract_check.isChecked())
         
         # Appearance
         self.config.set_setting("tab_position", self.tab_pos_combo.currentData())
@@ -654,6 +701,11 @@ class SettingsDialog(QDialog):
         
         # Advanced
         self.config.set_setting("hardware_acceleration", self.hardware_accel_check.isChecked())
+        self.config.set_setting(
+            "bookmarks_backend", "sqlite" if self.sqlite_bookmarks_check.isChecked() else "json"
+        )
+        self.config.set_setting("discard_inactive_tabs", self.discard_tabs_check.isChecked())
+        self.config.set_setting("tab_discard_minutes", self.discard_minutes_spin.value())
         self.config.set_setting("javascript_enabled", self.javascript_check.isChecked())
         self.config.set_setting("auto_load_images", self.images_check.isChecked())
         self.config.set_setting("plugins_enabled", self.plugins_check.isChecked())